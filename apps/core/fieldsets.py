@@ -0,0 +1,228 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    cast,
+)
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Prefetch, QuerySet
+
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+if TYPE_CHECKING:
+    SerializerBase = serializers.Serializer[Any]
+    from rest_framework.generics import GenericAPIView
+
+    ViewSetBase = GenericAPIView[Any]
+else:
+    SerializerBase = object
+    ViewSetBase = object
+
+
+class SparseFieldsetSerializerMixin(SerializerBase):
+    """
+    Serializer that can be restricted to a subset of its fields.
+
+    Pass `fields` to keep only the named fields and `omit` to drop some.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        fields: Optional[Iterable[str]] = None,
+        omit: Optional[Iterable[str]] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+
+class SparseFieldsetViewSetMixin(ViewSetBase):
+    """
+    Lets clients choose the fields they receive with `?fields=` and `?omit=`.
+
+    Both take comma-separated serializer field names. Beyond trimming the
+    response, the queryset is reduced with `.only()`, `select_related()` and
+    `prefetch_related()` to what the remaining fields read, so unused columns
+    and joins are never fetched. Applies to read requests whose serializer
+    uses `SparseFieldsetSerializerMixin`.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> Any:
+        kwargs.update(self.get_sparse_fieldset())
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset: QuerySet[Any]) -> QuerySet[Any]:
+        queryset = super().filter_queryset(queryset)
+        if not self.get_sparse_fieldset():
+            return queryset
+        # Keyset pagination reads its ordering fields from the page's rows.
+        required = [field.lstrip("-") for field in getattr(self, "cursor_ordering", [])]
+        return prune_queryset(queryset, self.get_serializer().fields, required)
+
+    def get_sparse_fieldset(self) -> Dict[str, List[str]]:
+        """
+        Return the `fields` and `omit` serializer arguments of this request.
+        """
+        if not hasattr(self, "_sparse_fieldset"):
+            self._sparse_fieldset = self._parse_sparse_fieldset()
+        return self._sparse_fieldset
+
+    def _parse_sparse_fieldset(self) -> Dict[str, List[str]]:
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return {}
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsetSerializerMixin):
+            return {}
+
+        fieldset: Dict[str, List[str]] = {}
+        for param in (self.fields_query_param, self.omit_query_param):
+            value = request.query_params.get(param)
+            if value is not None:
+                fieldset[param] = [name for name in value.split(",") if name]
+        if not fieldset:
+            return fieldset
+
+        available = serializer_class(context=self.get_serializer_context()).fields
+        unknown = sorted(
+            {name for names in fieldset.values() for name in names} - set(available)
+        )
+        if unknown:
+            raise ValidationError({"fields": f"Unknown field(s): {', '.join(unknown)}"})
+        return fieldset
+
+
+def prune_queryset(
+    queryset: QuerySet[Any],
+    fields: Dict[str, serializers.Field[Any, Any, Any, Any]],
+    required: Sequence[str] = (),
+) -> QuerySet[Any]:
+    """
+    Restrict `queryset` to the columns, joins and prefetches `fields` read.
+
+    The queryset is returned unchanged when a field reads something that
+    cannot be traced to model fields, such as a model property.
+    """
+    plan = _plan_lookups(
+        queryset.model, fields.values(), set(queryset.query.annotations)
+    )
+    if plan is None:
+        return queryset
+    only, select_related, prefetches = plan
+    return _apply_plan(queryset, only | set(required), select_related, prefetches)
+
+
+def _apply_plan(
+    queryset: QuerySet[Any],
+    only: Set[str],
+    select_related: Set[str],
+    prefetches: List[Any],
+) -> QuerySet[Any]:
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if select_related:
+        queryset = queryset.select_related(*sorted(select_related))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+    return queryset.only("pk", *sorted(only))
+
+
+def _plan_lookups(
+    model: Type[Model],
+    fields: Iterable[serializers.Field[Any, Any, Any, Any]],
+    annotations: Set[str],
+) -> Optional[Tuple[Set[str], Set[str], List[Any]]]:
+    """
+    Work out the `.only()`, `select_related()` and `prefetch_related()`
+    lookups needed to serialize `fields` of `model` instances.
+    """
+    only: Set[str] = set()
+    select_related: Set[str] = set()
+    prefetches: List[Any] = []
+
+    for field in fields:
+        if field.source == "*":
+            return None
+
+        if isinstance(
+            field, (serializers.ListSerializer, serializers.ManyRelatedField)
+        ):
+            prefetch = _plan_prefetch(model, field)
+            if prefetch is None:
+                return None
+            prefetches.append(prefetch)
+            continue
+
+        current_model = model
+        path: List[str] = []
+        for index, attr in enumerate(field.source_attrs):
+            try:
+                model_field = current_model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                if not path and attr in annotations:
+                    break
+                if not path:
+                    return None
+                # A method of a related object, which may read any column.
+                only.update(
+                    "__".join([*path, related_field.name])
+                    for related_field in current_model._meta.fields
+                )
+                break
+
+            path.append(attr)
+            if index == len(field.source_attrs) - 1:
+                if model_field.is_relation and not (
+                    model_field.many_to_one or model_field.one_to_one
+                ):
+                    return None
+                only.add("__".join(path))
+            elif model_field.many_to_one or model_field.one_to_one:
+                select_related.add("__".join(path))
+                current_model = model_field.related_model  # type: ignore[assignment]
+            else:
+                return None
+
+    return only, select_related, prefetches
+
+
+def _plan_prefetch(
+    model: Type[Model], field: serializers.Field[Any, Any, Any, Any]
+) -> Optional[Any]:
+    source = str(field.source)
+    try:
+        relation = model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+    child = getattr(field, "child", None)
+    if not isinstance(child, serializers.Serializer) or not relation.one_to_many:
+        return source
+
+    related_model = cast(Type[Model], relation.related_model)
+    plan = _plan_lookups(related_model, child.fields.values(), set())
+    if plan is None:
+        return source
+    only, select_related, prefetches = plan
+    # The prefetch matches rows to their parent through the foreign key.
+    only.add(relation.remote_field.name)  # type: ignore[union-attr]
+    queryset = _apply_plan(
+        related_model._default_manager.all(), only, select_related, prefetches
+    )
+    return Prefetch(source, queryset=queryset)
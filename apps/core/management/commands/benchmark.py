@@ -0,0 +1,669 @@
+import gzip
+import json
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError, connections
+from django.db.models import Count, Max, Min, Q, Sum
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from apps.inventory.models import ProductAvailability
+from apps.inventory.services import (
+    rebuild_product_availability,
+    refresh_product_availability,
+)
+from apps.products.models import (
+    Brand,
+    Category,
+    Product,
+    StockItem,
+    SyncTombstone,
+    invalidate_inventory_reports,
+    invalidate_stock_prices,
+)
+from apps.products.services import (
+    get_inventory_summary,
+    get_low_stock_products,
+)
+from apps.products.imports import import_catalog
+from apps.products.search import rank_product_search
+from apps.products.serializers import StockItemSerializer
+from apps.products.sync import get_catalog_changes, parse_cursor
+from apps.reports.exports import export_stock_items
+from apps.sales.dtos import SaleCreateDTO, SaleItemDTO
+from apps.sales.models import Sale
+from apps.sales.services import STOCK_STRATEGIES, create_sale
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    """
+    Runs performance benchmarks against the configured database.
+
+    Every scenario creates its own fixture data under a unique prefix and
+    removes it afterwards, so it is safe to run against a development database.
+    """
+
+    help = "Run a performance benchmark scenario against the configured database."
+
+    scenarios = {
+        "availability": "benchmark_availability",
+        "bulk-sales": "benchmark_bulk_sales",
+        "catalog-import": "benchmark_catalog_import",
+        "catalog-sync": "benchmark_catalog_sync",
+        "checkout": "benchmark_checkout",
+        "export": "benchmark_export",
+        "fefo-checkout": "benchmark_fefo_checkout",
+        "inventory-summary": "benchmark_inventory_summary",
+        "product-search": "benchmark_product_search",
+        "sparse-fields": "benchmark_sparse_fields",
+    }
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add arguments to select the scenario and control its size.
+        """
+        parser.add_argument("scenario", choices=sorted(self.scenarios))
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=8,
+            help="Number of concurrent workers for concurrent scenarios",
+        )
+        parser.add_argument(
+            "--sales",
+            type=int,
+            default=400,
+            help="Number of sales to create per measured run",
+        )
+        parser.add_argument(
+            "--stock-items",
+            type=int,
+            default=1_000_000,
+            help="Number of stock items to create for inventory scenarios",
+        )
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=100_000,
+            help="Number of products to create for search scenarios",
+        )
+        parser.add_argument(
+            "--catalog-lines",
+            type=int,
+            default=50_000,
+            help="Number of supplier catalog lines for import scenarios",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of measured calls per variant for latency scenarios",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        prefix = f"bench-{uuid.uuid4().hex[:8]}"
+        self.stdout.write(
+            self.style.SUCCESS(f"Running '{options['scenario']}' benchmark...")
+        )
+        try:
+            getattr(self, self.scenarios[options["scenario"]])(prefix, **options)
+        finally:
+            self._cleanup(prefix)
+
+    # --- Scenarios ---
+
+    def benchmark_checkout(self, prefix: str, **options: Any) -> None:
+        """
+        Hammer a single stock item from concurrent terminals with each stock
+        decrement strategy and report the resulting checkout throughput.
+        """
+        threads = options["threads"]
+        per_thread = max(options["sales"] // threads, 1)
+
+        for strategy in STOCK_STRATEGIES:
+            (stock_item,) = self._create_stock_items(
+                f"{prefix}-{strategy}", count=1, quantity=threads * per_thread
+            )
+
+            def checkout() -> None:
+                create_sale(self._sale_dto(prefix, [stock_item.id]))
+
+            with override_settings(SALES_STOCK_DECREMENT_STRATEGY=strategy):
+                elapsed, completed, failed = self._run_concurrently(
+                    checkout, threads, per_thread
+                )
+            self._report(strategy, completed, elapsed, "sales", failed)
+
+    def benchmark_fefo_checkout(self, prefix: str, **options: Any) -> None:
+        """
+        Compare a terminal listing a product's batches to pick one before each
+        sale with selling by product, leaving the choice of batch to the server.
+        """
+        client = self._api_client(prefix)
+        stock_items = self._create_stock_items(prefix, count=20, quantity=100_000)
+        product_id = stock_items[0].product_id
+        sales = options["sales"]
+
+        def two_step() -> None:
+            batches = client.get(
+                reverse("products:stockitem-list"),
+                {"product": str(product_id), "ordering": "expiration_date"},
+            ).data["results"]
+            stock_item = next(batch for batch in batches if batch["quantity"] > 0)
+            client.post(
+                reverse("sales:sale-list"),
+                {
+                    "customer_name": prefix,
+                    "items": [{"stock_item": stock_item["id"], "quantity": 1}],
+                },
+                format="json",
+            )
+
+        def by_product() -> None:
+            client.post(
+                reverse("sales:sale-list"),
+                {
+                    "customer_name": prefix,
+                    "items": [{"product": product_id, "quantity": 1}],
+                },
+                format="json",
+            )
+
+        for label, checkout in (("two-step", two_step), ("by-product", by_product)):
+            elapsed = self._time(checkout, sales)
+            self._report(label, sales, elapsed, "sales")
+
+    def benchmark_bulk_sales(self, prefix: str, **options: Any) -> None:
+        """
+        Replay a backlog of queued sales through the API, once as one POST per
+        sale and once through the bulk endpoint.
+        """
+        count = options["sales"]
+        client = self._api_client(prefix)
+        stock_items = self._create_stock_items(prefix, count=10, quantity=count * 4)
+        payload = [
+            {
+                "customer_name": prefix,
+                "customer_email": "",
+                "customer_phone": "",
+                "items": [
+                    {"stock_item": stock_item.id, "quantity": 1}
+                    for stock_item in stock_items[i % 3 : i % 3 + 4]
+                ],
+            }
+            for i in range(count)
+        ]
+
+        failed = 0
+        started = time.perf_counter()
+        for sale in payload:
+            response = client.post(reverse("sales:sale-list"), sale, format="json")
+            failed += response.status_code != 201
+        elapsed = time.perf_counter() - started
+        self._report("per-request", count, elapsed, "sales", failed)
+
+        started = time.perf_counter()
+        response = client.post(reverse("sales:sale-bulk"), payload, format="json")
+        elapsed = time.perf_counter() - started
+        self._report("bulk", count, elapsed, "sales", response.data["failed"])
+
+    def benchmark_catalog_import(self, prefix: str, **options: Any) -> None:
+        """
+        Import a generated supplier catalog twice, creating then updating all
+        of its rows, reporting throughput and peak Python memory.
+        """
+        expiration = (timezone.now().date() + timedelta(days=400)).isoformat()
+
+        def catalog() -> Iterator[str]:
+            yield (
+                "sku,name,brand,category,batch_number,"
+                "quantity,cost_price,selling_price,expiration_date\n"
+            )
+            for i in range(options["catalog_lines"]):
+                yield (
+                    f"{prefix}-{i // 4},Product {i // 4},{prefix}-brand-{i % 20},"
+                    f"{prefix}-category-{i % 10},{prefix}-{i},{i % 100},"
+                    f"10.00,15.00,{expiration}\n"
+                )
+
+        for label in ("create", "update"):
+            tracemalloc.start()
+            result = import_catalog(catalog())
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._report(label, result.rows, result.seconds, "lines")
+            self.stdout.write(f"{'':<24} peak memory {peak / 2**20:,.1f} MiB")
+
+    def benchmark_catalog_sync(self, prefix: str, **options: Any) -> None:
+        """
+        Compare building the catalog snapshot with serving it from cache, and
+        with a sync of the changes made by a few sales, reporting payload size
+        and latency.
+        """
+        stock_items = self._create_stock_items(
+            prefix, count=options["stock_items"], quantity=1000, varied=True
+        )
+        # Without the lag, the cursor is past the fixture data just created.
+        with override_settings(PRODUCTS_SYNC_CURSOR_LAG_SECONDS=0):
+            snapshot = json.loads(gzip.decompress(get_catalog_changes()))
+        cursor = parse_cursor(snapshot["cursor"])
+        # Varied quantities start at 0, so the first stock item is skipped.
+        for stock_item in stock_items[1:11]:
+            create_sale(self._sale_dto(prefix, [stock_item.id]))
+
+        def build() -> None:
+            invalidate_stock_prices()
+            get_catalog_changes()
+
+        def cached() -> None:
+            get_catalog_changes()
+
+        def changes() -> None:
+            get_catalog_changes(cursor)
+
+        for label, sync in (
+            ("snapshot-build", build),
+            ("snapshot-cached", cached),
+            ("changes", changes),
+        ):
+            payload = get_catalog_changes(cursor if sync is changes else None)
+            elapsed = self._time(sync, options["repeat"])
+            self.stdout.write(
+                f"{label:<24} {len(payload):>10} bytes "
+                f"({len(gzip.decompress(payload)):>10} uncompressed), "
+                f"{elapsed / options['repeat'] * 1000:8.2f}ms per sync"
+            )
+
+    def benchmark_export(self, prefix: str, **options: Any) -> None:
+        """
+        Compare serializing all stock items at once with the streaming export,
+        reporting wall time and peak Python memory.
+        """
+        self._create_stock_items(
+            prefix, count=options["stock_items"], quantity=0, varied=True
+        )
+        queryset = StockItem.objects.filter(batch_number__startswith=prefix)
+
+        def serialized() -> None:
+            json.dumps(
+                StockItemSerializer(
+                    queryset.select_related(
+                        "product", "product__brand", "product__category"
+                    ),
+                    many=True,
+                ).data,
+                cls=DjangoJSONEncoder,
+            )
+
+        def streamed() -> None:
+            for _ in export_stock_items("ndjson", queryset):
+                pass
+
+        for label, export in (("serializer", serialized), ("streaming", streamed)):
+            tracemalloc.start()
+            started = time.perf_counter()
+            export()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._report(label, options["stock_items"], elapsed, "rows")
+            self.stdout.write(f"{'':<24} peak memory {peak / 2**20:,.1f} MiB")
+
+    def benchmark_inventory_summary(self, prefix: str, **options: Any) -> None:
+        """
+        Compare the inventory summary computed with the expiring stock counted
+        from its index and with a single conditional aggregate, and served from
+        cache.
+        """
+        self._create_stock_items(
+            prefix, count=options["stock_items"], quantity=0, varied=True
+        )
+        today = timezone.now().date()
+
+        def single_aggregate() -> None:
+            StockItem.objects.aggregate(
+                total_products=Count("id"),
+                total_quantity=Sum("quantity"),
+                low_stock_items=Count("id", filter=Q(quantity__lte=10)),
+                expiring_items=Count(
+                    "id",
+                    filter=Q(
+                        expiration_date__gte=today,
+                        expiration_date__lte=today + timedelta(days=30),
+                    ),
+                ),
+            )
+            get_low_stock_products().count()
+
+        def indexed_expiring() -> None:
+            invalidate_inventory_reports()
+            get_inventory_summary()
+
+        def cached() -> None:
+            get_inventory_summary()
+
+        for label, summary in (
+            ("single-aggregate", single_aggregate),
+            ("indexed-expiring", indexed_expiring),
+            ("cached", cached),
+        ):
+            elapsed = self._time(summary, options["repeat"])
+            self._report(label, options["repeat"], elapsed, "calls")
+
+    def benchmark_availability(self, prefix: str, **options: Any) -> None:
+        """
+        Compare the per-product availability of the whole catalog summed over
+        every batch with a read of the maintained aggregate, and time the
+        refresh a stock write triggers.
+        """
+        product = self._create_stock_items(prefix, count=1, quantity=1)[0].product
+        products = Product.objects.bulk_create(
+            (
+                Product(
+                    name=f"{prefix}-{i}",
+                    brand=product.brand,
+                    category=product.category,
+                    sku=f"{prefix}-{i}",
+                )
+                for i in range(options["products"])
+            ),
+            batch_size=5000,
+        )
+        today = timezone.now().date()
+        StockItem.objects.bulk_create(
+            (
+                StockItem(
+                    product=products[i % len(products)],
+                    batch_number=f"{prefix}-{i}",
+                    quantity=i % 101,
+                    cost_price=Decimal("10.00"),
+                    selling_price=Decimal("15.00"),
+                    expiration_date=today + timedelta(days=i % 730 - 30),
+                )
+                for i in range(options["stock_items"])
+            ),
+            batch_size=5000,
+        )
+        catalog = Q(product_id__gte=products[0].id, product_id__lte=products[-1].id)
+        sellable = Q(expiration_date__gte=today)
+
+        def group_by() -> None:
+            list(
+                StockItem.objects.filter(catalog)
+                .values("product")
+                .annotate(
+                    total_quantity=Sum("quantity"),
+                    sellable_quantity=Sum("quantity", filter=sellable),
+                    earliest_expiration_date=Min(
+                        "expiration_date", filter=sellable & Q(quantity__gt=0)
+                    ),
+                    batch_count=Count("id"),
+                )
+                .order_by("product")
+            )
+
+        def aggregate() -> None:
+            list(
+                ProductAvailability.objects.filter(catalog)
+                .values(
+                    "product",
+                    "total_quantity",
+                    "sellable_quantity",
+                    "earliest_expiration_date",
+                    "batch_count",
+                )
+                .order_by("product")
+            )
+
+        def refresh() -> None:
+            refresh_product_availability([products[0].id])
+
+        started = time.perf_counter()
+        rebuild_product_availability()
+        self._report(
+            "rebuild", len(products), time.perf_counter() - started, "products"
+        )
+        for label, read in (
+            ("group-by", group_by),
+            ("aggregate", aggregate),
+            ("refresh-one-product", refresh),
+        ):
+            elapsed = self._time(read, options["repeat"])
+            self._report(label, options["repeat"], elapsed, "calls")
+
+    def benchmark_sparse_fields(self, prefix: str, **options: Any) -> None:
+        """
+        Compare full catalog and sales pages with the field sets requested by
+        POS terminals, reporting payload size and latency.
+        """
+        client = self._api_client(prefix)
+        stock_items = self._create_stock_items(prefix, count=100, quantity=1000)
+        product = stock_items[0].product
+        Product.objects.bulk_create(
+            Product(
+                name=f"{prefix}-{i}",
+                description="Lorem ipsum dolor sit amet. " * 20,
+                brand=product.brand,
+                category=product.category,
+                sku=f"{prefix}-{i}",
+            )
+            for i in range(100)
+        )
+        for i in range(50):
+            create_sale(self._sale_dto(prefix, [stock_items[i].id, stock_items[-i].id]))
+
+        for name, url, fields in (
+            ("products", "products:product-list", "id,sku,name"),
+            (
+                "stock-items",
+                "products:stockitem-list",
+                "id,product,product_name,batch_number,quantity,discounted_price",
+            ),
+            ("sales", "sales:sale-list", "id,created_at,final_amount"),
+        ):
+            variants: Tuple[Tuple[str, Dict[str, str]], ...] = (
+                (name, {}),
+                (f"{name}?fields", {"fields": fields}),
+            )
+            for label, params in variants:
+                response = client.get(reverse(url), params)
+                size = len(response.content)
+
+                def request() -> None:
+                    client.get(reverse(url), params)
+
+                elapsed = self._time(request, options["repeat"])
+                self.stdout.write(
+                    f"{label:<24} {size:>8} bytes, "
+                    f"{elapsed / options['repeat'] * 1000:8.2f}ms per page"
+                )
+
+    def benchmark_product_search(self, prefix: str, **options: Any) -> None:
+        """
+        Compare the former substring search of the product list with the
+        full-text index and the exact SKU lookup, fetching one counted page.
+        """
+        product = self._create_stock_items(prefix, count=1, quantity=1)[0].product
+        words = ["ibuprofen", "paracetamol", "loratadine", "omeprazole", "zinc"]
+        Product.objects.bulk_create(
+            (
+                Product(
+                    name=f"{words[i % len(words)].title()} {i} {prefix}",
+                    description=f"Lorem ipsum {words[(i + 1) % len(words)]}. " * 10,
+                    brand=product.brand,
+                    category=product.category,
+                    sku=f"{prefix}-{i}",
+                )
+                for i in range(options["products"])
+            ),
+            batch_size=5000,
+        )
+        term = "loratadine"
+        ranked = rank_product_search(
+            Product.objects.all(), [term], connections["default"].vendor
+        )
+        if ranked is None:
+            raise CommandError("The database has no product search index.")
+
+        def substring() -> None:
+            queryset = Product.objects.filter(
+                Q(name__icontains=term)
+                | Q(sku__icontains=term)
+                | Q(description__icontains=term)
+            ).order_by("name")
+            queryset.count()
+            list(queryset[:20])
+
+        def indexed() -> None:
+            ranked.count()
+            list(ranked.order_by("-search_rank", "name")[:20])
+
+        def sku() -> None:
+            queryset = Product.objects.filter(sku=f"{prefix}-7")
+            queryset.count()
+            list(queryset[:20])
+
+        for label, search in (
+            ("substring", substring),
+            ("indexed", indexed),
+            ("exact-sku", sku),
+        ):
+            elapsed = self._time(search, options["repeat"])
+            self._report(label, options["repeat"], elapsed, "searches")
+
+    # --- Helpers ---
+
+    def _time(self, work: Callable[[], None], repeat: int) -> float:
+        """
+        Return the wall time of `repeat` sequential calls to `work`, after one
+        untimed warm-up call.
+        """
+        work()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            work()
+        return time.perf_counter() - started
+
+    def _api_client(self, prefix: str) -> APIClient:
+        """
+        Return an API client authenticated as a throwaway benchmark user.
+        """
+        user = User.objects.create_user(
+            username=prefix,
+            email=f"{prefix}@example.com",
+            password=uuid.uuid4().hex,
+        )
+        client = APIClient(SERVER_NAME="localhost")
+        client.force_authenticate(user=user)
+        return client
+
+    def _run_concurrently(
+        self, work: Callable[[], None], threads: int, iterations: int
+    ) -> Tuple[float, int, int]:
+        """
+        Run `work` `iterations` times on each of `threads` threads.
+
+        Returns the elapsed wall time with the number of completed and failed
+        calls. Failures are stock or database contention errors, which is what
+        the concurrent scenarios are designed to provoke.
+        """
+        counts: Dict[str, int] = {"completed": 0, "failed": 0}
+        counts_lock = threading.Lock()
+
+        def worker() -> None:
+            try:
+                for _ in range(iterations):
+                    try:
+                        work()
+                        outcome = "completed"
+                    except (ValueError, OperationalError):
+                        outcome = "failed"
+                    with counts_lock:
+                        counts[outcome] += 1
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, counts["completed"], counts["failed"]
+
+    def _report(
+        self, label: str, count: int, elapsed: float, unit: str, failed: int = 0
+    ) -> None:
+        rate = count / elapsed if elapsed else 0.0
+        line = f"{label:<24} {count:>8} {unit} in {elapsed:8.3f}s ({rate:,.1f}/s)"
+        if failed:
+            line += f", {failed} failed"
+        self.stdout.write(line)
+
+    def _create_stock_items(
+        self, prefix: str, count: int, quantity: int, varied: bool = False
+    ) -> List[StockItem]:
+        """
+        Create `count` stock items of one throwaway product.
+
+        With `varied`, quantities range up to 100 and expiration dates over the
+        next two years instead of all items holding `quantity` for a year.
+        """
+        brand = Brand.objects.create(name=prefix)
+        category = Category.objects.create(name=prefix)
+        product = Product.objects.create(
+            name=prefix, brand=brand, category=category, sku=prefix
+        )
+        today = timezone.now().date()
+        return StockItem.objects.bulk_create(
+            (
+                StockItem(
+                    product=product,
+                    batch_number=f"{prefix}-{i}",
+                    quantity=i % 101 if varied else quantity,
+                    cost_price=Decimal("10.00"),
+                    selling_price=Decimal("15.00"),
+                    expiration_date=today + timedelta(days=i % 730 if varied else 365),
+                )
+                for i in range(count)
+            ),
+            batch_size=5000,
+        )
+
+    def _sale_dto(self, prefix: str, stock_item_ids: List[int]) -> SaleCreateDTO:
+        return SaleCreateDTO(
+            customer_name=prefix,
+            customer_email="",
+            customer_phone="",
+            items=[
+                SaleItemDTO(
+                    stock_item_id=stock_item_id,
+                    quantity=1,
+                    unit_price=Decimal(0),
+                    total_price=Decimal(0),
+                    discount_percentage=Decimal(0),
+                )
+                for stock_item_id in stock_item_ids
+            ],
+        )
+
+    def _cleanup(self, prefix: str) -> None:
+        last_tombstone = SyncTombstone.objects.aggregate(last=Max("id"))["last"]
+        Sale.objects.filter(customer_name=prefix).delete()
+        Brand.objects.filter(name__startswith=prefix).delete()
+        Category.objects.filter(name__startswith=prefix).delete()
+        User.objects.filter(username__startswith=prefix).delete()
+        # The fixture data was never synced, so neither are its deletions.
+        SyncTombstone.objects.filter(id__gt=last_tombstone or 0).delete()
@@ -10,7 +10,9 @@ from django.utils import timezone
 from dateutil.relativedelta import relativedelta
 from faker import Faker
 
+from apps.inventory.services import rebuild_product_availability
 from apps.products.models import Brand, Category, Product, StockItem
+from apps.reports.services import rebuild_sales_rollups
 from apps.sales.dtos import SaleCreateDTO, SaleItemDTO
 from apps.sales.models import Sale, SaleItem
 from apps.sales.services import create_sale
@@ -198,6 +200,12 @@ class Command(BaseCommand):
                 except ValueError as e:
                     self.stdout.write(self.style.WARNING(f"Skipped creating sale: {e}"))
 
+        # Sales were back-dated after creation, so recompute their rollups.
+        self.stdout.write("Rebuilding sales rollups...")
+        rebuild_sales_rollups()
+        self.stdout.write("Rebuilding product availability...")
+        rebuild_product_availability()
+
         fake.unique.clear()
         self.stdout.write(self.style.SUCCESS("Database seeding complete!"))
         self.stdout.write(
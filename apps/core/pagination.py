@@ -0,0 +1,255 @@
+import base64
+import binascii
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Type, cast
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Field, ForeignKey, Model, Q, QuerySet
+from django.utils.functional import cached_property
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+if TYPE_CHECKING:
+    PaginatorBase = Paginator[Any]
+    PageType = Page[Any]
+else:
+    PaginatorBase = Paginator
+    PageType = Page
+
+
+def estimate_count(queryset: QuerySet[Any]) -> Optional[int]:
+    """
+    Return the query planner's estimate of the number of rows in `queryset`.
+
+    Unfiltered querysets are estimated from the table statistics, filtered
+    ones from the row estimate of their query plan. Returns None where no
+    estimate is available, e.g. on databases other than PostgreSQL.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+            # reltuples is -1 until the table has been analyzed.
+            if row is None or row[0] < 0:
+                return None
+            return int(row[0])
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(PaginatorBase):
+    """
+    Paginator that avoids an exact COUNT(*) on large querysets.
+
+    When the planner estimates at least `PAGINATION_ESTIMATED_COUNT_THRESHOLD`
+    rows, that estimate is used as the count and `count_is_approximate` is
+    set. Smaller results, and databases without estimates, are counted
+    exactly.
+    """
+
+    count_is_approximate = False
+
+    @cached_property
+    def count(self) -> int:
+        if isinstance(self.object_list, QuerySet):  # type: ignore[misc]
+            estimate = estimate_count(self.object_list)
+            if (
+                estimate is not None
+                and estimate >= settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+            ):
+                self.count_is_approximate = True
+                return estimate
+        return int(super().count)
+
+    def page(self, number: Any) -> PageType:
+        if not self.count_is_approximate:
+            return super().page(number)
+        # Do not cut the last page short on an underestimated count.
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return cast(
+            PageType,
+            self._get_page(  # type: ignore[attr-defined]
+                self.object_list[bottom : bottom + self.per_page], number, self
+            ),
+        )
+
+
+class KeysetPagination:
+    """
+    Paginates by the position of the last row served instead of by offset.
+
+    Each page is fetched with a filter on the ordering columns, so with an
+    index matching `ordering` a page costs the same however deep it is, and
+    no COUNT(*) is run. The ordering must end with a unique field.
+    """
+
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering: Sequence[str], page_size: int) -> None:
+        self.ordering = list(ordering)
+        self.page_size = page_size
+        self.next_position: Optional[List[str]] = None
+        self.base_url = ""
+
+    def paginate_queryset(
+        self, queryset: QuerySet[Any], request: Request
+    ) -> List[Model]:
+        self.base_url = request.build_absolute_uri()
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(
+                self._after(
+                    self._decode_cursor(
+                        encoded, queryset.model, connections[queryset.db]
+                    )
+                )
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        page = rows[: self.page_size]
+        if len(rows) > self.page_size:
+            last = page[-1]
+            self.next_position = [
+                self._serialize(getattr(last, field.lstrip("-")))
+                for field in self.ordering
+            ]
+        return page
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        cursor = base64.urlsafe_b64encode(
+            json.dumps(self.next_position).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def _after(self, position: List[Any]) -> Q:
+        """
+        Match the rows ordered after `position`.
+
+        For an ordering (a, b, c) this is a > x OR (a = x AND b > y) OR
+        (a = x AND b = y AND c > z), with < for descending fields.
+        """
+        after = Q()
+        for index, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{name}__{lookup}": position[index]})
+            for previous_field, value in zip(self.ordering[:index], position):
+                condition &= Q(**{previous_field.lstrip("-"): value})
+            after |= condition
+        return after
+
+    def _decode_cursor(
+        self, encoded: str, model: Type[Model], connection: BaseDatabaseWrapper
+    ) -> List[Any]:
+        """
+        Return the position a cursor holds, as values of the ordering fields
+        the database can compare.
+        """
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError("Cursor does not match the ordering")
+            values = []
+            for field_name, value in zip(self.ordering, position):
+                field = cast(
+                    "Field[Any, Any]", model._meta.get_field(field_name.lstrip("-"))
+                )
+                if isinstance(field, ForeignKey):
+                    field = field.target_field
+                value = field.to_python(str(value))
+                field.run_validators(value)
+                low, high = connection.ops.integer_field_ranges.get(
+                    field.get_internal_type(), (None, None)
+                )
+                if low is not None and not low <= value <= high:
+                    raise ValueError("Cursor value out of range")
+                values.append(value)
+        except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def _serialize(self, value: Any) -> str:
+        if hasattr(value, "isoformat"):
+            return str(value.isoformat())
+        return str(value)
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """
+    Page number pagination, or keyset pagination with `?pagination=cursor`.
+
+    Views opt into cursor pagination by declaring a `cursor_ordering`, which
+    replaces any requested ordering while paginating by cursor. Page number
+    responses keep their format, so existing clients keep working; their
+    `count` may be estimated on large results, as flagged by
+    `count_is_approximate`.
+    """
+
+    django_paginator_class = EstimatedCountPaginator
+    pagination_query_param = "pagination"
+
+    def __init__(self) -> None:
+        self.keyset: Optional[KeysetPagination] = None
+
+    def paginate_queryset(
+        self, queryset: Any, request: Request, view: Optional[APIView] = None
+    ) -> Optional[List[Any]]:
+        cursor_ordering = getattr(view, "cursor_ordering", None)
+        if (
+            cursor_ordering is None
+            or request.query_params.get(self.pagination_query_param) != "cursor"
+        ):
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.keyset = KeysetPagination(cursor_ordering, page_size)
+        return self.keyset.paginate_queryset(queryset, request)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        response = super().get_paginated_response(data)
+        page = cast(PageType, self.page)
+        paginator = cast(EstimatedCountPaginator, page.paginator)
+        response.data["count_is_approximate"] = paginator.count_is_approximate
+        return response
+
+    def get_paginated_response_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        response_schema: Dict[str, Any] = super().get_paginated_response_schema(schema)
+        response_schema["properties"]["count_is_approximate"] = {
+            "type": "boolean",
+            "example": False,
+        }
+        return response_schema
@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.products.factories.factories import ProductFactory, StockItemFactory
+from apps.sales.models import Sale, SaleItem
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    """Tests for the ?fields= and ?omit= query parameters."""
+
+    @pytest.fixture
+    def user(self) -> User:
+        """Create a test user."""
+        return User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+            first_name="Jane",
+            last_name="Doe",
+        )
+
+    @pytest.fixture
+    def authenticated_client(self, user: User) -> APIClient:
+        """Create an authenticated API client."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_fields_trims_response_and_columns(
+        self, authenticated_client: APIClient
+    ) -> None:
+        ProductFactory(description="A very long description")
+
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(
+                reverse("products:product-list"), {"fields": "id,sku,name"}
+            )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert set(response.data["results"][0]) == {"id", "sku", "name"}  # nosec B101
+        select = context.captured_queries[-1]["sql"]
+        assert '"description"' not in select  # nosec B101
+        assert "JOIN" not in select  # nosec B101
+
+    def test_fields_keeps_needed_joins(self, authenticated_client: APIClient) -> None:
+        stock_item = StockItemFactory()
+
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.get(
+                reverse("products:stockitem-list"),
+                {"fields": "id,product_name,discounted_price"},
+            )
+
+        result = response.data["results"][0]
+        assert result["product_name"] == stock_item.product.name  # nosec B101
+        assert Decimal(result["discounted_price"]) > 0  # nosec B101
+        select = context.captured_queries[-1]["sql"]
+        assert "products_brand" not in select  # nosec B101
+        assert "products_category" not in select  # nosec B101
+
+    def test_omit_drops_nested_items(
+        self, authenticated_client: APIClient, user: User
+    ) -> None:
+        sale = Sale.objects.create(
+            customer_name="John Doe",
+            total_amount=Decimal("10.00"),
+            final_amount=Decimal("10.00"),
+            created_by=user,
+        )
+        SaleItem.objects.create(
+            sale=sale,
+            stock_item=StockItemFactory(),
+            quantity=1,
+            unit_price=Decimal("10.00"),
+            total_price=Decimal("10.00"),
+        )
+        url = reverse("sales:sale-list")
+
+        with CaptureQueriesContext(connection) as context:
+            omitted = authenticated_client.get(url, {"omit": "items"})
+
+        assert "items" not in omitted.data["results"][0]  # nosec B101
+        # Count and page only; the items are not prefetched.
+        assert len(context) == 2  # nosec B101
+
+        with_items = authenticated_client.get(
+            url, {"fields": "id,items,created_by_name"}
+        )
+        result = with_items.data["results"][0]
+        assert result["created_by_name"] == "Jane Doe"  # nosec B101
+        assert result["items"][0]["quantity"] == 1  # nosec B101
+
+    def test_unknown_field_is_rejected(self, authenticated_client: APIClient) -> None:
+        response = authenticated_client.get(
+            reverse("products:product-list"), {"fields": "id,colour"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
@@ -0,0 +1,95 @@
+from typing import Optional
+
+import pytest
+from django.db.models import QuerySet
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.core import pagination
+from apps.core.pagination import EstimatedCountPaginator
+from apps.products.factories.factories import StockItemFactory
+from apps.products.models import StockItem
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestEstimatedCountPaginator:
+    """Tests for the estimated-count paginator."""
+
+    @pytest.fixture
+    def stock_items(self) -> None:
+        """Create a few stock items to paginate."""
+        StockItemFactory.create_batch(3)
+
+    def _estimate(self, estimate: Optional[int]) -> object:
+        def estimate_count(queryset: QuerySet[StockItem]) -> Optional[int]:
+            return estimate
+
+        return estimate_count
+
+    def test_counts_exactly_without_estimate(self, stock_items: None) -> None:
+        paginator = EstimatedCountPaginator(StockItem.objects.order_by("id"), 2)
+
+        assert paginator.count == 3  # nosec B101
+        assert paginator.count_is_approximate is False  # nosec B101
+
+    @override_settings(PAGINATION_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_counts_exactly_below_threshold(
+        self, stock_items: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(pagination, "estimate_count", self._estimate(999))
+        paginator = EstimatedCountPaginator(StockItem.objects.order_by("id"), 2)
+
+        assert paginator.count == 3  # nosec B101
+        assert paginator.count_is_approximate is False  # nosec B101
+
+    @override_settings(PAGINATION_ESTIMATED_COUNT_THRESHOLD=2)
+    def test_uses_estimate_above_threshold(
+        self, stock_items: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(pagination, "estimate_count", self._estimate(2))
+        paginator = EstimatedCountPaginator(StockItem.objects.order_by("id"), 2)
+
+        assert paginator.count == 2  # nosec B101
+        assert paginator.count_is_approximate is True  # nosec B101
+        # The underestimated last page still holds a full page of rows.
+        assert len(paginator.page(1).object_list) == 2  # nosec B101
+
+    @override_settings(PAGINATION_ESTIMATED_COUNT_THRESHOLD=2)
+    def test_api_flags_approximate_count(
+        self, stock_items: None, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        url = reverse("products:stockitem-list")
+
+        exact = client.get(url)
+        monkeypatch.setattr(pagination, "estimate_count", self._estimate(50_000))
+        estimated = client.get(url)
+
+        assert exact.data["count"] == 3  # nosec B101
+        assert exact.data["count_is_approximate"] is False  # nosec B101
+        assert estimated.data["count"] == 50_000  # nosec B101
+        assert estimated.data["count_is_approximate"] is True  # nosec B101
+
+    def test_admin_changelist_uses_paginator(self, stock_items: None) -> None:
+        admin = User.objects.create_superuser(
+            username="admin",
+            email="admin@example.com",
+            password="testpass123",  # nosec B106
+        )
+        client = Client()
+        client.force_login(admin)
+
+        response = client.get(reverse("admin:products_stockitem_changelist"))
+
+        assert response.status_code == 200  # nosec B101
+        assert isinstance(  # nosec B101
+            response.context["cl"].paginator, EstimatedCountPaginator
+        )
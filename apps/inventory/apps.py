@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class InventoryConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.inventory"
+
+    def ready(self) -> None:
+        """
+        Keep the product availability in step with the stock items.
+        """
+        # Imported here as the models are only ready once the registry is.
+        from apps.products.models import stock_changed
+
+        from .services import update_availability_on_stock_change
+
+        stock_changed.connect(
+            update_availability_on_stock_change,
+            dispatch_uid="inventory.update_availability_on_stock_change",
+        )
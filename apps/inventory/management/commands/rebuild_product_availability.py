@@ -0,0 +1,19 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.inventory.services import rebuild_product_availability
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the product availability from the stock items.
+    """
+
+    help = "Recompute the per-product availability backing the inventory API."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        refreshed = rebuild_product_availability()
+        self.stdout.write(
+            self.style.SUCCESS(f"Availability rebuilt for {refreshed} products.")
+        )
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:44
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0005_stockitem_unique_product_batch"),
+        ("inventory", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductAvailability",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("total_quantity", models.PositiveIntegerField(default=0)),
+                ("sellable_quantity", models.PositiveIntegerField(default=0)),
+                ("earliest_expiration_date", models.DateField(blank=True, null=True)),
+                ("batch_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "product availability",
+                "ordering": ["product_id"],
+            },
+        ),
+        migrations.DeleteModel(
+            name="InventoryItem",
+        ),
+        migrations.AddIndex(
+            model_name="productavailability",
+            index=models.Index(
+                fields=["earliest_expiration_date"],
+                name="inventory_p_earlies_3c769d_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+# Fill the availability table created by 0002_product_availability from the
+# stock items, as `apps.inventory.services.rebuild_product_availability` does.
+# Every product gets a row, with zero quantities when it has no stock.
+
+CHUNK_SIZE = 1000
+
+
+def backfill(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    Product = apps.get_model("products", "Product")
+    ProductAvailability = apps.get_model("inventory", "ProductAvailability")
+    today = timezone.now().date()
+    sellable = Q(stockitem__expiration_date__gte=today)
+    rows = (
+        Product.objects.using(schema_editor.connection.alias)
+        .order_by()
+        .annotate(
+            total=Coalesce(Sum("stockitem__quantity"), 0),
+            sellable=Coalesce(Sum("stockitem__quantity", filter=sellable), 0),
+            earliest=Min(
+                "stockitem__expiration_date",
+                filter=sellable & Q(stockitem__quantity__gt=0),
+            ),
+            batches=Count("stockitem"),
+        )
+        .values_list("id", "total", "sellable", "earliest", "batches")
+    )
+    chunk = []
+    for product_id, total, sellable_quantity, earliest, batches in rows.iterator(
+        chunk_size=CHUNK_SIZE
+    ):
+        chunk.append(
+            ProductAvailability(
+                product_id=product_id,
+                total_quantity=total,
+                sellable_quantity=sellable_quantity,
+                earliest_expiration_date=earliest,
+                batch_count=batches,
+            )
+        )
+        if len(chunk) == CHUNK_SIZE:
+            ProductAvailability.objects.using(
+                schema_editor.connection.alias
+            ).bulk_create(chunk, ignore_conflicts=True)
+            chunk = []
+    ProductAvailability.objects.using(schema_editor.connection.alias).bulk_create(
+        chunk, ignore_conflicts=True
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0002_product_availability"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
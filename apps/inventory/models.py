@@ -1,9 +1,36 @@
 from django.db import models
 
+from apps.products.models import Product
 
-class InventoryItem(models.Model):
-    name = models.CharField(max_length=100)
-    quantity = models.IntegerField()
+
+class ProductAvailability(models.Model):
+    """
+    Stock on hand per product, summed over its batches.
+
+    Maintained by `apps.inventory.services` as stock changes, so the
+    availability of the whole catalog is read without aggregating batches.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="availability",
+    )
+    total_quantity = models.PositiveIntegerField(default=0)
+    # Quantity in batches that have not expired yet.
+    sellable_quantity = models.PositiveIntegerField(default=0)
+    # Expiration date of the next batch to sell, first expiry first out.
+    earliest_expiration_date = models.DateField(null=True, blank=True)
+    batch_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["product_id"]
+        verbose_name_plural = "product availability"
+        indexes = [
+            models.Index(fields=["earliest_expiration_date"]),
+        ]
 
     def __str__(self) -> str:
-        return self.name
+        return f"{self.product_id}: {self.sellable_quantity}/{self.total_quantity}"
@@ -0,0 +1,22 @@
+from rest_framework import serializers
+
+from .models import ProductAvailability
+
+
+class ProductAvailabilitySerializer(serializers.ModelSerializer[ProductAvailability]):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    product_sku = serializers.CharField(source="product.sku", read_only=True)
+
+    class Meta:
+        model = ProductAvailability
+        fields = [
+            "product",
+            "product_name",
+            "product_sku",
+            "total_quantity",
+            "sellable_quantity",
+            "earliest_expiration_date",
+            "batch_count",
+            "updated_at",
+        ]
+        read_only_fields = fields
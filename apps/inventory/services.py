@@ -0,0 +1,164 @@
+from datetime import date
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Min, Q, QuerySet, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.products.models import Product
+
+from .models import ProductAvailability
+
+# Cache key holding the ISO date of the last `refresh_expired_availability`
+# run.
+AVAILABILITY_REFRESHED_ON_CACHE_KEY = "inventory:availability_refreshed_on"
+
+# Products recomputed per statement by `rebuild_product_availability`.
+REBUILD_CHUNK_SIZE = 1000
+
+AVAILABILITY_UPDATE_FIELDS = [
+    "total_quantity",
+    "sellable_quantity",
+    "earliest_expiration_date",
+    "batch_count",
+    "updated_at",
+]
+
+
+def _compute_availability(
+    products: QuerySet[Product], today: date
+) -> Iterator[ProductAvailability]:
+    """
+    Aggregate the stock items of `products` into unsaved availability rows.
+    """
+    sellable = Q(stockitem__expiration_date__gte=today)
+    rows = (
+        products.order_by()
+        .annotate(
+            total_quantity=Coalesce(Sum("stockitem__quantity"), 0),
+            sellable_quantity=Coalesce(Sum("stockitem__quantity", filter=sellable), 0),
+            earliest_expiration_date=Min(
+                "stockitem__expiration_date",
+                filter=sellable & Q(stockitem__quantity__gt=0),
+            ),
+            batch_count=Count("stockitem"),
+        )
+        .values_list(
+            "id",
+            "total_quantity",
+            "sellable_quantity",
+            "earliest_expiration_date",
+            "batch_count",
+        )
+    )
+    return (
+        ProductAvailability(
+            product_id=product_id,
+            total_quantity=total_quantity,
+            sellable_quantity=sellable_quantity,
+            earliest_expiration_date=earliest_expiration_date,
+            batch_count=batch_count,
+        )
+        for (
+            product_id,
+            total_quantity,
+            sellable_quantity,
+            earliest_expiration_date,
+            batch_count,
+        ) in rows.iterator(chunk_size=REBUILD_CHUNK_SIZE)
+    )
+
+
+def _save_availability(rows: List[ProductAvailability]) -> None:
+    ProductAvailability.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=AVAILABILITY_UPDATE_FIELDS,
+    )
+
+
+@transaction.atomic
+def refresh_product_availability(product_ids: Iterable[int]) -> int:
+    """
+    Recompute the availability of some products from their stock items.
+
+    Only the batches of these products are aggregated, through the index on
+    `StockItem.product`, and their rows are written with a single upsert.
+
+    Returns:
+        int: The number of products refreshed.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return 0
+    rows = list(
+        _compute_availability(
+            Product.objects.filter(id__in=product_ids), timezone.now().date()
+        )
+    )
+    _save_availability(rows)
+    return len(rows)
+
+
+@transaction.atomic
+def rebuild_product_availability() -> int:
+    """
+    Recompute the availability of every product from the stock items.
+
+    Returns:
+        int: The number of products refreshed.
+    """
+    rows = _compute_availability(Product.objects.all(), timezone.now().date())
+    refreshed = 0
+    while chunk := list(islice(rows, REBUILD_CHUNK_SIZE)):
+        _save_availability(chunk)
+        refreshed += len(chunk)
+    cache.set(
+        AVAILABILITY_REFRESHED_ON_CACHE_KEY, timezone.now().date().isoformat(), None
+    )
+    return refreshed
+
+
+def refresh_expired_availability() -> int:
+    """
+    Recompute the products whose next batch to sell expired since the last
+    refresh.
+
+    The sellable quantity of a product only changes with the date once a batch
+    in stock expires, and such a batch is never later than the product's
+    `earliest_expiration_date`, so only those rows are refreshed.
+
+    Returns:
+        int: The number of products refreshed.
+    """
+    today = timezone.now().date()
+    refreshed = refresh_product_availability(
+        ProductAvailability.objects.filter(
+            earliest_expiration_date__lt=today
+        ).values_list("product_id", flat=True)
+    )
+    cache.set(AVAILABILITY_REFRESHED_ON_CACHE_KEY, today.isoformat(), None)
+    return refreshed
+
+
+def ensure_availability_current() -> None:
+    """
+    Refresh the availability rows outdated by the date changing, unless that
+    was already done today.
+    """
+    refreshed_on: Optional[str] = cache.get(AVAILABILITY_REFRESHED_ON_CACHE_KEY)
+    if refreshed_on != timezone.now().date().isoformat():
+        refresh_expired_availability()
+
+
+def update_availability_on_stock_change(
+    sender: Any, product_ids: Iterable[int], **kwargs: Any
+) -> None:
+    """
+    Receiver of `apps.products.models.stock_changed`.
+    """
+    refresh_product_availability(product_ids)
@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .services import refresh_expired_availability
+
+
+# Run daily just after midnight
+@shared_task  # type: ignore[misc]
+def daily_availability_refresh() -> int:
+    """
+    Drop the batches that expired overnight from the sellable quantities.
+    """
+    return refresh_expired_availability()
@@ -0,0 +1,187 @@
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.inventory.models import ProductAvailability
+from apps.inventory.services import (
+    rebuild_product_availability,
+    refresh_expired_availability,
+)
+from apps.products.imports import import_catalog
+from apps.products.models import Brand, Category, Product, StockItem
+from apps.products.services import get_low_stock_products
+from apps.sales.dtos import SaleCreateDTO, SaleProductItemDTO
+from apps.sales.services import create_sale
+
+
+class ProductAvailabilityServiceTest(TestCase):
+    def setUp(self) -> None:
+        """Set up a product with a batch expiring soon and one expiring later."""
+        cache.clear()
+        self.today = timezone.now().date()
+        brand = Brand.objects.create(name="Test Brand")
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Test Product", brand=brand, category=category, sku="TEST001"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soon = self._create_batch("SOON", 5, self.today + timedelta(days=3))
+            self._create_batch("LATER", 10, self.today + timedelta(days=90))
+
+    def _create_batch(
+        self, batch_number: str, quantity: int, expiration_date: object
+    ) -> StockItem:
+        return StockItem.objects.create(
+            product=self.product,
+            batch_number=batch_number,
+            quantity=quantity,
+            cost_price=Decimal("10.00"),
+            selling_price=Decimal("15.00"),
+            expiration_date=expiration_date,
+        )
+
+    def _availability(self) -> ProductAvailability:
+        return ProductAvailability.objects.get(product=self.product)
+
+    def test_stock_writes_refresh_availability(self) -> None:
+        availability = self._availability()
+        self.assertEqual(availability.total_quantity, 15)
+        self.assertEqual(availability.sellable_quantity, 15)
+        self.assertEqual(availability.batch_count, 2)
+        self.assertEqual(
+            availability.earliest_expiration_date, self.today + timedelta(days=3)
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soon.delete()
+        availability = self._availability()
+        self.assertEqual(
+            (availability.total_quantity, availability.batch_count), (10, 1)
+        )
+
+    def test_queryset_deletes_refresh_availability(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            StockItem.objects.filter(batch_number="SOON").delete()
+
+        availability = self._availability()
+        self.assertEqual(
+            (availability.total_quantity, availability.batch_count), (10, 1)
+        )
+
+    def test_sales_refresh_availability(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            create_sale(
+                SaleCreateDTO(
+                    customer_name="John Doe",
+                    customer_email="john@example.com",
+                    customer_phone="",
+                    items=[],
+                    product_items=[
+                        SaleProductItemDTO(product_id=self.product.id, quantity=5)
+                    ],
+                )
+            )
+
+        availability = self._availability()
+        self.assertEqual(availability.sellable_quantity, 10)
+        # The emptied batch is no longer the next to sell.
+        self.assertEqual(
+            availability.earliest_expiration_date, self.today + timedelta(days=90)
+        )
+
+    def test_catalog_imports_refresh_availability(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            import_catalog(
+                [
+                    "sku,name,brand,category,batch_number,quantity,cost_price,"
+                    "selling_price,expiration_date\n",
+                    f"TEST001,Test Product,Test Brand,Test Category,LATER,40,10.00,"
+                    f"15.00,{self.today + timedelta(days=90)}\n",
+                ]
+            )
+
+        self.assertEqual(self._availability().total_quantity, 45)
+
+    def test_expired_batches_are_not_sellable(self) -> None:
+        StockItem.objects.filter(id=self.soon.id).update(
+            expiration_date=self.today - timedelta(days=1)
+        )
+        other = Product.objects.create(
+            name="Other", brand=self.product.brand, category=self.product.category
+        )
+        ProductAvailability.objects.create(
+            product=other, earliest_expiration_date=self.today
+        )
+
+        # Only products whose next batch to sell has expired are recomputed.
+        self.assertEqual(refresh_expired_availability(), 0)
+        ProductAvailability.objects.filter(product=self.product).update(
+            earliest_expiration_date=self.today - timedelta(days=1)
+        )
+        self.assertEqual(refresh_expired_availability(), 1)
+
+        availability = self._availability()
+        self.assertEqual(availability.total_quantity, 15)
+        self.assertEqual(availability.sellable_quantity, 10)
+        self.assertEqual(
+            availability.earliest_expiration_date, self.today + timedelta(days=90)
+        )
+
+    def test_rebuild_covers_every_product(self) -> None:
+        ProductAvailability.objects.all().delete()
+        Product.objects.create(
+            name="Unstocked",
+            brand=self.product.brand,
+            category=self.product.category,
+            sku="TEST002",
+        )
+
+        self.assertEqual(rebuild_product_availability(), 2)
+        self.assertEqual(self._availability().sellable_quantity, 15)
+        empty = ProductAvailability.objects.get(product__sku="TEST002")
+        self.assertEqual((empty.total_quantity, empty.batch_count), (0, 0))
+        self.assertIsNone(empty.earliest_expiration_date)
+
+    def test_new_products_are_low_on_stock(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            unstocked = Product.objects.create(
+                name="Unstocked",
+                brand=self.product.brand,
+                category=self.product.category,
+                sku="TEST002",
+            )
+
+        empty = ProductAvailability.objects.get(product=unstocked)
+        self.assertEqual((empty.total_quantity, empty.batch_count), (0, 0))
+        self.assertEqual(list(get_low_stock_products(threshold=0)), [unstocked])
+
+    def test_migration_backfills_every_product(self) -> None:
+        migration = import_module(
+            "apps.inventory.migrations.0003_backfill_product_availability"
+        )
+        ProductAvailability.objects.all().delete()
+        Product.objects.create(
+            name="Unstocked",
+            brand=self.product.brand,
+            category=self.product.category,
+            sku="TEST002",
+        )
+
+        migration.backfill(apps, SimpleNamespace(connection=connection))
+
+        availability = self._availability()
+        self.assertEqual(availability.total_quantity, 15)
+        self.assertEqual(availability.sellable_quantity, 15)
+        self.assertEqual(availability.batch_count, 2)
+        self.assertEqual(
+            availability.earliest_expiration_date, self.today + timedelta(days=3)
+        )
+        empty = ProductAvailability.objects.get(product__sku="TEST002")
+        self.assertEqual((empty.total_quantity, empty.batch_count), (0, 0))
@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dateutil.relativedelta import relativedelta
+
+from apps.inventory.services import rebuild_product_availability
+from apps.products.factories.factories import ProductFactory, StockItemFactory
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestInventoryViewSet:
+    """Integration tests for the InventoryViewSet."""
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_list_and_retrieve_availability(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that availability is served per product from the aggregate."""
+        today = timezone.now().date()
+        product = ProductFactory.create()
+        StockItemFactory.create(
+            product=product, quantity=4, expiration_date=today - relativedelta(days=1)
+        )
+        StockItemFactory.create(
+            product=product, quantity=6, expiration_date=today + relativedelta(days=9)
+        )
+        other = StockItemFactory.create(quantity=3)
+        rebuild_product_availability()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(reverse("inventory:inventory-list"))
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        # One COUNT and one page of availability rows joined to products.
+        assert len(queries) == 2  # nosec B101
+        assert [row["product"] for row in response.data["results"]] == sorted(
+            [product.id, other.product_id]
+        )  # nosec B101
+
+        response = authenticated_client.get(
+            reverse("inventory:inventory-detail", args=[product.id])
+        )
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert response.data["total_quantity"] == 10  # nosec B101
+        assert response.data["sellable_quantity"] == 6  # nosec B101
+        assert response.data["batch_count"] == 2  # nosec B101
+        assert (
+            response.data["earliest_expiration_date"]
+            == (today + relativedelta(days=9)).isoformat()
+        )  # nosec B101
+        assert response.data["product_sku"] == product.sku  # nosec B101
+
+    def test_order_by_sellable_quantity(self, authenticated_client: APIClient) -> None:
+        """Test that products can be ordered by what is left to sell."""
+        low = StockItemFactory.create(quantity=2)
+        high = StockItemFactory.create(quantity=50)
+        rebuild_product_availability()
+
+        response = authenticated_client.get(
+            reverse("inventory:inventory-list"), {"ordering": "-sellable_quantity"}
+        )
+
+        assert [row["product"] for row in response.data["results"]] == [
+            high.product_id,
+            low.product_id,
+        ]  # nosec B101
@@ -7,7 +7,7 @@ from .views import InventoryViewSet
 app_name = "inventory"
 
 router = DefaultRouter()
-router.register(r"inventory", InventoryViewSet)
+router.register(r"inventory", InventoryViewSet, basename="inventory")
 
 urlpatterns = [
     path("", include(router.urls)),
@@ -1,32 +1,36 @@
-from rest_framework.request import Request
-from rest_framework.response import Response
-from rest_framework.viewsets import ViewSet
+from django.db.models import QuerySet
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import filters, viewsets
 
-from .models import InventoryItem
+from .models import ProductAvailability
+from .serializers import ProductAvailabilitySerializer
+from .services import ensure_availability_current
 
 
-class InventoryViewSet(ViewSet):
+class InventoryViewSet(viewsets.ReadOnlyModelViewSet[ProductAvailability]):
     """
-    A simple ViewSet for inventory operations.
+    Stock on hand per product, looked up by product id.
 
-    Mypy and django-stubs will infer the type of the model
-    from the 'queryset' attribute, providing type safety
-    inside the methods of this class.
+    Served from the maintained `ProductAvailability` rows, so listing the
+    whole catalog reads one table instead of summing every batch.
     """
 
-    queryset = InventoryItem.objects.all()
+    queryset = ProductAvailability.objects.select_related("product").order_by(
+        "product_id"
+    )
+    serializer_class = ProductAvailabilitySerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ["product__brand", "product__category"]
+    ordering_fields = [
+        "product_id",
+        "total_quantity",
+        "sellable_quantity",
+        "earliest_expiration_date",
+    ]
+    ordering = ["product_id"]
+    cursor_ordering = ["product_id"]
 
-    def list(self, request: Request) -> Response:
-        """
-        Handles listing inventory items.
-        """
-        # Because of 'queryset = InventoryItem.objects.all()',
-        # mypy knows that 'self.queryset' is a QuerySet[InventoryItem].
-        # Any operations on self.queryset will be type-checked.
-        return Response({"message": "Inventory list"})
-
-    def retrieve(self, request: Request, pk: int | None = None) -> Response:
-        """
-        Handles retrieving a single inventory item.
-        """
-        return Response({"message": f"Inventory item {pk}"})
+    def get_queryset(self) -> QuerySet[ProductAvailability]:
+        # Batches expiring overnight leave the sellable quantity on first read.
+        ensure_availability_current()
+        return super().get_queryset()
@@ -1,7 +1,11 @@
 from django.contrib import admin
-from typing import TYPE_CHECKING
+from django.db.models import QuerySet
+from django.http import HttpRequest
+from typing import TYPE_CHECKING, Tuple, cast
 
-from .models import Brand, Category, Product, StockItem
+from apps.core.pagination import EstimatedCountPaginator
+
+from .models import Brand, Category, Product, StockItem, StockItemQuerySet
 
 if TYPE_CHECKING:
     BrandAdminBase = admin.ModelAdmin[Brand]
@@ -47,9 +51,12 @@ class ProductAdmin(ProductAdminBase):
     """
 
     list_display = ("name", "sku", "brand", "category", "created_at")
+    list_select_related = ("brand", "category")
     list_filter = ("brand", "category")
     search_fields = ("name", "sku")
     ordering = ("name",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(StockItem)
@@ -64,8 +71,40 @@ class StockItemAdmin(StockItemAdminBase):
         "batch_number",
         "quantity",
         "expiration_date",
-        "discount_percentage",
+        "discount",
     )
-    list_filter = ("expiration_date", "product__brand", "product__category")
+    list_select_related = ("product",)
+    list_filter = ("product__brand", "product__category")
+    date_hierarchy = "expiration_date"
     search_fields = ("product__name", "batch_number")
     ordering = ("expiration_date",)
+    readonly_fields = ("current_discount_percentage", "current_discounted_price")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[StockItem]:
+        """
+        Annotate the discount in SQL instead of computing it for every row.
+        """
+        return cast(StockItemQuerySet, super().get_queryset(request)).with_pricing()
+
+    @admin.display(description="Discount percentage", ordering="discount_percentage")
+    def discount(self, obj: StockItem) -> int:
+        """
+        Show the discount annotated by `with_pricing()`, sortable in SQL.
+        """
+        return obj.discount_percentage
+
+    def get_search_results(
+        self, request: HttpRequest, queryset: QuerySet[StockItem], search_term: str
+    ) -> Tuple[QuerySet[StockItem], bool]:
+        """
+        Offer only batches in stock to the sale item autocomplete, with their
+        product joined for the option labels.
+        """
+        queryset, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if request.GET.get("model_name") == "saleitem":
+            queryset = queryset.filter(quantity__gt=0).select_related("product")
+        return queryset, may_have_duplicates
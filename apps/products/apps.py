@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.products"
+
+    def ready(self) -> None:
+        """
+        Record the catalog rows deleted, for the change feed, and notify the
+        stock changes deleting stock items makes.
+        """
+        from django.db.models.signals import post_delete
+
+        from .models import StockItem, notify_stock_item_deleted
+        from .sync import SYNC_TABLES, record_sync_tombstone
+
+        for table, (model, _) in SYNC_TABLES.items():
+            post_delete.connect(
+                record_sync_tombstone,
+                sender=model,
+                dispatch_uid=f"products.record_sync_tombstone.{table}",
+            )
+        post_delete.connect(
+            notify_stock_item_deleted,
+            sender=StockItem,
+            dispatch_uid="products.notify_stock_item_deleted",
+        )
@@ -0,0 +1,100 @@
+from typing import Any
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django_filters import rest_framework as django_filters
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .models import Product, StockItem
+from .search import product_search_ids, rank_product_search
+
+
+class StockItemFilter(django_filters.FilterSet):  # type: ignore[misc]
+    """
+    Filters for the StockItem API.
+
+    The pricing filters work on the values annotated by
+    `StockItemQuerySet.with_pricing()`, so they are evaluated by the database.
+    """
+
+    discount_percentage = django_filters.NumberFilter()
+    discount_percentage__gte = django_filters.NumberFilter(
+        field_name="discount_percentage", lookup_expr="gte"
+    )
+    discounted_price__gte = django_filters.NumberFilter(
+        field_name="discounted_price", lookup_expr="gte"
+    )
+    discounted_price__lte = django_filters.NumberFilter(
+        field_name="discounted_price", lookup_expr="lte"
+    )
+
+    class Meta:
+        model = StockItem
+        fields = ["product", "product__brand", "product__category"]
+
+
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Product search backed by the product search index.
+
+    A search term equal to a product SKU is answered from the unique SKU index
+    alone. Other searches match product names and descriptions through the
+    full-text index of the database, and SKUs containing the search, see
+    `apps.products.search`, ranking the
+    results by relevance unless the request asks for an explicit `?ordering=`;
+    for that, this filter must come after `OrderingFilter`. Databases without
+    a search index fall back to the substring matching of `SearchFilter`.
+    """
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet[Any], view: APIView
+    ) -> QuerySet[Any]:
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        search = " ".join(terms)
+        if Product.objects.filter(sku=search).exists():
+            return queryset.filter(sku=search)
+
+        vendor = connections[queryset.db].vendor
+        if api_settings.ORDERING_PARAM in request.query_params:
+            product_ids = product_search_ids(terms, vendor)
+            if product_ids is not None:
+                return queryset.filter(id__in=product_ids)
+        else:
+            ranked = rank_product_search(queryset, terms, vendor)
+            if ranked is not None:
+                return ranked.order_by("-search_rank", "name")
+        return super().filter_queryset(request, queryset, view)
+
+
+class StockItemSearchFilter(filters.SearchFilter):
+    """
+    Stock item search by batch number, or product SKU, name and description
+    through the product search index.
+
+    Databases without a search index fall back to the substring matching of
+    `SearchFilter`.
+    """
+
+    def filter_queryset(
+        self, request: Request, queryset: QuerySet[Any], view: APIView
+    ) -> QuerySet[Any]:
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        search = " ".join(terms)
+        if Product.objects.filter(sku=search).exists():
+            return queryset.filter(product__sku=search)
+
+        product_ids = product_search_ids(terms, connections[queryset.db].vendor)
+        if product_ids is None:
+            return super().filter_queryset(request, queryset, view)
+        return queryset.filter(
+            Q(product_id__in=product_ids) | Q(batch_number__icontains=search)
+        )
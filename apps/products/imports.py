@@ -0,0 +1,278 @@
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Type, cast
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from .models import Brand, Category, Product, StockItem, notify_stock_changed
+
+# Supplier catalog files are CSV with a header row naming these columns, one
+# line per received batch. `description` is optional.
+CATALOG_COLUMNS = (
+    "sku",
+    "name",
+    "brand",
+    "category",
+    "batch_number",
+    "quantity",
+    "cost_price",
+    "selling_price",
+    "expiration_date",
+)
+
+# Required text columns, with the model field they are stored in.
+TEXT_COLUMNS: Dict[str, Tuple[Type[models.Model], str]] = {
+    "sku": (Product, "sku"),
+    "name": (Product, "name"),
+    "brand": (Brand, "name"),
+    "category": (Category, "name"),
+    "batch_number": (StockItem, "batch_number"),
+}
+
+# At most this many row errors are reported, the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+# Largest quantity every supported database stores in a PositiveIntegerField.
+MAX_QUANTITY = BaseDatabaseOperations.integer_field_ranges["PositiveIntegerField"][1]
+
+# `description` is only updated when the catalog has that column, so files
+# without it keep the descriptions already stored.
+PRODUCT_UPDATE_FIELDS = ["name", "brand", "category", "updated_at"]
+
+STOCK_ITEM_UPDATE_FIELDS = [
+    "quantity",
+    "cost_price",
+    "selling_price",
+    "expiration_date",
+    "current_discount_percentage",
+    "current_discounted_price",
+    "updated_at",
+]
+
+
+@dataclass
+class CatalogRow:
+    """One validated line of a supplier catalog."""
+
+    sku: str
+    name: str
+    description: str
+    brand: str
+    category: str
+    batch_number: str
+    quantity: int
+    cost_price: Decimal
+    selling_price: Decimal
+    expiration_date: date
+
+
+@dataclass
+class CatalogImportResult:
+    """Outcome of a catalog import."""
+
+    rows: int = 0
+    products: int = 0
+    stock_items: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def import_catalog(
+    lines: Iterable[str], chunk_size: Optional[int] = None
+) -> CatalogImportResult:
+    """
+    Upsert products by SKU and stock items by product and batch number from
+    the lines of a supplier catalog CSV file.
+
+    Lines are read and written in chunks of `chunk_size` rows, each in its own
+    transaction, so only one chunk is held in memory at a time. Brands and
+    categories are resolved by name, and created when missing. Invalid lines
+    are skipped and reported in the result.
+    """
+    chunk_size = chunk_size or settings.PRODUCTS_IMPORT_CHUNK_SIZE
+    result = CatalogImportResult()
+    started = time.perf_counter()
+
+    reader = csv.DictReader(iter(lines))
+    missing = set(CATALOG_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing catalog column(s): {', '.join(sorted(missing))}")
+
+    product_update_fields = PRODUCT_UPDATE_FIELDS
+    if "description" in (reader.fieldnames or ()):
+        product_update_fields = [*PRODUCT_UPDATE_FIELDS, "description"]
+
+    brands = dict(Brand.objects.values_list("name", "id"))
+    categories = dict(Category.objects.values_list("name", "id"))
+    rows = _parse_rows(reader, result)
+    while chunk := list(islice(rows, chunk_size)):
+        _import_chunk(chunk, brands, categories, product_update_fields, result)
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _parse_rows(
+    reader: "csv.DictReader[str]", result: CatalogImportResult
+) -> Iterator[CatalogRow]:
+    for values in reader:
+        try:
+            row = _parse_row(values)
+        except ValueError as e:
+            result.skipped += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(f"Line {reader.line_num}: {e}")
+            continue
+        result.rows += 1
+        yield row
+
+
+def _parse_row(values: Dict[str, str]) -> CatalogRow:
+    text = {name: (values.get(name) or "").strip() for name in CATALOG_COLUMNS}
+    for name, (model, field_name) in TEXT_COLUMNS.items():
+        if not text[name]:
+            raise ValueError(f"{name} is required")
+        max_length = cast(
+            "models.CharField[Any, Any]", model._meta.get_field(field_name)
+        ).max_length
+        if max_length is not None and len(text[name]) > max_length:
+            raise ValueError(f"{name} is longer than {max_length} characters")
+
+    try:
+        quantity = int(text["quantity"])
+        cost_price = Decimal(text["cost_price"])
+        selling_price = Decimal(text["selling_price"])
+    except (ValueError, InvalidOperation):
+        raise ValueError("quantity and prices must be numbers")
+    if not (cost_price.is_finite() and selling_price.is_finite()):
+        raise ValueError("quantity and prices must be numbers")
+    if quantity < 0 or cost_price < 0 or selling_price < 0:
+        raise ValueError("quantity and prices cannot be negative")
+    if quantity > MAX_QUANTITY:
+        raise ValueError(f"quantity cannot be more than {MAX_QUANTITY}")
+    _check_price("cost_price", cost_price)
+    _check_price("selling_price", selling_price)
+    try:
+        expiration_date = date.fromisoformat(text["expiration_date"])
+    except ValueError:
+        raise ValueError("expiration_date must be a date (YYYY-MM-DD)")
+
+    return CatalogRow(
+        sku=text["sku"],
+        name=text["name"],
+        description=(values.get("description") or "").strip(),
+        brand=text["brand"],
+        category=text["category"],
+        batch_number=text["batch_number"],
+        quantity=quantity,
+        cost_price=cost_price,
+        selling_price=selling_price,
+        expiration_date=expiration_date,
+    )
+
+
+def _check_price(name: str, price: Decimal) -> None:
+    """
+    Check that `price` fits the digits and decimal places of its column.
+    """
+    field = cast("models.DecimalField[Any, Any]", StockItem._meta.get_field(name))
+    try:
+        # Trailing zeros, as in "2.500", do not count as decimal places.
+        field.run_validators(price.normalize())
+    except ValidationError:
+        raise ValueError(
+            f"{name} must have at most {field.max_digits} digits and "
+            f"{field.decimal_places} decimal places"
+        )
+
+
+@transaction.atomic
+def _import_chunk(
+    chunk: List[CatalogRow],
+    brands: Dict[str, int],
+    categories: Dict[str, int],
+    product_update_fields: List[str],
+    result: CatalogImportResult,
+) -> None:
+    _create_missing(Brand, {row.brand for row in chunk}, brands)
+    _create_missing(Category, {row.category for row in chunk}, categories)
+
+    # A SKU or batch listed twice in a chunk takes the values of its last line,
+    # as the same row cannot be upserted twice in one statement.
+    products = {
+        row.sku: Product(
+            sku=row.sku,
+            name=row.name,
+            description=row.description,
+            brand_id=brands[row.brand],
+            category_id=categories[row.category],
+        )
+        for row in chunk
+    }
+    Product.objects.bulk_create(
+        products.values(),
+        update_conflicts=True,
+        unique_fields=["sku"],
+        update_fields=product_update_fields,
+    )
+    product_ids = dict(
+        Product.objects.filter(sku__in=products).values_list("sku", "id")
+    )
+
+    stock_items: Dict[Tuple[int, str], StockItem] = {}
+    for row in chunk:
+        stock_item = StockItem(
+            product_id=product_ids[row.sku],
+            batch_number=row.batch_number,
+            quantity=row.quantity,
+            cost_price=row.cost_price,
+            selling_price=row.selling_price,
+            expiration_date=row.expiration_date,
+        )
+        # Materialize the discount tier as `StockItem.save()` would.
+        stock_item.current_discount_percentage = (
+            stock_item._compute_discount_percentage()
+        )
+        stock_item.current_discounted_price = stock_item._compute_discounted_price()
+        stock_items[(product_ids[row.sku], row.batch_number)] = stock_item
+    StockItem.objects.bulk_create(
+        stock_items.values(),
+        update_conflicts=True,
+        unique_fields=["product", "batch_number"],
+        update_fields=STOCK_ITEM_UPDATE_FIELDS,
+    )
+    notify_stock_changed(product_ids.values())
+
+    result.products += len(products)
+    result.stock_items += len(stock_items)
+
+
+def _create_missing(
+    model: Type[models.Model], names: Iterable[str], ids: Dict[str, int]
+) -> None:
+    """
+    Create the brands or categories named `names` that are not in `ids` yet,
+    and add them to it.
+    """
+    missing = set(names) - set(ids)
+    if not missing:
+        return
+    model._default_manager.bulk_create(
+        [model(name=name) for name in missing],
+        ignore_conflicts=True,
+    )
+    ids.update(
+        model._default_manager.filter(name__in=missing).values_list("name", "id")
+    )
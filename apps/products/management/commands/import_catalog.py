@@ -0,0 +1,47 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from apps.products.imports import import_catalog
+
+
+class Command(BaseCommand):
+    """
+    Upserts products and stock items from a supplier catalog CSV file.
+    """
+
+    help = "Import a supplier catalog CSV, upserting products and stock items."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add arguments to select the file and the import chunk size.
+        """
+        parser.add_argument("path", help="Catalog CSV file to import")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            help="Lines upserted per transaction, defaults to "
+            "PRODUCTS_IMPORT_CHUNK_SIZE",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as lines:
+                result = import_catalog(lines, chunk_size=options["chunk_size"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result.errors:
+            self.stderr.write(error)
+        if result.skipped > len(result.errors):
+            self.stderr.write(
+                f"... and {result.skipped - len(result.errors)} more invalid lines"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result.rows} lines ({result.products} products, "
+                f"{result.stock_items} stock items) in {result.seconds:.2f}s, "
+                f"{result.rows_per_second:,.0f} lines/s; "
+                f"skipped {result.skipped} invalid lines."
+            )
+        )
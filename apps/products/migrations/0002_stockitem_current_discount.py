@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="stockitem",
+            name="current_discount_percentage",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="stockitem",
+            name="current_discounted_price",
+            field=models.DecimalField(
+                blank=True, decimal_places=4, max_digits=14, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0002_stockitem_current_discount"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stockitem",
+            index=models.Index(
+                fields=["expiration_date", "id"], name="products_st_expirat_2fc48c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+from typing import Callable, Dict, List
+
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+
+# Product search indexes, see apps.products.search. They live outside the
+# model state because they are specific to each database.
+
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE products_product ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX products_product_search_vector_idx"
+    " ON products_product USING gin (search_vector)",
+    "CREATE INDEX products_product_name_trgm_idx"
+    " ON products_product USING gin (name gin_trgm_ops)",
+    "CREATE INDEX products_product_description_trgm_idx"
+    " ON products_product USING gin (description gin_trgm_ops)",
+]
+
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS products_product_description_trgm_idx",
+    "DROP INDEX IF EXISTS products_product_name_trgm_idx",
+    "DROP INDEX IF EXISTS products_product_search_vector_idx",
+    "ALTER TABLE products_product DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE products_product_fts USING fts5(
+        name, description, content='products_product', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER products_product_fts_insert AFTER INSERT ON products_product
+    BEGIN
+        INSERT INTO products_product_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_fts_delete AFTER DELETE ON products_product
+    BEGIN
+        INSERT INTO products_product_fts
+            (products_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_fts_update AFTER UPDATE ON products_product
+    BEGIN
+        INSERT INTO products_product_fts
+            (products_product_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO products_product_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO products_product_fts (products_product_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS products_product_fts_update",
+    "DROP TRIGGER IF EXISTS products_product_fts_delete",
+    "DROP TRIGGER IF EXISTS products_product_fts_insert",
+    "DROP TABLE IF EXISTS products_product_fts",
+]
+
+
+def _run(
+    statements_by_vendor: Dict[str, List[str]]
+) -> Callable[[Apps, BaseDatabaseSchemaEditor], None]:
+    def run(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0003_stockitem_expiration_date_id_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"postgresql": POSTGRESQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"postgresql": POSTGRESQL_REVERSE, "sqlite": SQLITE_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:35
+
+from django.apps.registry import Apps
+from django.db import migrations, models
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import Count, Min
+
+# Batches recorded twice for a product before the constraint existed keep
+# their first row as is, and the others are renamed "<batch>-dup<id>". Merging
+# them would lose their own prices and expiry, and deleting them the sales of
+# those batches.
+
+
+def rename_duplicate_batches(
+    apps: Apps, schema_editor: BaseDatabaseSchemaEditor
+) -> None:
+    StockItem = apps.get_model("products", "StockItem")
+    stock_items = StockItem.objects.using(schema_editor.connection.alias)
+    max_length = StockItem._meta.get_field("batch_number").max_length
+    duplicates = (
+        stock_items.order_by()
+        .values("product_id", "batch_number")
+        .annotate(count=Count("id"), first_id=Min("id"))
+        .filter(count__gt=1)
+    )
+    for group in duplicates:
+        renamed = stock_items.filter(
+            product_id=group["product_id"], batch_number=group["batch_number"]
+        ).exclude(id=group["first_id"])
+        for stock_item in renamed:
+            suffix = f"-dup{stock_item.id}"
+            stock_item.batch_number = (
+                group["batch_number"][: max_length - len(suffix)] + suffix
+            )
+            stock_item.save(update_fields=["batch_number"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0004_product_search"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_batches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="stockitem",
+            constraint=models.UniqueConstraint(
+                fields=("product", "batch_number"), name="unique_product_batch"
+            ),
+        ),
+    ]
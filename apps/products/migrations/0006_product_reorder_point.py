@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0005_stockitem_unique_product_batch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="reorder_point",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
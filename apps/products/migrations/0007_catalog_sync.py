@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0006_product_reorder_point"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("table", models.CharField(max_length=20)),
+                ("object_id", models.BigIntegerField()),
+                ("deleted_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["updated_at"], name="products_pr_updated_150263_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockitem",
+            index=models.Index(
+                fields=["updated_at"], name="products_st_updated_40d10d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="synctombstone",
+            index=models.Index(
+                fields=["deleted_at"], name="products_sy_deleted_5e0b9c_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.apps.registry import Apps
+from django.db import migrations
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+
+# Trigram index serving the SKU substring search of apps.products.search on
+# PostgreSQL, where pg_trgm was enabled by 0004_product_search. Other databases
+# scan the SKU column, as LIKE '%...%' cannot use a b-tree index.
+
+
+def create_index(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX products_product_sku_trgm_idx"
+            " ON products_product USING gin (sku gin_trgm_ops)"
+        )
+
+
+def drop_index(apps: Apps, schema_editor: BaseDatabaseSchemaEditor) -> None:
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS products_product_sku_trgm_idx")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0007_catalog_sync"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,8 +1,36 @@
+import logging
+import uuid
+from datetime import date, timedelta
 from decimal import Decimal
+from typing import Any, Iterable, Optional, Set
 
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Case, ExpressionWrapper, F, Value, When
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
 from django.utils import timezone
 
+# Discount tiers applied to stock close to its expiration date, as
+# (maximum days until expiration, discount percentage), nearest first.
+DISCOUNT_TIERS = ((60, 35), (120, 25), (180, 15))
+
+# Cache key holding the ISO date of the last `refresh_stock_pricing` run.
+PRICING_REFRESHED_ON_CACHE_KEY = "products:stock_pricing_refreshed_on"
+
+# Cache key holding the version of the cached inventory reports.
+INVENTORY_VERSION_CACHE_KEY = "products:inventory_version"
+
+# Cache key holding the version of cached stock item prices, which unlike the
+# inventory reports do not depend on the quantities in stock.
+STOCK_PRICES_VERSION_CACHE_KEY = "products:stock_prices_version"
+
+# Sent once a transaction changing stock quantities or expiration dates
+# commits, with the ids of the affected products as `product_ids`.
+stock_changed = Signal()
+
+logger = logging.getLogger(__name__)
+
 
 class Brand(models.Model):
     """
@@ -54,6 +82,9 @@ class Product(models.Model):
     brand = models.ForeignKey(Brand, on_delete=models.CASCADE, db_index=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE, db_index=True)
     sku = models.CharField(max_length=50, unique=True, db_index=True)
+    # Sellable quantity at or below which the product is low on stock, see
+    # `get_low_stock_products`. Products without one use the given threshold.
+    reorder_point = models.PositiveIntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -64,11 +95,184 @@ class Product(models.Model):
             models.Index(fields=["sku"]),
             models.Index(fields=["brand"]),
             models.Index(fields=["category"]),
+            # Change feed of the catalog, see `apps.products.sync`.
+            models.Index(fields=["updated_at"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.sku})"
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Drop the cached inventory reports, which depend on the reorder point.
+
+        A new product gets its availability row, with nothing in stock, so it
+        is low on stock until stocked.
+        """
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if adding:
+            notify_stock_changed([self.pk], prices_changed=False)
+        else:
+            transaction.on_commit(invalidate_inventory_reports, robust=True)
+
+
+def stock_pricing_refreshed_today() -> bool:
+    """
+    Return whether the stored discount columns were refreshed for today.
+    """
+    refreshed_on = cache.get(PRICING_REFRESHED_ON_CACHE_KEY)
+    return bool(refreshed_on == timezone.now().date().isoformat())
+
+
+def get_inventory_version() -> str:
+    """
+    Return the version of the cached inventory reports.
+    """
+    return str(cache.get_or_set(INVENTORY_VERSION_CACHE_KEY, uuid.uuid4().hex, None))
+
+
+def invalidate_inventory_reports() -> None:
+    """
+    Mark the cached inventory reports as outdated after stock changed.
+    """
+    cache.set(INVENTORY_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def get_stock_prices_version() -> str:
+    """
+    Return the version of the cached stock item prices.
+    """
+    return str(cache.get_or_set(STOCK_PRICES_VERSION_CACHE_KEY, uuid.uuid4().hex, None))
+
+
+def invalidate_stock_prices() -> None:
+    """
+    Mark the cached stock item prices as outdated after stock was edited.
+    """
+    cache.set(STOCK_PRICES_VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def notify_stock_changed(
+    product_ids: Iterable[int], prices_changed: bool = True
+) -> None:
+    """
+    Once the current transaction commits, invalidate the cached inventory
+    reports and send `stock_changed` for the products whose stock changed.
+
+    Cached stock item prices are invalidated too, unless only quantities
+    changed.
+    """
+    changed = set(product_ids)
+    # The stock change is committed by then, so a failure is logged rather
+    # than raised to the code that made it.
+    transaction.on_commit(invalidate_inventory_reports, robust=True)
+    if prices_changed:
+        transaction.on_commit(invalidate_stock_prices, robust=True)
+    transaction.on_commit(lambda: _send_stock_changed(changed), robust=True)
+
+
+def notify_stock_item_deleted(
+    sender: Any, instance: "StockItem", origin: Any = None, **kwargs: Any
+) -> None:
+    """
+    Receiver of `post_delete` for stock items, which also covers queryset
+    deletes such as the admin's bulk action.
+
+    Stock items deleted along with their product are skipped, as the
+    product's availability goes with it.
+    """
+    if isinstance(origin, (StockItem, StockItemQuerySet)):
+        notify_stock_changed([instance.product_id])
+
+
+def _send_stock_changed(product_ids: Set[int]) -> None:
+    for receiver, response in stock_changed.send_robust(
+        sender=StockItem, product_ids=product_ids
+    ):
+        if isinstance(response, Exception):
+            logger.error(
+                "Receiver %r of stock_changed failed for products %s",
+                receiver,
+                sorted(product_ids),
+                exc_info=response,
+            )
+
+
+def discount_percentage_expression(today: date) -> Case:
+    """
+    Build the SQL expression computing a stock item's discount percentage.
+    """
+    return Case(
+        *[
+            When(
+                expiration_date__lte=today + timedelta(days=days),
+                then=Value(percentage),
+            )
+            for days, percentage in DISCOUNT_TIERS
+        ],
+        default=Value(0),
+        output_field=models.IntegerField(),
+    )
+
+
+def discounted_price_expression(today: date) -> "ExpressionWrapper[Any]":
+    """
+    Build the SQL expression computing a stock item's discounted price.
+    """
+    # Multiply by the remaining fraction rather than dividing in SQL, so that
+    # databases without decimal arithmetic do not truncate the result.
+    price_multiplier = Case(
+        *[
+            When(
+                expiration_date__lte=today + timedelta(days=days),
+                then=Value(Decimal(100 - percentage) / Decimal(100)),
+            )
+            for days, percentage in DISCOUNT_TIERS
+        ],
+        default=Value(Decimal("1.00")),
+        output_field=models.DecimalField(max_digits=3, decimal_places=2),
+    )
+    return ExpressionWrapper(
+        F("selling_price") * price_multiplier,
+        output_field=models.DecimalField(max_digits=14, decimal_places=4),
+    )
+
+
+class StockItemQuerySet(models.QuerySet["StockItem"]):
+    def with_pricing(self) -> "StockItemQuerySet":
+        """
+        Annotate each stock item with its `discount_percentage` and
+        `discounted_price`.
+
+        Once the nightly refresh has run for today the stored
+        `current_discount_percentage` and `current_discounted_price` columns
+        are used; otherwise (and for rows not materialized yet) the values are
+        computed by the database from the expiration date. Either way the
+        annotations can be filtered and ordered on, and take precedence over
+        the Python properties of the same name on the returned instances.
+        """
+        today = timezone.now().date()
+        discount_percentage: Any = discount_percentage_expression(today)
+        discounted_price: Any = discounted_price_expression(today)
+
+        if stock_pricing_refreshed_today():
+            discount_percentage = Coalesce(
+                F("current_discount_percentage"),
+                discount_percentage,
+                output_field=models.IntegerField(),
+            )
+            discounted_price = Coalesce(
+                F("current_discounted_price"),
+                discounted_price,
+                output_field=models.DecimalField(max_digits=14, decimal_places=4),
+            )
+
+        return self.annotate(
+            discount_percentage=discount_percentage,
+            discounted_price=discounted_price,
+        )
+
 
 class StockItem(models.Model):
     """
@@ -81,20 +285,83 @@ class StockItem(models.Model):
     cost_price = models.DecimalField(max_digits=10, decimal_places=2)
     selling_price = models.DecimalField(max_digits=10, decimal_places=2)
     expiration_date = models.DateField(db_index=True)
+    # Discount tier materialized by `refresh_stock_pricing`, see `with_pricing`.
+    # Rows written without `save()` (e.g. bulk inserts) are left NULL until the
+    # next refresh and priced from the expiration date meanwhile.
+    current_discount_percentage = models.PositiveSmallIntegerField(
+        null=True, blank=True
+    )
+    current_discounted_price = models.DecimalField(
+        max_digits=14, decimal_places=4, null=True, blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StockItemQuerySet.as_manager()
+
     class Meta:
         ordering = ["expiration_date"]
         indexes = [
             models.Index(fields=["product"]),
             models.Index(fields=["batch_number"]),
             models.Index(fields=["expiration_date"]),
+            # Cursor pagination order, see `StockItemViewSet.cursor_ordering`.
+            models.Index(fields=["expiration_date", "id"]),
+            # Change feed of the catalog, see `apps.products.sync`.
+            models.Index(fields=["updated_at"]),
+        ]
+        constraints = [
+            # Identifies a batch in supplier catalog imports, see
+            # `apps.products.imports`.
+            models.UniqueConstraint(
+                fields=["product", "batch_number"], name="unique_product_batch"
+            ),
         ]
 
     def __str__(self) -> str:
         return f"{self.product.name} - {self.batch_number}"
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Keep the stored discount columns in step with the price and expiry.
+        """
+        # Accept ISO strings as the database would, since the tier needs a date.
+        if isinstance(self.expiration_date, str):
+            self.expiration_date = date.fromisoformat(self.expiration_date)
+        self.current_discount_percentage = self._compute_discount_percentage()
+        self.current_discounted_price = self._compute_discounted_price()
+        # Pricing annotated by `with_pricing` is outdated once saved.
+        self.__dict__.pop("_discount_percentage", None)
+        self.__dict__.pop("_discounted_price", None)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"selling_price", "expiration_date"} & set(
+            update_fields
+        ):
+            kwargs["update_fields"] = {
+                *update_fields,
+                "current_discount_percentage",
+                "current_discounted_price",
+            }
+        super().save(*args, **kwargs)
+        notify_stock_changed([self.product_id])
+
+    def _compute_discount_percentage(self) -> int:
+        today = timezone.now().date()
+        diff = self.expiration_date - today
+        diff_days = diff.days
+
+        for days, percentage in DISCOUNT_TIERS:
+            if diff_days <= days:
+                return percentage
+        return 0
+
+    def _compute_discounted_price(self) -> Decimal:
+        discount = Decimal(self.selling_price) * (
+            Decimal(self._compute_discount_percentage()) / Decimal(100)
+        )
+        return Decimal(self.selling_price) - discount
+
     @property
     def discount_percentage(self) -> int:
         """
@@ -103,26 +370,49 @@ class StockItem(models.Model):
         25% if expires in 3-4 months
         15% if expires in 5-6 months
         0% otherwise
+
+        Uses the value annotated by `StockItemQuerySet.with_pricing()` when the
+        instance was loaded with it.
         """
-        today = timezone.now().date()
-        diff = self.expiration_date - today
-        diff_days = diff.days
+        annotated: Optional[int] = self.__dict__.get("_discount_percentage")
+        if annotated is not None:
+            return annotated
+        return self._compute_discount_percentage()
 
-        if diff_days <= 60:  # 2 months
-            return 35
-        elif diff_days <= 120:  # 4 months
-            return 25
-        elif diff_days <= 180:  # 6 months
-            return 15
-        else:
-            return 0
+    @discount_percentage.setter
+    def discount_percentage(self, value: int) -> None:
+        self.__dict__["_discount_percentage"] = value
 
     @property
     def discounted_price(self) -> Decimal:
         """
         Calculate the discounted price based on discount percentage.
         """
-        discount = Decimal(self.selling_price) * (
-            Decimal(self.discount_percentage) / Decimal(100)
-        )
-        return Decimal(self.selling_price) - discount
+        annotated: Optional[Decimal] = self.__dict__.get("_discounted_price")
+        if annotated is not None:
+            return annotated
+        return self._compute_discounted_price()
+
+    @discounted_price.setter
+    def discounted_price(self, value: Decimal) -> None:
+        self.__dict__["_discounted_price"] = value
+
+
+class SyncTombstone(models.Model):
+    """
+    Deleted catalog row, served by the catalog change feed until pruned, see
+    `apps.products.sync`.
+    """
+
+    # Section of the change feed the row was in, e.g. "stock_items".
+    table = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.table} {self.object_id}"
@@ -0,0 +1,93 @@
+from typing import Any, List, Optional
+
+from django.db.models import FloatField, QuerySet
+from django.db.models.expressions import RawSQL
+
+# Full-text search over product names and descriptions, and substring search
+# over SKUs.
+#
+# The indexes are created by migration 0004_product_search for the database in
+# use and kept up to date by the database itself on every product write: a
+# generated `search_vector` column with GIN and pg_trgm indexes on PostgreSQL,
+# and an FTS5 table maintained by triggers on SQLite. SKUs are matched with
+# LIKE, through the pg_trgm index of migration 0008_product_sku_trgm on
+# PostgreSQL and by scanning the SKU column on SQLite. Other databases have no
+# search index, and callers fall back to substring matching.
+
+FTS_TABLE = "products_product_fts"
+
+
+def product_search_ids(terms: List[str], vendor: str) -> Optional[RawSQL]:
+    """
+    Return a subquery of the ids of the products matching all search terms.
+
+    Returns None when the database has no product search index.
+    """
+    query = " ".join(terms)
+    if vendor == "postgresql":
+        return RawSQL(
+            "SELECT id FROM products_product"
+            " WHERE search_vector @@ websearch_to_tsquery('simple', %s)"
+            " OR name %% %s OR %s <%% description OR sku ILIKE %s",
+            [query, query, query, _like_contains(query)],
+        )
+    if vendor == "sqlite":
+        # LIKE is case-insensitive for ASCII on SQLite.
+        return RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+            " UNION SELECT id FROM products_product WHERE sku LIKE %s ESCAPE '\\'",
+            [_fts5_query(terms), _like_contains(query)],
+        )
+    return None
+
+
+def rank_product_search(
+    queryset: QuerySet[Any], terms: List[str], vendor: str
+) -> Optional[QuerySet[Any]]:
+    """
+    Restrict a product queryset to the products matching all search terms,
+    annotated with their relevance as `search_rank`, higher being better.
+
+    Returns None when the database has no product search index.
+    """
+    query = " ".join(terms)
+    if vendor == "postgresql":
+        rank = RawSQL(
+            "ts_rank(products_product.search_vector,"
+            " websearch_to_tsquery('simple', %s))"
+            " + similarity(products_product.name, %s)",
+            [query, query],
+            output_field=FloatField(),
+        )
+    elif vendor == "sqlite":
+        # The `rank` column of the FTS table is the bm25() score, which is
+        # lower for better matches. The matches are materialized once by the
+        # CTE and looked up per product; querying the FTS table for every
+        # product, which SQLite does when the subquery can be flattened, runs
+        # the full-text query again each time and is quadratic. Products only
+        # matched by SKU rank last.
+        rank = RawSQL(
+            "COALESCE((WITH matches AS MATERIALIZED"
+            f" (SELECT rowid AS id, -rank AS score FROM {FTS_TABLE}"
+            f" WHERE {FTS_TABLE} MATCH %s)"
+            " SELECT score FROM matches WHERE matches.id = products_product.id), 0)",
+            [_fts5_query(terms)],
+            output_field=FloatField(),
+        )
+    else:
+        return None
+    ids = product_search_ids(terms, vendor)
+    ranked: QuerySet[Any] = queryset.filter(id__in=ids).annotate(search_rank=rank)
+    return ranked
+
+
+def _fts5_query(terms: List[str]) -> str:
+    # Quote every term so that user input cannot use the FTS5 query syntax,
+    # and match it as a prefix so that partial names are found while typing.
+    return " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def _like_contains(term: str) -> str:
+    # Escape the LIKE wildcards so that they are matched literally.
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.fieldsets import SparseFieldsetSerializerMixin
+
 from .models import Brand, Category, Product, StockItem
 
 
@@ -17,7 +19,9 @@ class CategorySerializer(serializers.ModelSerializer[Category]):
         read_only_fields = ("created_at", "updated_at")
 
 
-class ProductSerializer(serializers.ModelSerializer[Product]):
+class ProductSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer[Product]
+):
     brand_name = serializers.CharField(source="brand.name", read_only=True)
     category_name = serializers.CharField(source="category.name", read_only=True)
 
@@ -27,7 +31,9 @@ class ProductSerializer(serializers.ModelSerializer[Product]):
         read_only_fields = ("created_at", "updated_at")
 
 
-class StockItemSerializer(serializers.ModelSerializer[StockItem]):
+class StockItemSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer[StockItem]
+):
     product_name = serializers.CharField(source="product.name", read_only=True)
     brand_name = serializers.CharField(source="product.brand.name", read_only=True)
     category_name = serializers.CharField(
@@ -42,7 +48,9 @@ class StockItemSerializer(serializers.ModelSerializer[StockItem]):
 
     class Meta:
         model = StockItem
-        fields = "__all__"
+        # The stored discount columns back `discount_percentage` and
+        # `discounted_price`, which are served instead.
+        exclude = ("current_discount_percentage", "current_discounted_price")
         read_only_fields = (
             "created_at",
             "updated_at",
@@ -54,4 +62,4 @@ class StockItemSerializer(serializers.ModelSerializer[StockItem]):
 class StockItemCreateSerializer(serializers.ModelSerializer[StockItem]):
     class Meta:
         model = StockItem
-        fields = "__all__"
+        exclude = ("current_discount_percentage", "current_discounted_price")
@@ -1,10 +1,41 @@
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.db.models.query import QuerySet
 from django.db.models.manager import Manager
 
 from dateutil.relativedelta import relativedelta
 
-from .models import StockItem
+from apps.inventory.services import ensure_availability_current
+
+from .models import (
+    DISCOUNT_TIERS,
+    PRICING_REFRESHED_ON_CACHE_KEY,
+    Product,
+    StockItem,
+    discount_percentage_expression,
+    discounted_price_expression,
+    get_inventory_version,
+)
+
+# Groupings accepted by `get_inventory_value`, mapped to the grouped field.
+INVENTORY_VALUE_GROUPINGS = {
+    "brand": "product__brand__name",
+    "category": "product__category__name",
+}
 
 
 def get_expiring_products(days: int = 30) -> QuerySet[StockItem, Manager[StockItem]]:
@@ -25,16 +56,179 @@ def get_expiring_products(days: int = 30) -> QuerySet[StockItem, Manager[StockIt
 
 def get_low_stock_products(
     threshold: int = 10,
-) -> QuerySet[StockItem, Manager[StockItem]]:
+) -> QuerySet[Product, Manager[Product]]:
     """
-    Get products with stock below the specified threshold.
+    Get the products whose sellable stock, summed over their batches, is at
+    or below their reorder point.
+
+    Read from the maintained per-product availability, so no batches are
+    aggregated.
 
     Args:
-        threshold (int): Minimum stock level
+        threshold (int): Reorder point of products without their own
+
+    Returns:
+        QuerySet: Products low on stock, with their availability
+    """
+    ensure_availability_current()
+    return Product.objects.filter(
+        availability__sellable_quantity__lte=Coalesce(
+            F("reorder_point"), Value(threshold)
+        )
+    ).select_related("brand", "category", "availability")
+
+
+def refresh_stock_pricing() -> int:
+    """
+    Store today's discount tier on the stock items whose tier has changed.
+
+    A tier only changes when the days left until expiration cross one of the
+    tier boundaries, so only rows whose expiration date crossed a boundary
+    since the previous refresh are examined. When the previous refresh is
+    unknown, every row close enough to expiration to carry a discount is.
 
     Returns:
-        QuerySet: Stock items with quantity below threshold
+        int: Number of stock items updated
     """
-    return StockItem.objects.filter(quantity__lte=threshold).select_related(
-        "product", "product__brand", "product__category"
+    today = timezone.now().date()
+    refreshed_on = cache.get(PRICING_REFRESHED_ON_CACHE_KEY)
+
+    if refreshed_on is not None:
+        last_run = date.fromisoformat(refreshed_on)
+        window = Q()
+        for days, _ in DISCOUNT_TIERS:
+            window |= Q(
+                expiration_date__gt=last_run + relativedelta(days=days),
+                expiration_date__lte=today + relativedelta(days=days),
+            )
+    else:
+        longest = max(days for days, _ in DISCOUNT_TIERS)
+        window = Q(expiration_date__lte=today + relativedelta(days=longest))
+
+    discount_percentage = discount_percentage_expression(today)
+    updated = (
+        StockItem.objects.filter(window)
+        .exclude(current_discount_percentage=discount_percentage)
+        .update(
+            current_discount_percentage=discount_percentage,
+            current_discounted_price=discounted_price_expression(today),
+            updated_at=timezone.now(),
+        )
     )
+
+    cache.set(PRICING_REFRESHED_ON_CACHE_KEY, today.isoformat(), None)
+    return updated
+
+
+def get_inventory_value(group_by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Calculate the total value of the inventory at cost and selling price.
+
+    The totals are computed by the database and cached until stock changes,
+    see `invalidate_inventory_reports`.
+
+    Args:
+        group_by: Optionally "brand" or "category", to also break the totals
+            down by that grouping.
+
+    Returns:
+        Dict: The totals as strings, with a "groups" list when grouped.
+
+    Raises:
+        ValueError: If `group_by` is not a supported grouping.
+    """
+    if group_by is not None and group_by not in INVENTORY_VALUE_GROUPINGS:
+        raise ValueError(
+            "group_by must be one of: " + ", ".join(sorted(INVENTORY_VALUE_GROUPINGS))
+        )
+
+    cache_key = f"products:inventory_value:{get_inventory_version()}:{group_by or ''}"
+    cached_result: Optional[Dict[str, Any]] = cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    values = {
+        "total_cost_value": Sum(_stock_value("cost_price")),
+        "total_selling_value": Sum(_stock_value("selling_price")),
+    }
+    result = _format_inventory_value(StockItem.objects.aggregate(**values))
+
+    if group_by is not None:
+        field = INVENTORY_VALUE_GROUPINGS[group_by]
+        result["groups"] = [
+            {"name": row[field], **_format_inventory_value(row)}
+            for row in StockItem.objects.values(field)
+            .annotate(**values)
+            .order_by(field)
+        ]
+
+    # Cache for 1 hour (3600 seconds), or until the stock changes.
+    cache.set(cache_key, result, 3600)
+    return result
+
+
+def _stock_value(price_field: str) -> "ExpressionWrapper[Any]":
+    return ExpressionWrapper(
+        F(price_field) * F("quantity"),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+def _format_inventory_value(totals: Dict[str, Any]) -> Dict[str, Any]:
+    # Convert Decimal values to strings for the API response.
+    cost_value = totals["total_cost_value"] or Decimal("0")
+    selling_value = totals["total_selling_value"] or Decimal("0")
+    return {
+        "total_cost_value": str(cost_value),
+        "total_selling_value": str(selling_value),
+        "potential_profit": str(selling_value - cost_value),
+    }
+
+
+def get_inventory_summary(threshold: int = 10, days: int = 30) -> Dict[str, Any]:
+    """
+    Summarize the inventory status.
+
+    The totals and low stock batches are counted in one scan of the stock
+    items, while the expiring stock is counted from the index on
+    `expiration_date` rather than in that scan.
+
+    `low_stock_products` and `expiring_items` match `get_low_stock_products`
+    and `get_expiring_products` for the same arguments, while
+    `low_stock_items` counts the batches holding `threshold` or less. Results
+    are cached until stock changes, see `invalidate_inventory_reports`.
+
+    Args:
+        threshold (int): Quantity at or below which stock counts as low
+        days (int): Number of days ahead to count expiring stock
+
+    Returns:
+        Dict: Item and quantity totals with the low and expiring stock counts
+    """
+    today = timezone.now().date()
+    cache_key = (
+        f"products:inventory_summary:{get_inventory_version()}:"
+        f"{today.isoformat()}:{threshold}:{days}"
+    )
+    cached_result: Optional[Dict[str, Any]] = cache.get(cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    totals = StockItem.objects.aggregate(
+        total_products=Count("id"),
+        total_quantity=Sum("quantity"),
+        low_stock_items=Count("id", filter=Q(quantity__lte=threshold)),
+    )
+    result = {
+        **totals,
+        "total_quantity": totals["total_quantity"] or 0,
+        "expiring_items": StockItem.objects.filter(
+            expiration_date__gte=today,
+            expiration_date__lte=today + relativedelta(days=days),
+        ).count(),
+        "low_stock_products": get_low_stock_products(threshold).count(),
+    }
+
+    # Cache for 1 hour (3600 seconds), or until the stock changes.
+    cache.set(cache_key, result, 3600)
+    return result
@@ -0,0 +1,209 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from rest_framework import serializers
+
+from .models import (
+    Brand,
+    Category,
+    Product,
+    StockItem,
+    SyncTombstone,
+    get_stock_prices_version,
+)
+
+# POS terminals keep a copy of the catalog, synced through a change feed. The
+# first sync, and any sync whose cursor is older than the tombstones kept,
+# gets the full snapshot, built once per stock prices version and day and
+# served gzip-compressed from the cache to every terminal. Later syncs pass
+# the cursor returned by the previous one and get the rows updated since,
+# through the `updated_at` indexes, and the ids deleted since, from the
+# tombstones.
+#
+# A cursor is the time of the sync less `PRODUCTS_SYNC_CURSOR_LAG_SECONDS`, so
+# that rows saved by transactions still running then are not missed. Rows can
+# therefore be sent twice, and terminals upsert them by id. A snapshot is only
+# the starting point of the syncs following it, so it is not rebuilt when
+# quantities change: those syncs catch up with the rows updated since.
+
+SYNC_SNAPSHOT_CACHE_PREFIX = "products:sync_snapshot"
+
+# Cursors are the microseconds elapsed since this time.
+CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Change feed sections, with the (column name, lookup) pairs of their rows.
+SYNC_TABLES: Dict[str, Tuple[Type[models.Model], List[Tuple[str, str]]]] = {
+    "brands": (Brand, [("id", "id"), ("name", "name")]),
+    "categories": (Category, [("id", "id"), ("name", "name")]),
+    "products": (
+        Product,
+        [
+            ("id", "id"),
+            ("sku", "sku"),
+            ("name", "name"),
+            ("description", "description"),
+            ("brand", "brand_id"),
+            ("category", "category_id"),
+        ],
+    ),
+    "stock_items": (
+        StockItem,
+        [
+            ("id", "id"),
+            ("product", "product_id"),
+            ("batch_number", "batch_number"),
+            ("quantity", "quantity"),
+            ("selling_price", "selling_price"),
+            ("discount_percentage", "discount_percentage"),
+            ("discounted_price", "discounted_price"),
+            ("expiration_date", "expiration_date"),
+        ],
+    ),
+}
+
+
+# Columns computed by the database, formatted as the REST serializers do, see
+# `StockItemSerializer`.
+SYNC_COLUMN_FIELDS: Dict[str, Dict[str, serializers.Field[Any, Any, Any, Any]]] = {
+    "stock_items": {
+        "discounted_price": serializers.DecimalField(max_digits=10, decimal_places=2),
+    },
+}
+
+
+def get_catalog_changes(cursor: Optional[datetime] = None) -> bytes:
+    """
+    Return the gzip-compressed JSON of the catalog changes since `cursor`,
+    or the full snapshot when there is no cursor or it is older than the
+    tombstones kept.
+
+    The payload has the `cursor` to pass to the next sync, whether it is the
+    `full` catalog, the changed rows of each section as `columns` and `rows`,
+    and the `deleted` ids of each section.
+    """
+    oldest = timezone.now() - timedelta(days=settings.PRODUCTS_SYNC_TOMBSTONE_DAYS)
+    if cursor is None or cursor < oldest:
+        return get_catalog_snapshot()
+    return _compress(_catalog_payload(cursor))
+
+
+def get_catalog_snapshot() -> bytes:
+    """
+    Return the gzip-compressed JSON of the full catalog, built at most once
+    per stock prices version and day.
+    """
+    key = (
+        f"{SYNC_SNAPSHOT_CACHE_PREFIX}:{get_stock_prices_version()}:"
+        f"{timezone.now().date().isoformat()}"
+    )
+    snapshot: Optional[bytes] = cache.get(key)
+    if snapshot is None:
+        snapshot = _compress(_catalog_payload(None))
+        cache.set(key, snapshot, settings.PRODUCTS_SYNC_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def parse_cursor(value: Optional[str]) -> Optional[datetime]:
+    """
+    Return the time a sync cursor stands for, or None when there is none.
+
+    Raises:
+        ValueError: If `value` is not a cursor returned by a sync.
+    """
+    if not value:
+        return None
+    error = "cursor must be the cursor returned by a previous sync"
+    if not value.isdigit():
+        raise ValueError(error)
+    try:
+        return CURSOR_EPOCH + timedelta(microseconds=int(value))
+    except OverflowError:
+        raise ValueError(error)
+
+
+def record_sync_tombstone(
+    sender: Type[models.Model], instance: models.Model, **kwargs: Any
+) -> None:
+    """
+    Record a deleted catalog row for the change feed.
+    """
+    for table, (model, _) in SYNC_TABLES.items():
+        if model is sender:
+            SyncTombstone.objects.create(table=table, object_id=instance.pk)
+            return
+
+
+def prune_sync_tombstones() -> int:
+    """
+    Delete the tombstones older than `PRODUCTS_SYNC_TOMBSTONE_DAYS`, which no
+    sync serves anymore.
+
+    Returns:
+        int: Number of tombstones deleted
+    """
+    oldest = timezone.now() - timedelta(days=settings.PRODUCTS_SYNC_TOMBSTONE_DAYS)
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=oldest).delete()
+    return deleted
+
+
+def _catalog_payload(since: Optional[datetime]) -> Dict[str, Any]:
+    next_cursor = timezone.now() - timedelta(
+        seconds=settings.PRODUCTS_SYNC_CURSOR_LAG_SECONDS
+    )
+    changed = Q() if since is None else Q(updated_at__gte=since)
+
+    payload: Dict[str, Any] = {
+        "cursor": _encode_cursor(next_cursor),
+        "full": since is None,
+        "deleted": {table: [] for table in SYNC_TABLES},
+    }
+    for table, (model, columns) in SYNC_TABLES.items():
+        queryset: QuerySet[Any] = model._default_manager.all()
+        if model is StockItem:
+            queryset = StockItem.objects.with_pricing()
+        rows = (
+            queryset.filter(changed)
+            .order_by("id")
+            .values_list(*[lookup for _, lookup in columns])
+        )
+        column_fields = SYNC_COLUMN_FIELDS.get(table, {})
+        fields = [column_fields.get(name) for name, _ in columns]
+        payload[table] = {
+            "columns": [name for name, _ in columns],
+            "rows": (
+                [
+                    [
+                        value if field is None else field.to_representation(value)
+                        for field, value in zip(fields, row)
+                    ]
+                    for row in rows
+                ]
+                if column_fields
+                else list(rows)
+            ),
+        }
+
+    if since is not None:
+        tombstones = SyncTombstone.objects.filter(deleted_at__gte=since).order_by("id")
+        for table, object_id in tombstones.values_list("table", "object_id"):
+            payload["deleted"][table].append(object_id)
+    return payload
+
+
+def _encode_cursor(value: datetime) -> str:
+    return str((value - CURSOR_EPOCH) // timedelta(microseconds=1))
+
+
+def _compress(payload: Dict[str, Any]) -> bytes:
+    return gzip.compress(
+        json.dumps(payload, cls=DjangoJSONEncoder, separators=(",", ":")).encode()
+    )
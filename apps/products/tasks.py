@@ -1,12 +1,38 @@
 from celery import shared_task
 
+from apps.reports.expiry import generate_expiry_report
+
+from .services import refresh_stock_pricing
+from .sync import prune_sync_tombstones
+
 
 # Run daily at 9:00 AM
 @shared_task  # type: ignore[misc]
 def daily_expiring_products_check() -> str:
     """
-    Check for expiring products once a day.
+    Write today's report of the stock about to expire, served by the
+    `reports:expiry-report` endpoint.
+    """
+    result = generate_expiry_report()
+    return (
+        f"Expiring products check completed: {result.report.item_count} items, "
+        f"{result.changed} changed since the previous report"
+    )
+
+
+# Run daily just after midnight
+@shared_task  # type: ignore[misc]
+def daily_stock_pricing_refresh() -> int:
+    """
+    Store the discount tiers that changed overnight on the stock items.
+    """
+    return refresh_stock_pricing()
+
+
+# Run daily at 3:00 AM
+@shared_task  # type: ignore[misc]
+def daily_sync_tombstone_prune() -> int:
+    """
+    Delete the catalog tombstones no sync serves anymore.
     """
-    # This function currently just returns a placeholder string
-    # In a real implementation, this would call the actual service
-    return "Expiring products check completed"
+    return prune_sync_tombstones()
@@ -0,0 +1,69 @@
+from typing import Callable
+
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from dateutil.relativedelta import relativedelta
+
+from apps.products.factories.factories import ProductFactory, StockItemFactory
+
+
+@pytest.mark.django_db
+class TestAdminChangelistQueryCounts:
+    """
+    Query-count regression tests for the product admin changelists.
+
+    Each changelist is requested with one row and with many, and must issue
+    the same number of queries, so a per-row query fails the suite.
+    """
+
+    def _count_queries(self, client: Client, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200  # nosec B101
+        return len(context)
+
+    @pytest.mark.parametrize(
+        "changelist, create",
+        [
+            ("admin:products_product_changelist", ProductFactory.create),
+            ("admin:products_stockitem_changelist", StockItemFactory.create),
+        ],
+    )
+    def test_changelist_query_count_is_constant(
+        self, admin_client: Client, changelist: str, create: Callable[[], object]
+    ) -> None:
+        """Test that the changelist issues no query per listed row."""
+        url = reverse(changelist)
+        create()
+        admin_client.get(url)
+        single = self._count_queries(admin_client, url)
+
+        for _ in range(15):
+            create()
+
+        assert self._count_queries(admin_client, url) == single  # nosec B101
+
+    def test_stock_items_sort_by_sql_discount(self, admin_client: Client) -> None:
+        """Test that stock items sort by the discount computed in SQL."""
+        today = timezone.now().date()
+        discounted = StockItemFactory.create(
+            expiration_date=today + relativedelta(days=30)
+        )
+        full_price = StockItemFactory.create(
+            expiration_date=today + relativedelta(years=2)
+        )
+
+        # Column 5 is the discount, so this lists the full price item first,
+        # unlike the default ordering by expiration date.
+        response = admin_client.get(
+            reverse("admin:products_stockitem_changelist"), {"o": "5"}
+        )
+
+        assert [  # nosec B101
+            stock_item.id for stock_item in response.context["cl"].result_list
+        ] == [full_price.id, discounted.id]
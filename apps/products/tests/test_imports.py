@@ -0,0 +1,147 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products.imports import import_catalog
+from apps.products.models import Brand, Category, Product, StockItem
+
+HEADER = (
+    "sku,name,description,brand,category,batch_number,"
+    "quantity,cost_price,selling_price,expiration_date"
+)
+
+
+class CatalogImportTest(TestCase):
+    def setUp(self) -> None:
+        self.expiration = (timezone.now().date() + timedelta(days=30)).isoformat()
+
+    def _catalog(self, *lines: str) -> list[str]:
+        return [f"{line}\n" for line in (HEADER, *lines)]
+
+    def test_import_creates_products_stock_and_lookups(self) -> None:
+        result = import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin,Pain relief,Bayer,Analgesics,B1,10,1.00,2.00,"
+                f"{self.expiration}",
+                f"SKU1,Aspirin,Pain relief,Bayer,Analgesics,B2,5,1.00,2.00,"
+                f"{self.expiration}",
+                f"SKU2,Zinc,,Acme,Supplements,B1,7,0.50,1.00,{self.expiration}",
+            ),
+            chunk_size=2,
+        )
+
+        self.assertEqual((result.rows, result.skipped), (3, 0))
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(
+            set(Brand.objects.values_list("name", flat=True)), {"Bayer", "Acme"}
+        )
+        self.assertEqual(Category.objects.count(), 2)
+        stock_item = StockItem.objects.get(product__sku="SKU1", batch_number="B1")
+        self.assertEqual(stock_item.quantity, 10)
+        # The discount tier is materialized as on save().
+        self.assertEqual(stock_item.current_discount_percentage, 35)
+        self.assertEqual(stock_item.current_discounted_price, Decimal("1.30"))
+
+    def test_import_updates_existing_rows(self) -> None:
+        import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin,,Bayer,Analgesics,B1,10,1.00,2.00,{self.expiration}"
+            )
+        )
+        product = Product.objects.get(sku="SKU1")
+
+        result = import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin 500mg,,Bayer,Analgesics,B1,25,1.10,2.20,"
+                f"{self.expiration}",
+                f"SKU1,Aspirin 500mg,,Bayer,Analgesics,B1,30,1.10,2.20,"
+                f"{self.expiration}",
+            )
+        )
+
+        self.assertEqual(result.stock_items, 1)
+        product.refresh_from_db()
+        self.assertEqual(product.name, "Aspirin 500mg")
+        stock_item = StockItem.objects.get()
+        self.assertEqual(stock_item.product_id, product.id)
+        self.assertEqual(stock_item.quantity, 30)
+        self.assertEqual(stock_item.selling_price, Decimal("2.20"))
+
+    def test_invalid_lines_are_skipped_and_reported(self) -> None:
+        result = import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin,,Bayer,Analgesics,B1,ten,1.00,2.00,{self.expiration}",
+                "SKU2,Zinc,,Acme,Supplements,B1,7,0.50,1.00,tomorrow",
+                f",Nameless,,Acme,Supplements,B1,7,0.50,1.00,{self.expiration}",
+                f"SKU3,Iron,,Acme,Supplements,B1,7,0.50,1.00,{self.expiration}",
+            )
+        )
+
+        self.assertEqual((result.rows, result.skipped), (1, 3))
+        self.assertEqual(
+            result.errors,
+            [
+                "Line 2: quantity and prices must be numbers",
+                "Line 3: expiration_date must be a date (YYYY-MM-DD)",
+                "Line 4: sku is required",
+            ],
+        )
+        self.assertEqual(list(Product.objects.values_list("sku", flat=True)), ["SKU3"])
+
+    def test_numbers_the_database_cannot_store_are_skipped(self) -> None:
+        result = import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin,,Bayer,Analgesics,B1,10,NaN,2.00,{self.expiration}",
+                f"SKU2,Zinc,,Acme,Supplements,B1,7,0.50,Infinity,{self.expiration}",
+                f"SKU3,Iron,,Acme,Supplements,B1,7,0.50,123456789.00,"
+                f"{self.expiration}",
+                f"SKU4,Iron,,Acme,Supplements,B1,7,0.505,1.00,{self.expiration}",
+                f"SKU5,Iron,,Acme,Supplements,B1,{2**31},0.50,1.00,{self.expiration}",
+                f"SKU6,Iron,,Acme,Supplements,B1,7,0.500,1.00,{self.expiration}",
+            )
+        )
+
+        self.assertEqual((result.rows, result.skipped), (1, 5))
+        self.assertEqual(
+            result.errors,
+            [
+                "Line 2: quantity and prices must be numbers",
+                "Line 3: quantity and prices must be numbers",
+                "Line 4: selling_price must have at most 10 digits and 2 decimal "
+                "places",
+                "Line 5: cost_price must have at most 10 digits and 2 decimal "
+                "places",
+                "Line 6: quantity cannot be more than 2147483647",
+            ],
+        )
+        self.assertEqual(list(Product.objects.values_list("sku", flat=True)), ["SKU6"])
+
+    def test_catalog_without_descriptions_keeps_them(self) -> None:
+        import_catalog(
+            self._catalog(
+                f"SKU1,Aspirin,Pain relief,Bayer,Analgesics,B1,10,1.00,2.00,"
+                f"{self.expiration}"
+            )
+        )
+
+        import_catalog(
+            [
+                "sku,name,brand,category,batch_number,quantity,cost_price,"
+                "selling_price,expiration_date\n",
+                f"SKU1,Aspirin 500mg,Bayer,Analgesics,B1,10,1.00,2.00,"
+                f"{self.expiration}\n",
+            ]
+        )
+
+        product = Product.objects.get()
+        self.assertEqual(product.name, "Aspirin 500mg")
+        self.assertEqual(product.description, "Pain relief")
+
+    def test_missing_columns_are_rejected(self) -> None:
+        with self.assertRaisesMessage(
+            ValueError,
+            "Missing catalog column(s): batch_number, cost_price, expiration_date,",
+        ):
+            import_catalog(["sku,name,brand,category,quantity\n"])
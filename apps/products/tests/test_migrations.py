@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+from typing import List, Tuple
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class UniqueProductBatchMigrationTest(TransactionTestCase):
+    before = [("products", "0004_product_search")]
+    after = [("products", "0005_stockitem_unique_product_batch")]
+
+    def _migrate(self, targets: List[Tuple[str, str]]) -> MigrationExecutor:
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor
+
+    def tearDown(self) -> None:
+        self._migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicate_batches_are_renamed(self) -> None:
+        apps = self._migrate(self.before).loader.project_state(self.before).apps
+        Brand = apps.get_model("products", "Brand")
+        Category = apps.get_model("products", "Category")
+        Product = apps.get_model("products", "Product")
+        StockItem = apps.get_model("products", "StockItem")
+        product = Product.objects.create(
+            name="Aspirin",
+            sku="SKU1",
+            brand=Brand.objects.create(name="Bayer"),
+            category=Category.objects.create(name="Analgesics"),
+        )
+        first, second = [
+            StockItem.objects.create(
+                product=product,
+                batch_number="B1",
+                quantity=quantity,
+                cost_price=Decimal("1.00"),
+                selling_price=Decimal("2.00"),
+                expiration_date=date(2030, 1, 1),
+            )
+            for quantity in (5, 7)
+        ]
+
+        apps = self._migrate(self.after).loader.project_state(self.after).apps
+        StockItem = apps.get_model("products", "StockItem")
+
+        self.assertEqual(
+            dict(StockItem.objects.values_list("id", "batch_number")),
+            {first.id: "B1", second.id: f"B1-dup{second.id}"},
+        )
@@ -83,3 +83,20 @@ class TestProductModels:
         )
         # 35% of 15.00 = 5.25, so discounted price = 15.00 - 5.25 = 9.75
         assert stock_item.discounted_price == Decimal("9.75")  # nosec B101
+
+    @pytest.mark.parametrize("days_ahead", [-5, 0, 60, 61, 120, 121, 180, 181, 400])
+    def test_with_pricing_matches_properties(self, days_ahead: int) -> None:
+        stock_item = StockItem.objects.create(
+            product=self.product,
+            batch_number=f"BATCH{days_ahead}",
+            quantity=100,
+            cost_price=Decimal("10.00"),
+            selling_price=Decimal("19.99"),
+            expiration_date=timezone.now().date() + relativedelta(days=days_ahead),
+        )
+        annotated = StockItem.objects.with_pricing().get(pk=stock_item.pk)
+
+        assert (  # nosec B101
+            annotated.discount_percentage == stock_item.discount_percentage
+        )
+        assert annotated.discounted_price == stock_item.discounted_price  # nosec B101
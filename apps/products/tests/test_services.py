@@ -1,14 +1,34 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
 from django.utils import timezone
 
 from dateutil.relativedelta import relativedelta
 
-from apps.products.models import Brand, Category, Product, StockItem
-from apps.products.services import get_expiring_products, get_low_stock_products
+from apps.inventory.models import ProductAvailability
+from apps.inventory.services import rebuild_product_availability
+from apps.products.models import (
+    PRICING_REFRESHED_ON_CACHE_KEY,
+    Brand,
+    Category,
+    Product,
+    StockItem,
+    stock_pricing_refreshed_today,
+)
+from apps.products.services import (
+    get_expiring_products,
+    get_inventory_summary,
+    get_inventory_value,
+    get_low_stock_products,
+    refresh_stock_pricing,
+)
 
 
 class ProductServiceTest(TestCase):
     def setUp(self) -> None:
+        cache.clear()
+
         self.brand = Brand.objects.create(
             name="Test Brand", description="Test brand description"
         )
@@ -67,7 +87,7 @@ class ProductServiceTest(TestCase):
 
         self.normal_stock = StockItem.objects.create(
             product=self.product,
-            batch_number="BATCH004",
+            batch_number="BATCH009",
             quantity=25,  # Above threshold of 10
             cost_price=10.00,
             selling_price=15.00,
@@ -98,11 +118,155 @@ class ProductServiceTest(TestCase):
         self.assertNotIn(expired_stock, expiring_products)
 
     def test_get_low_stock_products(self) -> None:
-        # Get products with stock below threshold of 10
-        low_stock_products = get_low_stock_products(10)
+        rebuild_product_availability()
+
+        # Judged on the 180 unexpired units of the product, not per batch.
+        self.assertNotIn(self.product, get_low_stock_products(10))
+        self.assertIn(self.product, get_low_stock_products(180))
+
+        # A reorder point of the product's own takes precedence.
+        self.product.reorder_point = 200
+        self.product.save()
+        self.assertIn(self.product, get_low_stock_products(10))
+
+    def test_refresh_stock_pricing_only_updates_crossing_rows(self) -> None:
+        today = timezone.now().date()
+        crossing = StockItem.objects.create(
+            product=self.product,
+            batch_number="BATCH006",
+            quantity=10,
+            cost_price=10.00,
+            selling_price=20.00,
+            expiration_date=today + relativedelta(days=60),
+        )
+        # As stored yesterday, when the batch was still 61 days from expiring.
+        StockItem.objects.filter(pk=crossing.pk).update(
+            current_discount_percentage=25, current_discounted_price=15
+        )
+        # A stale row outside the boundary window is not examined.
+        StockItem.objects.filter(pk=self.expiring_stock.pk).update(
+            current_discount_percentage=0
+        )
+        cache.set(
+            PRICING_REFRESHED_ON_CACHE_KEY,
+            (today - relativedelta(days=1)).isoformat(),
+            None,
+        )
+
+        updated = refresh_stock_pricing()
+
+        self.assertEqual(updated, 1)
+        crossing.refresh_from_db()
+        self.assertEqual(crossing.current_discount_percentage, 35)
+        self.assertEqual(crossing.current_discounted_price, Decimal("13.00"))
+        self.expiring_stock.refresh_from_db()
+        self.assertEqual(self.expiring_stock.current_discount_percentage, 0)
+        self.assertTrue(stock_pricing_refreshed_today())
+
+    def test_with_pricing_reads_stored_tier_once_refreshed(self) -> None:
+        cache.delete(PRICING_REFRESHED_ON_CACHE_KEY)
+        refresh_stock_pricing()
+        StockItem.objects.filter(pk=self.expiring_stock.pk).update(
+            current_discount_percentage=99
+        )
+
+        stored = StockItem.objects.with_pricing().get(pk=self.expiring_stock.pk)
+        self.assertEqual(stored.discount_percentage, 99)
+
+        # Without a refresh today the tier is computed from the expiration date.
+        cache.delete(PRICING_REFRESHED_ON_CACHE_KEY)
+        live = StockItem.objects.with_pricing().get(pk=self.expiring_stock.pk)
+        self.assertEqual(live.discount_percentage, 35)
+
+    def test_get_inventory_value(self) -> None:
+        result = get_inventory_value()
+
+        self.assertEqual(Decimal(result["total_cost_value"]), Decimal("2100"))
+        self.assertEqual(Decimal(result["total_selling_value"]), Decimal("3150"))
+        self.assertEqual(Decimal(result["potential_profit"]), Decimal("1050"))
+        self.assertNotIn("groups", result)
+
+    def test_get_inventory_value_grouped(self) -> None:
+        other_brand = Brand.objects.create(name="Other Brand")
+        other_product = Product.objects.create(
+            name="Other Product",
+            brand=other_brand,
+            category=self.category,
+            sku="TEST002",
+        )
+        StockItem.objects.create(
+            product=other_product,
+            batch_number="BATCH005",
+            quantity=10,
+            cost_price=2.00,
+            selling_price=3.00,
+            expiration_date=timezone.now().date() + relativedelta(days=365),
+        )
+
+        by_brand = get_inventory_value("brand")["groups"]
+        by_category = get_inventory_value("category")["groups"]
+
+        self.assertEqual(
+            [(group["name"], Decimal(group["total_cost_value"])) for group in by_brand],
+            [("Other Brand", Decimal("20")), ("Test Brand", Decimal("2100"))],
+        )
+        self.assertEqual(len(by_category), 1)
+        self.assertEqual(Decimal(by_category[0]["total_cost_value"]), Decimal("2120"))
+
+    def test_get_inventory_value_rejects_unknown_grouping(self) -> None:
+        with self.assertRaises(ValueError):
+            get_inventory_value("product")
+
+    def test_get_inventory_value_is_invalidated_by_stock_writes(self) -> None:
+        get_inventory_value()
+        # Writes bypassing the model leave the cached value untouched...
+        StockItem.objects.filter(pk=self.low_stock.pk).update(quantity=0)
+        self.assertEqual(
+            Decimal(get_inventory_value()["total_cost_value"]), Decimal("2100")
+        )
+
+        # ...while saving a stock item invalidates it once committed.
+        self.normal_stock.quantity = 0
+        with self.captureOnCommitCallbacks(execute=True):
+            self.normal_stock.save()
+
+        self.assertEqual(
+            Decimal(get_inventory_value()["total_cost_value"]), Decimal("1800")
+        )
+
+    def test_get_inventory_summary_matches_the_listing_services(self) -> None:
+        rebuild_product_availability()
+        low = Product.objects.create(
+            name="Low Product",
+            brand=self.brand,
+            category=self.category,
+            sku="TEST002",
+            reorder_point=5,
+        )
+        ProductAvailability.objects.create(product=low, sellable_quantity=5)
+
+        with self.assertNumQueries(3):
+            summary = get_inventory_summary(threshold=25, days=130)
+
+        self.assertEqual(
+            summary,
+            {
+                "total_products": 5,
+                "total_quantity": 210,
+                "low_stock_items": 2,
+                "low_stock_products": get_low_stock_products(threshold=25).count(),
+                "expiring_items": get_expiring_products(days=130).count(),
+            },
+        )
+        self.assertEqual(summary["low_stock_products"], 1)
+        self.assertEqual(summary["expiring_items"], 4)
+
+    def test_get_inventory_summary_is_cached_until_stock_changes(self) -> None:
+        get_inventory_summary()
+        with self.assertNumQueries(0):
+            get_inventory_summary()
 
-        # Should include the low stock item
-        self.assertIn(self.low_stock, low_stock_products)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.normal_stock.delete()
 
-        # Should not include the normal stock item
-        self.assertNotIn(self.normal_stock, low_stock_products)
+        self.assertEqual(get_inventory_summary()["total_products"], 4)
@@ -0,0 +1,170 @@
+import gzip
+import json
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.products.models import (
+    Brand,
+    Category,
+    Product,
+    StockItem,
+    SyncTombstone,
+)
+from apps.products.sync import (
+    get_catalog_changes,
+    parse_cursor,
+    prune_sync_tombstones,
+)
+from apps.sales.dtos import SaleCreateDTO, SaleItemDTO
+from apps.sales.services import create_sale
+
+
+@override_settings(PRODUCTS_SYNC_CURSOR_LAG_SECONDS=0)
+class CatalogSyncTest(TestCase):
+    def setUp(self) -> None:
+        cache.clear()
+        self.brand = Brand.objects.create(name="Bayer")
+        self.category = Category.objects.create(name="Analgesics")
+        self.product = Product.objects.create(
+            name="Aspirin", brand=self.brand, category=self.category, sku="SKU1"
+        )
+        self.stock_item = self._create_stock_item(self.product, "B1")
+
+    def _create_stock_item(self, product: Product, batch_number: str) -> StockItem:
+        return StockItem.objects.create(
+            product=product,
+            batch_number=batch_number,
+            quantity=10,
+            cost_price=Decimal("1.00"),
+            selling_price=Decimal("2.00"),
+            expiration_date=timezone.now().date() + timedelta(days=30),
+        )
+
+    def _sync(self, cursor: Any = None) -> Dict[str, Any]:
+        payload: Dict[str, Any] = json.loads(
+            gzip.decompress(get_catalog_changes(cursor))
+        )
+        return payload
+
+    def _rows(self, payload: Dict[str, Any], table: str) -> List[Dict[str, Any]]:
+        columns = payload[table]["columns"]
+        return [dict(zip(columns, row)) for row in payload[table]["rows"]]
+
+    def test_first_sync_gets_the_cached_snapshot(self) -> None:
+        payload = self._sync()
+
+        self.assertTrue(payload["full"])
+        self.assertEqual(
+            self._rows(payload, "products"),
+            [
+                {
+                    "id": self.product.id,
+                    "sku": "SKU1",
+                    "name": "Aspirin",
+                    "description": "",
+                    "brand": self.brand.id,
+                    "category": self.category.id,
+                }
+            ],
+        )
+        [stock_item] = self._rows(payload, "stock_items")
+        self.assertEqual(stock_item["discount_percentage"], 35)
+        # Formatted as the REST serializers do, whatever the database returns.
+        self.assertEqual(stock_item["discounted_price"], "1.30")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._sync(), payload)
+        self.assertEqual(len(queries), 0)
+
+    def test_snapshot_is_rebuilt_once_stock_is_edited(self) -> None:
+        self._sync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_stock_item(self.product, "B2")
+
+        self.assertEqual(len(self._sync()["stock_items"]["rows"]), 2)
+
+    def test_sync_since_cursor_gets_changes_and_deletions(self) -> None:
+        other = Product.objects.create(
+            name="Zinc", brand=self.brand, category=self.category, sku="SKU2"
+        )
+        removed = self._create_stock_item(other, "B1")
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Product.objects.update(updated_at=an_hour_ago)
+        StockItem.objects.update(updated_at=an_hour_ago)
+        cursor = parse_cursor(self._sync()["cursor"])
+        removed_id = removed.id
+
+        removed.delete()
+        create_sale(
+            SaleCreateDTO(
+                customer_name="",
+                customer_email="",
+                customer_phone="",
+                items=[
+                    SaleItemDTO(
+                        stock_item_id=self.stock_item.id,
+                        quantity=3,
+                        unit_price=Decimal("0.00"),
+                        total_price=Decimal("0.00"),
+                        discount_percentage=Decimal("0.00"),
+                    )
+                ],
+            )
+        )
+        payload = self._sync(cursor)
+
+        self.assertFalse(payload["full"])
+        self.assertEqual(payload["products"]["rows"], [])
+        self.assertEqual(
+            [
+                (row["id"], row["quantity"])
+                for row in self._rows(payload, "stock_items")
+            ],
+            [(self.stock_item.id, 7)],
+        )
+        self.assertEqual(payload["deleted"]["stock_items"], [removed_id])
+
+    def test_deleting_a_product_records_its_stock_items(self) -> None:
+        product_id, stock_item_id = self.product.id, self.stock_item.id
+
+        self.product.delete()
+
+        self.assertEqual(
+            set(SyncTombstone.objects.values_list("table", "object_id")),
+            {("products", product_id), ("stock_items", stock_item_id)},
+        )
+
+    @override_settings(PRODUCTS_SYNC_TOMBSTONE_DAYS=7)
+    def test_cursor_older_than_tombstones_gets_the_snapshot(self) -> None:
+        self.assertTrue(self._sync(timezone.now() - timedelta(days=8))["full"])
+
+    @override_settings(PRODUCTS_SYNC_TOMBSTONE_DAYS=7)
+    def test_prune_sync_tombstones(self) -> None:
+        self.stock_item.delete()
+        kept = SyncTombstone.objects.get()
+        SyncTombstone.objects.create(table="products", object_id=1)
+        SyncTombstone.objects.exclude(pk=kept.pk).update(
+            deleted_at=timezone.now() - timedelta(days=8)
+        )
+
+        self.assertEqual(prune_sync_tombstones(), 1)
+        self.assertEqual(list(SyncTombstone.objects.all()), [kept])
+
+    def test_parse_cursor(self) -> None:
+        before = timezone.now()
+        cursor = parse_cursor(self._sync()["cursor"])
+
+        assert cursor is not None  # nosec B101
+        self.assertTrue(before <= cursor <= timezone.now())
+        self.assertIsNone(parse_cursor(""))
+        for value in ("yesterday", "-1", "9" * 30):
+            with self.assertRaisesMessage(ValueError, "cursor must be"):
+                parse_cursor(value)
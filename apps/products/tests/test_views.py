@@ -0,0 +1,383 @@
+import base64
+import gzip
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from dateutil.relativedelta import relativedelta
+
+from apps.core.pagination import PageNumberOrCursorPagination
+from apps.products.factories.factories import ProductFactory, StockItemFactory
+from apps.products.models import StockItem
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestStockItemViewSet:
+    """Integration tests for the StockItemViewSet."""
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_filter_and_order_by_discount(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that stock can be filtered and ordered by its SQL-computed discount."""
+        today = timezone.now().date()
+        expiring = StockItemFactory.create(
+            expiration_date=today + relativedelta(days=30)
+        )
+        soon = StockItemFactory.create(expiration_date=today + relativedelta(days=100))
+        StockItemFactory.create(expiration_date=today + relativedelta(days=365))
+
+        response = authenticated_client.get(
+            reverse("products:stockitem-list"),
+            {"discount_percentage__gte": "25", "ordering": "discount_percentage"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert [item["id"] for item in response.data["results"]] == [  # nosec B101
+            soon.id,
+            expiring.id,
+        ]
+        assert (
+            response.data["results"][1]["discount_percentage"] == "35.00"
+        )  # nosec B101
+
+    def test_update_returns_the_new_discount_tier(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that moving a batch's expiry reprices it in the response."""
+        today = timezone.now().date()
+        stock_item = StockItemFactory.create(
+            selling_price="20.00", expiration_date=today + relativedelta(days=365)
+        )
+
+        response = authenticated_client.patch(
+            reverse("products:stockitem-detail", args=[stock_item.id]),
+            {"expiration_date": (today + relativedelta(days=10)).isoformat()},
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert response.data["discount_percentage"] == "35.00"  # nosec B101
+        assert response.data["discounted_price"] == "13.00"  # nosec B101
+        assert "current_discount_percentage" not in response.data  # nosec B101
+        assert "current_discounted_price" not in response.data  # nosec B101
+
+    def test_cursor_pagination_walks_ties_in_order(
+        self, authenticated_client: APIClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that cursor pages cover every stock item once, in order."""
+        monkeypatch.setattr(PageNumberOrCursorPagination, "page_size", 2)
+        today = timezone.now().date()
+        stock_items = [
+            StockItemFactory.create(expiration_date=today + relativedelta(days=days))
+            for days in (60, 30, 30, 30, 90)
+        ]
+
+        seen = []
+        url = reverse("products:stockitem-list") + "?pagination=cursor"
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK  # nosec B101
+            assert "count" not in response.data  # nosec B101
+            seen += [item["id"] for item in response.data["results"]]
+            url = response.data["next"]
+
+        assert seen == [  # nosec B101
+            stock_item.id
+            for stock_item in sorted(
+                stock_items, key=lambda item: (item.expiration_date, item.id)
+            )
+        ]
+
+    def test_invalid_cursor_is_rejected(self, authenticated_client: APIClient) -> None:
+        response = authenticated_client.get(
+            reverse("products:stockitem-list"),
+            {"pagination": "cursor", "cursor": "not-a-cursor"},
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # nosec B101
+
+    @pytest.mark.parametrize(
+        "position", [["notadate", "x"], ["2030-01-01", "x"], ["2030-01-01", "9" * 30]]
+    )
+    def test_cursor_with_invalid_values_is_rejected(
+        self, authenticated_client: APIClient, position: list[str]
+    ) -> None:
+        """Test that a well-formed cursor holding bad values is a 404."""
+        cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+        response = authenticated_client.get(
+            reverse("products:stockitem-list"),
+            {"pagination": "cursor", "cursor": cursor},
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND  # nosec B101
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    """Integration tests for the indexed product search."""
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_search_ranks_name_matches_first(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that products are found by word prefix and ranked by relevance."""
+        in_description = ProductFactory.create(
+            name="Cough Syrup", description="Soothing honey and paracetamol"
+        )
+        in_name = ProductFactory.create(
+            name="Paracetamol 500mg", description="Pain relief"
+        )
+        ProductFactory.create(name="Ibuprofen 200mg", description="Pain relief")
+
+        response = authenticated_client.get(
+            reverse("products:product-list"), {"search": "paraceta"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert [
+            product["id"] for product in response.data["results"]
+        ] == [  # nosec B101
+            in_name.id,
+            in_description.id,
+        ]
+
+    def test_search_index_follows_product_updates(
+        self, authenticated_client: APIClient
+    ) -> None:
+        product = ProductFactory.create(name="Aspirin", description="")
+        product.name = "Acetylsalicylic acid"
+        product.save()
+
+        url = reverse("products:product-list")
+        assert (
+            authenticated_client.get(url, {"search": "aspirin"}).data[  # nosec B101
+                "results"
+            ]
+            == []
+        )
+        results = authenticated_client.get(url, {"search": "acetyl"}).data["results"]
+        assert [item["id"] for item in results] == [product.id]  # nosec B101
+
+    def test_search_syntax_is_matched_literally(
+        self, authenticated_client: APIClient
+    ) -> None:
+        ProductFactory.create(name="Vitamin C", description="")
+
+        response = authenticated_client.get(
+            reverse("products:product-list"), {"search": 'vitamin" OR NEAR('}
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert response.data["results"] == []  # nosec B101
+
+    def test_exact_sku_short_circuits(self, authenticated_client: APIClient) -> None:
+        """Test that an exact SKU returns that product and its stock only."""
+        product = ProductFactory.create(sku="SKU-12345", name="Zinc")
+        ProductFactory.create(sku="SKU-123456", name="SKU-12345 refill")
+        stock_item = StockItemFactory.create(product=product)
+        StockItemFactory.create()
+
+        products = authenticated_client.get(
+            reverse("products:product-list"), {"search": "SKU-12345"}
+        )
+        stock_items = authenticated_client.get(
+            reverse("products:stockitem-list"), {"search": "SKU-12345"}
+        )
+
+        assert [item["id"] for item in products.data["results"]] == [  # nosec B101
+            product.id
+        ]
+        assert [item["id"] for item in stock_items.data["results"]] == [  # nosec B101
+            stock_item.id
+        ]
+
+    def test_partial_sku_matches(self, authenticated_client: APIClient) -> None:
+        """Test that a part of a SKU finds its product and stock."""
+        product = ProductFactory.create(sku="7891234567890", name="Zinc")
+        ProductFactory.create(sku="7890000000000", name="Iron")
+        stock_item = StockItemFactory.create(product=product)
+
+        for search in ("789123", "567890"):
+            products = authenticated_client.get(
+                reverse("products:product-list"), {"search": search}
+            )
+            ordered = authenticated_client.get(
+                reverse("products:product-list"),
+                {"search": search, "ordering": "name"},
+            )
+            stock_items = authenticated_client.get(
+                reverse("products:stockitem-list"), {"search": search}
+            )
+
+            for response in (products, ordered):
+                assert [  # nosec B101
+                    item["id"] for item in response.data["results"]
+                ] == [product.id]
+            assert [  # nosec B101
+                item["id"] for item in stock_items.data["results"]
+            ] == [stock_item.id]
+
+    def test_sku_wildcards_are_matched_literally(
+        self, authenticated_client: APIClient
+    ) -> None:
+        ProductFactory.create(sku="ABC-1", name="Zinc")
+
+        response = authenticated_client.get(
+            reverse("products:product-list"), {"search": "A_C%"}
+        )
+
+        assert response.data["results"] == []  # nosec B101
+
+    def test_stock_items_match_product_name_or_batch(
+        self, authenticated_client: APIClient
+    ) -> None:
+        by_name = StockItemFactory.create(product__name="Melatonin")
+        by_batch = StockItemFactory.create(batch_number="MELATONIN-7")
+        StockItemFactory.create(product__name="Zinc")
+
+        response = authenticated_client.get(
+            reverse("products:stockitem-list"),
+            {"search": "melatonin", "ordering": "created_at"},
+        )
+
+        assert sorted(  # nosec B101
+            item["id"] for item in response.data["results"]
+        ) == sorted([by_name.id, by_batch.id])
+
+
+@pytest.mark.django_db
+class TestCatalogImport:
+    """Integration tests for the catalog import endpoint."""
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_upload_catalog(self, authenticated_client: APIClient) -> None:
+        catalog = (
+            "\ufeffsku,name,brand,category,batch_number,quantity,cost_price,"
+            "selling_price,expiration_date\n"
+            "SKU1,Aspirin,Bayer,Analgesics,B1,10,1.00,2.00,2030-01-01\n"
+            "SKU2,Zinc,Acme,Supplements,B1,-1,0.50,1.00,2030-01-01\n"
+        )
+
+        response = authenticated_client.post(
+            reverse("products:product-catalog-import"),
+            {"file": SimpleUploadedFile("catalog.csv", catalog.encode())},
+            format="multipart",
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert response.data["rows"] == 1  # nosec B101
+        assert response.data["errors"] == [  # nosec B101
+            "Line 3: quantity and prices cannot be negative"
+        ]
+        assert StockItem.objects.get().product.sku == "SKU1"  # nosec B101
+
+    def test_upload_requires_a_file(self, authenticated_client: APIClient) -> None:
+        response = authenticated_client.post(
+            reverse("products:product-catalog-import"), {}, format="multipart"
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
+
+
+@pytest.mark.django_db
+class TestCatalogSync:
+    """Integration tests for the catalog sync endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_sync_is_gzip_compressed_when_accepted(
+        self, authenticated_client: APIClient
+    ) -> None:
+        stock_item = StockItemFactory.create()
+
+        compressed = authenticated_client.get(
+            reverse("products:catalog-sync"), HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+        plain = authenticated_client.get(reverse("products:catalog-sync"))
+
+        assert compressed.status_code == status.HTTP_200_OK  # nosec B101
+        assert compressed["Content-Encoding"] == "gzip"  # nosec B101
+        assert "Accept-Encoding" in compressed["Vary"]  # nosec B101
+        assert not plain.has_header("Content-Encoding")  # nosec B101
+        payload = json.loads(gzip.decompress(compressed.content))
+        assert payload == json.loads(plain.content)  # nosec B101
+        assert payload["full"] is True  # nosec B101
+        assert [row[0] for row in payload["stock_items"]["rows"]] == [  # nosec B101
+            stock_item.id
+        ]
+
+    def test_sync_with_cursor(self, authenticated_client: APIClient) -> None:
+        cursor = json.loads(
+            authenticated_client.get(reverse("products:catalog-sync")).content
+        )["cursor"]
+
+        response = authenticated_client.get(
+            reverse("products:catalog-sync"), {"cursor": cursor}
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert json.loads(response.content)["full"] is False  # nosec B101
+
+    def test_sync_rejects_invalid_cursor(self, authenticated_client: APIClient) -> None:
+        response = authenticated_client.get(
+            reverse("products:catalog-sync"), {"cursor": "yesterday"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
@@ -2,7 +2,13 @@ from django.urls import include, path
 
 from rest_framework.routers import DefaultRouter
 
-from .views import BrandViewSet, CategoryViewSet, ProductViewSet, StockItemViewSet
+from .views import (
+    BrandViewSet,
+    CategoryViewSet,
+    ProductViewSet,
+    StockItemViewSet,
+    catalog_sync,
+)
 
 app_name = "products"
 
@@ -13,5 +19,6 @@ router.register(r"products", ProductViewSet)
 router.register(r"stock-items", StockItemViewSet)
 
 urlpatterns = [
+    path("sync/", catalog_sync, name="catalog-sync"),
     path("", include(router.urls)),
 ]
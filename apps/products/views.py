@@ -1,13 +1,35 @@
+import gzip
+import io
+import re
+from dataclasses import asdict
+from typing import cast
+
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import patch_vary_headers
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from apps.core.fieldsets import SparseFieldsetViewSetMixin
 
-from .models import Brand, Category, Product, StockItem
+from .filters import ProductSearchFilter, StockItemFilter, StockItemSearchFilter
+from .imports import import_catalog
+from .models import Brand, Category, Product, StockItem, StockItemQuerySet
 from .serializers import (
     BrandSerializer,
     CategorySerializer,
     ProductSerializer,
     StockItemSerializer,
 )
+from .sync import get_catalog_changes, parse_cursor
+
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
 
 
 class BrandViewSet(viewsets.ModelViewSet[Brand]):
@@ -28,23 +50,51 @@ class CategoryViewSet(viewsets.ModelViewSet[Category]):
     ordering = ["name"]
 
 
-class ProductViewSet(viewsets.ModelViewSet[Product]):
+class ProductViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet[Product]):
     queryset = (
         Product.objects.select_related("brand", "category").all().order_by("name")
     )
     serializer_class = ProductSerializer
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        ProductSearchFilter,
     ]
     filterset_fields = ["brand", "category"]
     search_fields = ["name", "sku", "description"]
     ordering_fields = ["name", "sku", "created_at"]
     ordering = ["name"]
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser],
+    )
+    def catalog_import(self, request: Request) -> Response:
+        """
+        Upsert products and their stock from a supplier catalog CSV uploaded as
+        `file`, see `apps.products.imports`.
+
+        Lines that fail validation are skipped and listed in `errors`.
+        """
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {"error": "Upload the catalog as a `file` field"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            result = import_catalog(lines)
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {**asdict(result), "rows_per_second": round(result.rows_per_second, 1)}
+        )
+
 
-class StockItemViewSet(viewsets.ModelViewSet[StockItem]):
+class StockItemViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet[StockItem]):
     queryset = (
         StockItem.objects.select_related(
             "product", "product__brand", "product__category"
@@ -55,10 +105,48 @@ class StockItemViewSet(viewsets.ModelViewSet[StockItem]):
     serializer_class = StockItemSerializer
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
+        StockItemSearchFilter,
         filters.OrderingFilter,
     ]
-    filterset_fields = ["product", "product__brand", "product__category"]
+    filterset_class = StockItemFilter
     search_fields = ["product__name", "batch_number"]
-    ordering_fields = ["expiration_date", "quantity", "created_at"]
+    ordering_fields = [
+        "expiration_date",
+        "quantity",
+        "created_at",
+        "discount_percentage",
+        "discounted_price",
+    ]
     ordering = ["expiration_date"]
+    cursor_ordering = ["expiration_date", "id"]
+
+    def get_queryset(self) -> QuerySet[StockItem]:
+        # Pricing depends on the current date, so it is annotated per request
+        # rather than once on the class-level queryset.
+        return cast(StockItemQuerySet, super().get_queryset()).with_pricing()
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def catalog_sync(request: HttpRequest) -> HttpResponseBase:
+    """
+    Return the catalog changes since `?cursor=`, or the full catalog without
+    one, for POS terminals, see `apps.products.sync`.
+
+    The payload is sent gzip-compressed to clients accepting it.
+    """
+    try:
+        cursor = parse_cursor(request.GET.get("cursor"))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    payload = get_catalog_changes(cursor)
+    if ACCEPTS_GZIP.search(request.headers.get("Accept-Encoding", "")):
+        response = HttpResponse(payload, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(
+            gzip.decompress(payload), content_type="application/json"
+        )
+    patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class ReportsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.reports"
+
+    def ready(self) -> None:
+        """
+        Keep the sales rollups in step with sales changed after creation.
+        """
+        from django.db.models.signals import post_delete, post_save
+
+        from apps.sales.models import Sale, SaleItem
+
+        from .services import rebuild_rollups_on_sale_change
+
+        for model in (Sale, SaleItem):
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    rebuild_rollups_on_sale_change,
+                    sender=model,
+                    dispatch_uid="reports.rebuild_rollups_on_sale_change",
+                )
@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from dateutil.relativedelta import relativedelta
+
+from apps.products.services import get_expiring_products
+
+from .models import ExpiringStockItem, ExpiryReport, ExpiryReportGroup
+
+# The daily expiry report walks the expiring stock items in chunks of
+# `REPORTS_EXPIRY_CHUNK_SIZE`, in (expiration_date, id) order so that every
+# chunk is one range read of that index. What was reported is kept in
+# `ExpiringStockItem`, so batches unchanged since the previous report are not
+# written again, and the report is summed from that table.
+
+SNAPSHOT_UPDATE_FIELDS = ["product", "quantity", "cost_price", "expiration_date"]
+
+
+@dataclass
+class ExpiryReportResult:
+    """Outcome of an expiry report run."""
+
+    report: ExpiryReport
+    scanned: int = 0
+    changed: int = 0
+    removed: int = 0
+
+
+@transaction.atomic
+def generate_expiry_report(days: Optional[int] = None) -> ExpiryReportResult:
+    """
+    Write today's report of the stock expiring within `days`, grouped by
+    category and brand with the quantity and cost value at risk.
+
+    Running it again on the same day replaces that day's report.
+
+    Args:
+        days: Days ahead to report, defaults to `REPORTS_EXPIRY_WINDOW_DAYS`.
+    """
+    if days is None:
+        days = settings.REPORTS_EXPIRY_WINDOW_DAYS
+    today = timezone.now().date()
+    scanned, changed = _snapshot_expiring_stock(days)
+    removed, _ = ExpiringStockItem.objects.exclude(
+        stock_item__expiration_date__gte=today,
+        stock_item__expiration_date__lte=today + relativedelta(days=days),
+    ).delete()
+
+    cost_value = Sum(
+        F("quantity") * F("cost_price"),
+        output_field=models.DecimalField(max_digits=14, decimal_places=2),
+    )
+    groups = list(
+        ExpiringStockItem.objects.values("product__category_id", "product__brand_id")
+        .annotate(
+            item_count=Count("pk"),
+            total_quantity=Sum("quantity"),
+            total_cost_value=cost_value,
+        )
+        .order_by()
+    )
+    report, _ = ExpiryReport.objects.update_or_create(
+        date=today,
+        defaults={
+            "days": days,
+            "item_count": sum(group["item_count"] for group in groups),
+            "quantity": sum(group["total_quantity"] for group in groups),
+            "cost_value": sum(
+                (group["total_cost_value"] for group in groups), Decimal("0.00")
+            ),
+        },
+    )
+    report.groups.all().delete()
+    ExpiryReportGroup.objects.bulk_create(
+        ExpiryReportGroup(
+            report=report,
+            category_id=group["product__category_id"],
+            brand_id=group["product__brand_id"],
+            item_count=group["item_count"],
+            quantity=group["total_quantity"],
+            cost_value=group["total_cost_value"],
+        )
+        for group in groups
+    )
+    return ExpiryReportResult(
+        report=report, scanned=scanned, changed=changed, removed=removed
+    )
+
+
+def _snapshot_expiring_stock(days: int) -> Tuple[int, int]:
+    """
+    Record the stock items expiring within `days` that are new or changed
+    since the previous report.
+
+    Returns:
+        The number of stock items scanned and the number written.
+    """
+    expiring = get_expiring_products(days).order_by("expiration_date", "id")
+    chunk_size = settings.REPORTS_EXPIRY_CHUNK_SIZE
+    scanned = changed = 0
+    position: Optional[Tuple[date, int]] = None
+
+    while True:
+        chunk = expiring
+        if position is not None:
+            last_date, last_id = position
+            chunk = chunk.filter(
+                Q(expiration_date__gt=last_date)
+                | Q(expiration_date=last_date, id__gt=last_id)
+            )
+        rows = list(
+            chunk.values_list(
+                "id", "product_id", "quantity", "cost_price", "expiration_date"
+            )[:chunk_size]
+        )
+        if not rows:
+            break
+        scanned += len(rows)
+        position = (rows[-1][4], rows[-1][0])
+
+        reported: Dict[int, Tuple[Any, ...]] = {
+            row[0]: row[1:]
+            for row in ExpiringStockItem.objects.filter(
+                stock_item_id__in=[row[0] for row in rows]
+            ).values_list(
+                "stock_item_id",
+                "product_id",
+                "quantity",
+                "cost_price",
+                "expiration_date",
+            )
+        }
+        updates = [
+            ExpiringStockItem(
+                stock_item_id=stock_item_id,
+                product_id=product_id,
+                quantity=quantity,
+                cost_price=cost_price,
+                expiration_date=expiration_date,
+            )
+            for stock_item_id, product_id, quantity, cost_price, expiration_date in rows
+            if reported.get(stock_item_id)
+            != (product_id, quantity, cost_price, expiration_date)
+        ]
+        if updates:
+            ExpiringStockItem.objects.bulk_create(
+                updates,
+                update_conflicts=True,
+                unique_fields=["stock_item"],
+                update_fields=SNAPSHOT_UPDATE_FIELDS,
+            )
+            changed += len(updates)
+        if len(rows) < chunk_size:
+            break
+    return scanned, changed
+
+
+def serialize_expiry_report(report: ExpiryReport) -> Dict[str, Any]:
+    """
+    Return an expiry report with its groups, as served by the API.
+    """
+    return {
+        "date": report.date.isoformat(),
+        "days": report.days,
+        "generated_at": report.generated_at.isoformat(),
+        "item_count": report.item_count,
+        "total_quantity": report.quantity,
+        "total_cost_value": str(report.cost_value),
+        "groups": [
+            {
+                "category": group.category.name,
+                "brand": group.brand.name,
+                "item_count": group.item_count,
+                "quantity": group.quantity,
+                "cost_value": str(group.cost_value),
+            }
+            for group in report.groups.select_related("category", "brand")
+        ],
+    }
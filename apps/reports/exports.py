@@ -0,0 +1,188 @@
+import csv
+import json
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from apps.products.models import StockItem, StockItemQuerySet
+from apps.sales.models import Sale
+
+from .services import start_of_day
+
+# Exports stream whole tables for accounting. Rows are read as tuples through
+# `values_list()` in chunks of `REPORTS_EXPORT_CHUNK_SIZE`, using server-side
+# cursors where the database has them, and are encoded one at a time, so the
+# memory used stays the same however many rows are exported.
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# (column name, lookup) pairs of the exported values.
+SALE_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+    ("customer_name", "customer_name"),
+    ("customer_email", "customer_email"),
+    ("customer_phone", "customer_phone"),
+    ("total_amount", "total_amount"),
+    ("discount_amount", "discount_amount"),
+    ("final_amount", "final_amount"),
+    ("created_by", "created_by_id"),
+]
+
+SALE_ITEM_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "items__id"),
+    ("stock_item", "items__stock_item_id"),
+    ("product_sku", "items__stock_item__product__sku"),
+    ("quantity", "items__quantity"),
+    ("unit_price", "items__unit_price"),
+    ("discount_percentage", "items__discount_percentage"),
+    ("total_price", "items__total_price"),
+]
+
+STOCK_ITEM_COLUMNS: List[Tuple[str, str]] = [
+    ("id", "id"),
+    ("product", "product_id"),
+    ("product_sku", "product__sku"),
+    ("product_name", "product__name"),
+    ("batch_number", "batch_number"),
+    ("quantity", "quantity"),
+    ("cost_price", "cost_price"),
+    ("selling_price", "selling_price"),
+    ("expiration_date", "expiration_date"),
+    # Annotated by `StockItemQuerySet.with_pricing()`.
+    ("discount_percentage", "discount_percentage"),
+    ("discounted_price", "discounted_price"),
+    ("created_at", "created_at"),
+    ("updated_at", "updated_at"),
+]
+
+
+class _Echo:
+    """
+    File-like object handing back what the CSV writer writes to it.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def filter_export(
+    queryset: QuerySet[Any],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    updated_since: Optional[datetime] = None,
+) -> QuerySet[Any]:
+    """
+    Restrict an export to rows created between two days, both included, and
+    to rows updated at or after `updated_since`, for incremental pulls.
+    """
+    if start_date:
+        queryset = queryset.filter(created_at__gte=start_of_day(start_date))
+    if end_date:
+        queryset = queryset.filter(
+            created_at__lt=start_of_day(end_date + timedelta(days=1))
+        )
+    if updated_since:
+        queryset = queryset.filter(updated_at__gte=updated_since)
+    return queryset
+
+
+def export_sales(
+    file_format: str, queryset: Optional[QuerySet[Sale]] = None
+) -> Iterator[str]:
+    """
+    Stream sales with their items as CSV, one line per sale item, or as
+    NDJSON, one sale per line with its items nested.
+    """
+    if queryset is None:
+        queryset = Sale.objects.all()
+    lookups = [lookup for _, lookup in SALE_COLUMNS + SALE_ITEM_COLUMNS]
+    rows = _iterate(queryset.order_by("id", "items__id"), lookups)
+
+    if file_format == "csv":
+        header = [name for name, _ in SALE_COLUMNS] + [
+            f"item_{name}" for name, _ in SALE_ITEM_COLUMNS
+        ]
+        return _stream_csv(header, rows)
+
+    def records() -> Iterator[Dict[str, Any]]:
+        sale_width = len(SALE_COLUMNS)
+        for _, sale_rows in groupby(rows, key=lambda row: row[0]):
+            first = next(sale_rows)
+            sale = _record(SALE_COLUMNS, first[:sale_width])
+            sale["items"] = [
+                _record(SALE_ITEM_COLUMNS, row[sale_width:])
+                for row in (first, *sale_rows)
+                # A sale without items still has one row, of NULL item values.
+                if row[sale_width] is not None
+            ]
+            yield sale
+
+    return _stream_ndjson(records())
+
+
+def export_stock_items(
+    file_format: str, queryset: Optional[QuerySet[StockItem]] = None
+) -> Iterator[str]:
+    """
+    Stream stock items as CSV or NDJSON, one stock item per line, with
+    today's discount as served by the API.
+    """
+    if queryset is None:
+        queryset = StockItem.objects.all()
+    queryset = cast(StockItemQuerySet, queryset).with_pricing()
+    rows = _iterate(
+        queryset.order_by("id"), [lookup for _, lookup in STOCK_ITEM_COLUMNS]
+    )
+    if file_format == "csv":
+        return _stream_csv([name for name, _ in STOCK_ITEM_COLUMNS], rows)
+    return _stream_ndjson(_record(STOCK_ITEM_COLUMNS, row) for row in rows)
+
+
+def _iterate(
+    queryset: QuerySet[Any], lookups: Sequence[str]
+) -> Iterator[Tuple[Any, ...]]:
+    return iter(
+        queryset.values_list(*lookups).iterator(
+            chunk_size=settings.REPORTS_EXPORT_CHUNK_SIZE
+        )
+    )
+
+
+def _record(columns: List[Tuple[str, str]], row: Sequence[Any]) -> Dict[str, Any]:
+    return {name: value for (name, _), value in zip(columns, row)}
+
+
+def _stream_csv(header: List[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            ]
+        )
+
+
+def _stream_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + "\n"
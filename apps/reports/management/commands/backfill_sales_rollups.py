@@ -0,0 +1,33 @@
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.reports.services import rebuild_sales_rollups
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the daily sales rollups from the recorded sales.
+    """
+
+    help = "Recompute the sales rollups backing the dashboard from raw sales."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add arguments to restrict the rebuilt period.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day to rebuild (YYYY-MM-DD), defaults to all history",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day to rebuild (YYYY-MM-DD), defaults to all history",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rebuild_sales_rollups(start_date=options["start"], end_date=options["end"])
+        self.stdout.write(self.style.SUCCESS("Sales rollups rebuilt."))
@@ -0,0 +1,82 @@
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.products.models import StockItem
+from apps.reports.exports import (
+    EXPORT_FORMATS,
+    export_sales,
+    export_stock_items,
+    filter_export,
+)
+from apps.sales.models import Sale
+
+
+class Command(BaseCommand):
+    """
+    Streams sales or stock items to a file or standard output for accounting.
+    """
+
+    help = "Export sales or stock items as CSV or NDJSON without loading them all."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """
+        Add arguments to select the data, format, output and period.
+        """
+        parser.add_argument("data", choices=["sales", "stock-items"])
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=sorted(EXPORT_FORMATS),
+            default="ndjson",
+            help="Output format, defaults to NDJSON",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write the export to, defaults to standard output",
+        )
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="First day of creation to export (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last day of creation to export (YYYY-MM-DD)",
+        )
+        parser.add_argument(
+            "--updated-since",
+            help="Only export rows updated at or after this ISO 8601 date and time",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        updated_since = None
+        if options["updated_since"]:
+            updated_since = parse_datetime(options["updated_since"])
+            if updated_since is None:
+                raise CommandError("--updated-since must be an ISO 8601 date and time")
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+
+        if options["data"] == "sales":
+            queryset = filter_export(
+                Sale.objects.all(), options["start"], options["end"], updated_since
+            )
+            content = export_sales(options["file_format"], queryset)
+        else:
+            queryset = filter_export(
+                StockItem.objects.all(), options["start"], options["end"], updated_since
+            )
+            content = export_stock_items(options["file_format"], queryset)
+
+        if not options["output"]:
+            for chunk in content:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", newline="", encoding="utf-8") as output:
+            output.writelines(content)
+        self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}."))
@@ -0,0 +1,109 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:47
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("products", "0002_stockitem_current_discount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyProductSalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailySalesRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("sales_count", models.PositiveIntegerField(default=0)),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="MonthlyCustomerRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("customer_email", models.EmailField(blank=True, max_length=254)),
+            ],
+            options={
+                "ordering": ["-month"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="monthlycustomerrollup",
+            constraint=models.UniqueConstraint(
+                fields=("month", "customer_email"),
+                name="unique_monthly_customer_rollup",
+            ),
+        ),
+        migrations.AddField(
+            model_name="dailyproductsalesrollup",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="products.product"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailyproductsalesrollup",
+            index=models.Index(fields=["date"], name="reports_dai_date_2e9e34_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyproductsalesrollup",
+            constraint=models.UniqueConstraint(
+                fields=("date", "product"), name="unique_daily_product_rollup"
+            ),
+        ),
+    ]
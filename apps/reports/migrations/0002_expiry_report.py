@@ -0,0 +1,122 @@
+# Generated by Django 4.2.30 on 2026-10-17 12:49
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("products", "0006_product_reorder_point"),
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExpiryReport",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("days", models.PositiveIntegerField()),
+                ("item_count", models.PositiveIntegerField(default=0)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "cost_value",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("generated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ExpiryReportGroup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("item_count", models.PositiveIntegerField(default=0)),
+                ("quantity", models.PositiveIntegerField(default=0)),
+                (
+                    "cost_value",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                (
+                    "brand",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="products.brand"
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.category",
+                    ),
+                ),
+                (
+                    "report",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="groups",
+                        to="reports.expiryreport",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-cost_value"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ExpiringStockItem",
+            fields=[
+                (
+                    "stock_item",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="+",
+                        serialize=False,
+                        to="products.stockitem",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                ("cost_price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("expiration_date", models.DateField()),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="products.product",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="expiryreportgroup",
+            constraint=models.UniqueConstraint(
+                fields=("report", "category", "brand"),
+                name="unique_expiry_report_group",
+            ),
+        ),
+    ]
@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+from django.db import models
+
+from apps.products.models import Brand, Category, Product, StockItem
+
+
+class DailySalesRollup(models.Model):
+    """
+    Sales count and revenue per day, maintained as sales change.
+    """
+
+    date = models.DateField(unique=True)
+    sales_count = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.sales_count} sales"
+
+
+class DailyProductSalesRollup(models.Model):
+    """
+    Quantity sold and revenue per day and product, maintained as sales change.
+    """
+
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "product"], name="unique_daily_product_rollup"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.product_id} x {self.quantity}"
+
+
+class MonthlyCustomerRollup(models.Model):
+    """
+    Distinct customers per month, so they can be counted without scanning sales.
+    """
+
+    month = models.DateField()
+    customer_email = models.EmailField(blank=True)
+
+    class Meta:
+        ordering = ["-month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["month", "customer_email"],
+                name="unique_monthly_customer_rollup",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m}: {self.customer_email}"
+
+
+class ExpiringStockItem(models.Model):
+    """
+    Stock item in the expiry window as of the last expiry report, so the next
+    report only rewrites the batches that changed since.
+    """
+
+    stock_item = models.OneToOneField(
+        StockItem, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="+")
+    quantity = models.PositiveIntegerField()
+    cost_price = models.DecimalField(max_digits=10, decimal_places=2)
+    expiration_date = models.DateField()
+
+    def __str__(self) -> str:
+        return f"{self.stock_item_id}: {self.quantity} by {self.expiration_date}"
+
+
+class ExpiryReport(models.Model):
+    """
+    Stock expiring within `days` of `date`, written daily by
+    `apps.reports.expiry.generate_expiry_report`.
+    """
+
+    date = models.DateField(unique=True)
+    days = models.PositiveIntegerField()
+    item_count = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    cost_value = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self) -> str:
+        return f"{self.date}: {self.item_count} expiring items"
+
+
+class ExpiryReportGroup(models.Model):
+    """
+    Expiring stock of one category and brand in an expiry report.
+    """
+
+    report = models.ForeignKey(
+        ExpiryReport, on_delete=models.CASCADE, related_name="groups"
+    )
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    brand = models.ForeignKey(Brand, on_delete=models.CASCADE)
+    item_count = models.PositiveIntegerField(default=0)
+    quantity = models.PositiveIntegerField(default=0)
+    cost_value = models.DecimalField(
+        max_digits=14, decimal_places=2, default=Decimal("0.00")
+    )
+
+    class Meta:
+        ordering = ["-cost_value"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report", "category", "brand"],
+                name="unique_expiry_report_group",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.report_id}: {self.category_id}/{self.brand_id}"
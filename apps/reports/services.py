@@ -0,0 +1,379 @@
+from collections import defaultdict
+import threading
+import time
+from datetime import date, datetime
+from datetime import time as datetime_time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from dateutil.relativedelta import relativedelta
+
+from apps.sales.models import Sale, SaleItem
+
+from .models import DailyProductSalesRollup, DailySalesRollup, MonthlyCustomerRollup
+
+DASHBOARD_CACHE_KEY = "reports:dashboard:data"
+DASHBOARD_LOCK_CACHE_KEY = "reports:dashboard:lock"
+DASHBOARD_VERSION_CACHE_KEY = "reports:dashboard:version"
+
+
+def _increment(
+    model: Type[models.Model], lookup: Dict[str, Any], increments: Dict[str, Any]
+) -> None:
+    """
+    Add `increments` to the counters of the row matching `lookup`, creating it
+    if it does not exist yet.
+    """
+    changes = {field: F(field) + value for field, value in increments.items()}
+    if model._default_manager.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model._default_manager.create(**lookup, **increments)
+    except IntegrityError:
+        # Another sale created the row in the meantime.
+        model._default_manager.filter(**lookup).update(**changes)
+
+
+@transaction.atomic
+def record_sales(sales: Iterable[Sale]) -> None:
+    """
+    Add freshly created sales to the sales rollups.
+
+    The sales' items are read through `sale.sale_items`, which the sales
+    service has already set, so no sale data is queried again.
+    """
+    days: Dict[date, Dict[str, Any]] = defaultdict(
+        lambda: {"sales_count": 0, "revenue": Decimal("0.00")}
+    )
+    products: Dict[Tuple[date, int], Dict[str, Any]] = defaultdict(
+        lambda: {"quantity": 0, "revenue": Decimal("0.00")}
+    )
+    customers: Set[Tuple[date, str]] = set()
+
+    for sale in sales:
+        day = timezone.localtime(sale.created_at).date()
+        days[day]["sales_count"] += 1
+        days[day]["revenue"] += sale.final_amount
+        customers.add((day.replace(day=1), sale.customer_email))
+        for item in sale.sale_items:
+            key = (day, item.stock_item.product_id)
+            products[key]["quantity"] += item.quantity
+            products[key]["revenue"] += item.total_price
+
+    for day, increments in days.items():
+        _increment(DailySalesRollup, {"date": day}, increments)
+    for (day, product_id), increments in products.items():
+        _increment(
+            DailyProductSalesRollup, {"date": day, "product_id": product_id}, increments
+        )
+    MonthlyCustomerRollup.objects.bulk_create(
+        [
+            MonthlyCustomerRollup(month=month, customer_email=email)
+            for month, email in customers
+        ],
+        ignore_conflicts=True,
+    )
+    transaction.on_commit(invalidate_dashboard_data)
+
+
+# Days and sales changed by the current transactions of this thread, rebuilt
+# at most once however many rows changed, see `rebuild_rollups_on_sale_change`.
+_pending_rollups = threading.local()
+
+
+def rebuild_rollups_on_sale_change(
+    sender: Any,
+    instance: models.Model,
+    created: bool = False,
+    origin: Any = None,
+    **kwargs: Any,
+) -> None:
+    """
+    Receiver of `post_save` and `post_delete` for sales and their items.
+
+    Sales created by `apps.sales.services` are added by `record_sales`. Any
+    other change, such as an edit or a deletion in the admin, rebuilds the
+    rollups of the days it touched once the transaction commits.
+    """
+    pending = _pending_rollups.__dict__
+    if isinstance(instance, Sale):
+        if created:
+            return
+        pending.setdefault("days", set()).add(
+            timezone.localtime(instance.created_at).date()
+        )
+    elif isinstance(instance, SaleItem):
+        # Items deleted along with their sale are covered by the sale.
+        if isinstance(origin, Sale) or getattr(origin, "model", None) is Sale:
+            return
+        pending.setdefault("sale_ids", set()).add(instance.sale_id)
+    transaction.on_commit(_rebuild_pending_rollups, robust=True)
+
+
+def _rebuild_pending_rollups() -> None:
+    pending = _pending_rollups.__dict__
+    days: Set[date] = pending.pop("days", set())
+    sale_ids: Set[int] = pending.pop("sale_ids", set())
+    days.update(
+        timezone.localtime(created_at).date()
+        for created_at in Sale.objects.filter(id__in=sale_ids).values_list(
+            "created_at", flat=True
+        )
+    )
+    if days:
+        rebuild_sales_rollups(min(days), max(days))
+
+
+def start_of_day(day: date) -> datetime:
+    """
+    Return the first instant of `day` in the current time zone.
+    """
+    return timezone.make_aware(datetime.combine(day, datetime_time.min))
+
+
+@transaction.atomic
+def rebuild_sales_rollups(
+    start_date: Optional[date] = None, end_date: Optional[date] = None
+) -> None:
+    """
+    Recompute the sales rollups from the raw sales for a period.
+
+    Customer rollups are rebuilt for every whole month the period touches.
+
+    Args:
+        start_date: First day to rebuild, or the beginning of history.
+        end_date: Last day to rebuild, or the end of history.
+    """
+    sales = Sale.objects.all()
+    customer_sales = Sale.objects.all()
+    daily_rollups = DailySalesRollup.objects.all()
+    product_rollups = DailyProductSalesRollup.objects.all()
+    customer_rollups = MonthlyCustomerRollup.objects.all()
+
+    if start_date:
+        first_month = start_date.replace(day=1)
+        sales = sales.filter(created_at__gte=start_of_day(start_date))
+        customer_sales = customer_sales.filter(
+            created_at__gte=start_of_day(first_month)
+        )
+        daily_rollups = daily_rollups.filter(date__gte=start_date)
+        product_rollups = product_rollups.filter(date__gte=start_date)
+        customer_rollups = customer_rollups.filter(month__gte=first_month)
+
+    if end_date:
+        next_month = end_date.replace(day=1) + relativedelta(months=1)
+        sales = sales.filter(
+            created_at__lt=start_of_day(end_date + relativedelta(days=1))
+        )
+        customer_sales = customer_sales.filter(created_at__lt=start_of_day(next_month))
+        daily_rollups = daily_rollups.filter(date__lte=end_date)
+        product_rollups = product_rollups.filter(date__lte=end_date)
+        customer_rollups = customer_rollups.filter(month__lt=next_month)
+
+    daily_rollups.delete()
+    product_rollups.delete()
+    customer_rollups.delete()
+
+    DailySalesRollup.objects.bulk_create(
+        DailySalesRollup(
+            date=row["day"], sales_count=row["sales_count"], revenue=row["revenue"]
+        )
+        for row in sales.annotate(day=TruncDate("created_at"))
+        .values("day")
+        .annotate(sales_count=Count("id"), revenue=Sum("final_amount"))
+        .order_by()
+    )
+    DailyProductSalesRollup.objects.bulk_create(
+        DailyProductSalesRollup(
+            date=row["day"],
+            product_id=row["stock_item__product"],
+            quantity=row["quantity"],
+            revenue=row["revenue"],
+        )
+        for row in SaleItem.objects.filter(sale__in=sales)
+        .annotate(day=TruncDate("sale__created_at"))
+        .values("day", "stock_item__product")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("total_price"))
+        .order_by()
+    )
+    MonthlyCustomerRollup.objects.bulk_create(
+        MonthlyCustomerRollup(month=row["month"], customer_email=row["customer_email"])
+        for row in customer_sales.annotate(
+            month=TruncMonth("created_at", output_field=models.DateField())
+        )
+        .values("month", "customer_email")
+        .distinct()
+        .order_by()
+    )
+    transaction.on_commit(invalidate_dashboard_data)
+
+
+def get_dashboard_version() -> str:
+    """
+    Return the current version of the dashboard data.
+
+    The version is the time of the last sales change, so it also serves as the
+    payload's modification time.
+    """
+    cache.add(DASHBOARD_VERSION_CACHE_KEY, str(time.time()), None)
+    return str(cache.get(DASHBOARD_VERSION_CACHE_KEY) or time.time())
+
+
+def invalidate_dashboard_data() -> None:
+    """
+    Mark the cached dashboard data as outdated after sales changed.
+    """
+    cache.set(DASHBOARD_VERSION_CACHE_KEY, str(time.time()), None)
+
+
+def get_dashboard_data() -> Dict[str, Any]:
+    """
+    Return the dashboard payload along with its ETag and modification time.
+
+    The payload is cached for all viewers until the dashboard version changes
+    or the day rolls over. Only the viewer holding the rebuild lock recomputes
+    an outdated payload; meanwhile everyone else is served the previous one.
+    """
+    today = timezone.localdate()
+    version = get_dashboard_version()
+    cached: Optional[Dict[str, Any]] = cache.get(DASHBOARD_CACHE_KEY)
+    if cached is not None and cached["etag"] == _dashboard_etag(version, today):
+        return cached
+
+    if not cache.add(
+        DASHBOARD_LOCK_CACHE_KEY, True, settings.REPORTS_DASHBOARD_LOCK_TIMEOUT
+    ):
+        if cached is not None:
+            return cached
+        # Nothing to fall back on yet, so compute without sharing the result.
+        return _dashboard_payload(version, today)
+
+    try:
+        payload = _dashboard_payload(version, today)
+        cache.set(DASHBOARD_CACHE_KEY, payload, None)
+    finally:
+        cache.delete(DASHBOARD_LOCK_CACHE_KEY)
+    return payload
+
+
+def _dashboard_etag(version: str, today: date) -> str:
+    # Daily figures change at midnight even without new sales.
+    return f"{version}-{today.isoformat()}"
+
+
+def _dashboard_payload(version: str, today: date) -> Dict[str, Any]:
+    return {
+        "etag": _dashboard_etag(version, today),
+        "last_modified": max(float(version), start_of_day(today).timestamp()),
+        "data": build_dashboard_data(today),
+    }
+
+
+def build_dashboard_data(today: date) -> Dict[str, Any]:
+    """
+    Compute the admin dashboard figures from the sales rollups.
+
+    All calculations use Python's `Decimal` type for accuracy. Final `Decimal`
+    values are converted to strings in the payload to prevent any loss of
+    precision during JavaScript parsing.
+    """
+    current_month_start = today.replace(day=1)
+    thirty_days_ago = today - relativedelta(days=30)
+    six_months_ago = current_month_start - relativedelta(months=5)
+
+    # --- KPI Card Data (Calculated with Decimal) ---
+    this_month = DailySalesRollup.objects.filter(date__gte=current_month_start)
+    rollup_today = this_month.filter(date=today).first()
+
+    revenue_today = rollup_today.revenue if rollup_today else Decimal("0.00")
+    revenue_this_month = this_month.aggregate(total=Sum("revenue"))["total"] or Decimal(
+        "0.00"
+    )
+    sales_count_today = rollup_today.sales_count if rollup_today else 0
+    new_customers_this_month = MonthlyCustomerRollup.objects.filter(
+        month=current_month_start
+    ).count()
+
+    # --- Chart Data (Calculated with Decimal) ---
+    # Monthly sales
+    monthly_sales_data = (
+        DailySalesRollup.objects.filter(date__gte=six_months_ago)
+        .annotate(month=TruncMonth("date"))
+        .values("month")
+        .annotate(total_revenue=Sum("revenue"))
+        .order_by("month")
+    )
+    sales_labels = [d["month"].strftime("%b %Y") for d in monthly_sales_data]
+    sales_values = [d["total_revenue"] or Decimal("0.00") for d in monthly_sales_data]
+
+    # Top 5 Products by Revenue
+    products_last_30_days = DailyProductSalesRollup.objects.filter(
+        date__gte=thirty_days_ago
+    )
+    total_revenue_last_30_days = products_last_30_days.aggregate(total=Sum("revenue"))[
+        "total"
+    ] or Decimal("0.00")
+
+    top_5_revenue = (
+        products_last_30_days.values("product__name")
+        .annotate(total_revenue=Sum("revenue"))
+        .order_by("-total_revenue")[:5]
+    )
+
+    top_5_revenue_list = list(top_5_revenue)
+    top_5_revenue_sum = sum(
+        item["total_revenue"] for item in top_5_revenue_list if item["total_revenue"]
+    )
+    others_revenue = total_revenue_last_30_days - top_5_revenue_sum
+
+    revenue_labels = [item["product__name"] for item in top_5_revenue_list]
+    revenue_values = [
+        item["total_revenue"] or Decimal("0.00") for item in top_5_revenue_list
+    ]
+
+    if others_revenue > 0:
+        revenue_labels.append("Others")
+        revenue_values.append(others_revenue)
+
+    # Top 5 products by quantity
+    top_products_quantity = (
+        products_last_30_days.values("product__name")
+        .annotate(total_quantity=Sum("quantity"))
+        .order_by("-total_quantity")[:5]
+    )
+    quantity_labels = [item["product__name"] for item in top_products_quantity]
+    quantity_values = [item["total_quantity"] or 0 for item in top_products_quantity]
+
+    # --- Prepare final data structure, converting all Decimals to strings ---
+    data = {
+        "kpi": {
+            "revenue_today": str(revenue_today),
+            "revenue_this_month": str(revenue_this_month),
+            "sales_today": sales_count_today,
+            "new_customers_this_month": new_customers_this_month,
+        },
+        "charts": {
+            "monthly_sales": {
+                "labels": sales_labels,
+                "values": [str(v) for v in sales_values],
+            },
+            "top_products_revenue": {
+                "labels": revenue_labels,
+                "values": [str(v) for v in revenue_values],
+                "total": str(total_revenue_last_30_days),
+            },
+            "top_products_quantity": {
+                "labels": quantity_labels,
+                "values": quantity_values,
+            },
+        },
+    }
+    return data
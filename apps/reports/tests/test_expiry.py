@@ -0,0 +1,76 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.products.models import Brand, Category, Product, StockItem
+from apps.reports.expiry import generate_expiry_report
+from apps.reports.models import ExpiringStockItem
+
+
+@override_settings(REPORTS_EXPIRY_CHUNK_SIZE=2)
+class ExpiryReportTest(TestCase):
+    def setUp(self) -> None:
+        """Set up stock expiring within the window for two brands."""
+        self.today = timezone.now().date()
+        self.category = Category.objects.create(name="Analgesics")
+        self.bayer = Brand.objects.create(name="Bayer")
+        acme = Brand.objects.create(name="Acme")
+        self.aspirin = Product.objects.create(
+            name="Aspirin", brand=self.bayer, category=self.category, sku="SKU1"
+        )
+        paracetamol = Product.objects.create(
+            name="Paracetamol", brand=acme, category=self.category, sku="SKU2"
+        )
+        self.soon = self._create_batch(self.aspirin, "B1", 10, days=5)
+        self._create_batch(self.aspirin, "B2", 4, days=20)
+        self._create_batch(paracetamol, "B3", 3, days=10)
+        # Outside the window: expired, and expiring next year.
+        self._create_batch(paracetamol, "B4", 7, days=-1)
+        self._create_batch(paracetamol, "B5", 7, days=365)
+
+    def _create_batch(
+        self, product: Product, batch_number: str, quantity: int, days: int
+    ) -> StockItem:
+        return StockItem.objects.create(
+            product=product,
+            batch_number=batch_number,
+            quantity=quantity,
+            cost_price=Decimal("2.50"),
+            selling_price=Decimal("4.00"),
+            expiration_date=self.today + timedelta(days=days),
+        )
+
+    def test_report_groups_expiring_stock_by_category_and_brand(self) -> None:
+        result = generate_expiry_report(days=30)
+
+        report = result.report
+        self.assertEqual((result.scanned, result.changed), (3, 3))
+        self.assertEqual((report.date, report.days), (self.today, 30))
+        self.assertEqual((report.item_count, report.quantity), (3, 17))
+        self.assertEqual(report.cost_value, Decimal("42.50"))
+        self.assertEqual(
+            [
+                (group.brand.name, group.item_count, group.quantity, group.cost_value)
+                for group in report.groups.all()
+            ],
+            [("Bayer", 2, 14, Decimal("35.00")), ("Acme", 1, 3, Decimal("7.50"))],
+        )
+
+    def test_unchanged_stock_is_not_rewritten(self) -> None:
+        generate_expiry_report(days=30)
+        StockItem.objects.filter(id=self.soon.id).update(quantity=6)
+        moved = StockItem.objects.get(batch_number="B2")
+        moved.expiration_date = self.today + timedelta(days=90)
+        moved.save()
+
+        result = generate_expiry_report(days=30)
+
+        self.assertEqual((result.scanned, result.changed, result.removed), (2, 1, 1))
+        self.assertEqual(
+            ExpiringStockItem.objects.get(stock_item=self.soon).quantity, 6
+        )
+        # The same day's report is replaced.
+        self.assertEqual((result.report.item_count, result.report.quantity), (2, 9))
+        self.assertEqual(result.report.groups.count(), 2)
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import List
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.products.models import Brand, Category, Product, StockItem
+from apps.reports.models import (
+    DailyProductSalesRollup,
+    DailySalesRollup,
+    MonthlyCustomerRollup,
+)
+from apps.reports.services import get_dashboard_version, rebuild_sales_rollups
+from apps.sales.dtos import SaleCreateDTO, SaleItemDTO
+from apps.sales.models import Sale
+from apps.sales.services import create_sale, create_sales_bulk
+
+User = get_user_model()
+
+
+class SalesRollupServiceTest(TestCase):
+    def setUp(self) -> None:
+        """Set up the necessary objects for the test suite."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com",
+            username="testuser",
+            password="testpass123",  # nosec B106
+        )
+        brand = Brand.objects.create(name="Test Brand")
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Test Product", brand=brand, category=category, sku="TEST001"
+        )
+        self.stock_item = StockItem.objects.create(
+            product=self.product,
+            batch_number="BATCH001",
+            quantity=100,
+            cost_price=Decimal("10.00"),
+            selling_price=Decimal("15.00"),
+            expiration_date=timezone.now().date() + timedelta(days=365),
+        )
+        self.today = timezone.localdate()
+
+    def _sale_dto(self, email: str, quantity: int = 1) -> SaleCreateDTO:
+        return SaleCreateDTO(
+            customer_name="John Doe",
+            customer_email=email,
+            customer_phone="",
+            items=[
+                SaleItemDTO(
+                    stock_item_id=self.stock_item.id,
+                    quantity=quantity,
+                    unit_price=Decimal(0),
+                    total_price=Decimal(0),
+                    discount_percentage=Decimal(0),
+                )
+            ],
+        )
+
+    def _create_sales(self, sale_dtos: List[SaleCreateDTO]) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            for sale_dto in sale_dtos:
+                create_sale(sale_dto, self.user)
+
+    def test_created_sales_are_added_to_rollups(self) -> None:
+        self._create_sales(
+            [
+                self._sale_dto("a@example.com", quantity=2),
+                self._sale_dto("b@example.com"),
+                self._sale_dto("a@example.com"),
+            ]
+        )
+
+        daily = DailySalesRollup.objects.get(date=self.today)
+        self.assertEqual(daily.sales_count, 3)
+        self.assertEqual(daily.revenue, Decimal("60.00"))
+        product = DailyProductSalesRollup.objects.get(
+            date=self.today, product=self.product
+        )
+        self.assertEqual(product.quantity, 4)
+        self.assertEqual(product.revenue, Decimal("60.00"))
+        self.assertEqual(
+            MonthlyCustomerRollup.objects.filter(
+                month=self.today.replace(day=1)
+            ).count(),
+            2,
+        )
+
+    def test_bulk_created_sales_are_added_to_rollups(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            create_sales_bulk(
+                [self._sale_dto("a@example.com"), self._sale_dto("b@example.com")],
+                self.user,
+            )
+
+        daily = DailySalesRollup.objects.get(date=self.today)
+        self.assertEqual(daily.sales_count, 2)
+        self.assertEqual(daily.revenue, Decimal("30.00"))
+
+    def test_rollups_are_not_updated_before_commit(self) -> None:
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_sale(self._sale_dto("a@example.com"), self.user)
+
+        self.assertFalse(DailySalesRollup.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertTrue(DailySalesRollup.objects.exists())
+
+    def test_rebuild_recomputes_back_dated_sales(self) -> None:
+        self._create_sales(
+            [self._sale_dto("a@example.com", quantity=3), self._sale_dto("")]
+        )
+        # Back-date one sale, as seeding does, then repair the rollups.
+        sale = Sale.objects.filter(customer_email="").get()
+        two_days_ago = self.today - timedelta(days=2)
+        Sale.objects.filter(pk=sale.pk).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        rebuild_sales_rollups()
+
+        self.assertEqual(
+            {
+                rollup.date: (rollup.sales_count, rollup.revenue)
+                for rollup in DailySalesRollup.objects.all()
+            },
+            {
+                self.today: (1, Decimal("45.00")),
+                two_days_ago: (1, Decimal("15.00")),
+            },
+        )
+        self.assertEqual(
+            DailyProductSalesRollup.objects.get(date=two_days_ago).quantity, 1
+        )
+
+    def test_rebuild_is_limited_to_the_requested_period(self) -> None:
+        self._create_sales([self._sale_dto("a@example.com")])
+        DailySalesRollup.objects.create(
+            date=self.today - timedelta(days=40), sales_count=7
+        )
+
+        rebuild_sales_rollups(start_date=self.today, end_date=self.today)
+
+        self.assertEqual(DailySalesRollup.objects.count(), 2)
+        self.assertEqual(DailySalesRollup.objects.get(date=self.today).sales_count, 1)
+
+    def test_created_sale_invalidates_dashboard(self) -> None:
+        version = get_dashboard_version()
+
+        self._create_sales([self._sale_dto("a@example.com")])
+
+        self.assertNotEqual(get_dashboard_version(), version)
+
+    def test_deleted_sales_are_removed_from_rollups(self) -> None:
+        self._create_sales(
+            [self._sale_dto("a@example.com", quantity=2), self._sale_dto("")]
+        )
+        version = get_dashboard_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Sale.objects.filter(customer_email="").delete()
+
+        daily = DailySalesRollup.objects.get(date=self.today)
+        self.assertEqual((daily.sales_count, daily.revenue), (1, Decimal("30.00")))
+        self.assertEqual(
+            DailyProductSalesRollup.objects.get(date=self.today).quantity, 2
+        )
+        self.assertNotEqual(get_dashboard_version(), version)
+
+    def test_edited_sales_are_rebuilt_in_rollups(self) -> None:
+        self._create_sales([self._sale_dto("a@example.com", quantity=2)])
+        sale = Sale.objects.get()
+        sale.final_amount = Decimal("25.00")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sale.save()
+            sale.items.get().delete()
+
+        daily = DailySalesRollup.objects.get(date=self.today)
+        self.assertEqual((daily.sales_count, daily.revenue), (1, Decimal("25.00")))
+        self.assertFalse(DailyProductSalesRollup.objects.exists())
@@ -0,0 +1,435 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from apps.inventory.services import rebuild_product_availability
+from apps.products.factories.factories import ProductFactory, StockItemFactory
+from apps.products.models import Product, StockItem
+from apps.reports.expiry import generate_expiry_report
+from apps.reports.models import (
+    DailyProductSalesRollup,
+    DailySalesRollup,
+    MonthlyCustomerRollup,
+)
+from apps.reports.services import DASHBOARD_LOCK_CACHE_KEY, invalidate_dashboard_data
+from apps.sales.models import Sale, SaleItem
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestDashboardData:
+    """Integration tests for the admin dashboard data view."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    @pytest.fixture
+    def staff_client(self) -> Client:
+        """Create a client logged in as a staff user."""
+        user = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="testpass123",  # nosec B106
+            is_staff=True,
+        )
+        client = Client()
+        client.force_login(user)
+        return client
+
+    def test_dashboard_reads_rollups(self, staff_client: Client) -> None:
+        today = timezone.localdate()
+        product: Product = ProductFactory(name="Aspirin")  # type: ignore[assignment]
+        DailySalesRollup.objects.create(
+            date=today, sales_count=3, revenue=Decimal("45.00")
+        )
+        DailyProductSalesRollup.objects.create(
+            date=today, product=product, quantity=3, revenue=Decimal("45.00")
+        )
+        DailyProductSalesRollup.objects.create(
+            date=today - timedelta(days=31),
+            product=product,
+            quantity=9,
+            revenue=Decimal("99.00"),
+        )
+        MonthlyCustomerRollup.objects.create(
+            month=today.replace(day=1), customer_email="a@example.com"
+        )
+
+        response = staff_client.get(reverse("reports:dashboard-data"))
+
+        assert response.status_code == 200  # nosec B101
+        data = response.json()
+        assert Decimal(data["kpi"]["revenue_today"]) == 45  # nosec B101
+        assert Decimal(data["kpi"]["revenue_this_month"]) == 45  # nosec B101
+        assert data["kpi"]["sales_today"] == 3  # nosec B101
+        assert data["kpi"]["new_customers_this_month"] == 1  # nosec B101
+        top_revenue = data["charts"]["top_products_revenue"]
+        assert top_revenue["labels"] == ["Aspirin"]  # nosec B101
+        assert Decimal(top_revenue["total"]) == 45  # nosec B101
+        assert data["charts"]["top_products_quantity"] == {  # nosec B101
+            "labels": ["Aspirin"],
+            "values": [3],
+        }
+        assert [  # nosec B101
+            Decimal(value) for value in data["charts"]["monthly_sales"]["values"]
+        ] == [45]
+
+    def test_dashboard_without_sales(self, staff_client: Client) -> None:
+        response = staff_client.get(reverse("reports:dashboard-data"))
+
+        assert response.status_code == 200  # nosec B101
+        assert response.json()["kpi"]["revenue_today"] == "0.00"  # nosec B101
+
+    def test_dashboard_is_served_from_cache_until_invalidated(
+        self, staff_client: Client
+    ) -> None:
+        url = reverse("reports:dashboard-data")
+        staff_client.get(url)
+        DailySalesRollup.objects.create(
+            date=timezone.localdate(), sales_count=1, revenue=Decimal("10.00")
+        )
+
+        cached = staff_client.get(url)
+        invalidate_dashboard_data()
+        refreshed = staff_client.get(url)
+
+        assert cached.json()["kpi"]["sales_today"] == 0  # nosec B101
+        assert refreshed.json()["kpi"]["sales_today"] == 1  # nosec B101
+        assert cached["ETag"] != refreshed["ETag"]  # nosec B101
+
+    def test_dashboard_answers_conditional_requests(self, staff_client: Client) -> None:
+        url = reverse("reports:dashboard-data")
+        response = staff_client.get(url)
+
+        by_etag = staff_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        by_date = staff_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        invalidate_dashboard_data()
+        changed = staff_client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        assert by_etag.status_code == 304  # nosec B101
+        assert by_date.status_code == 304  # nosec B101
+        assert changed.status_code == 200  # nosec B101
+
+    def test_stale_dashboard_is_served_while_rebuilding(
+        self, staff_client: Client
+    ) -> None:
+        url = reverse("reports:dashboard-data")
+        stale = staff_client.get(url)
+        invalidate_dashboard_data()
+        DailySalesRollup.objects.create(
+            date=timezone.localdate(), sales_count=1, revenue=Decimal("10.00")
+        )
+
+        # Another viewer is rebuilding the payload.
+        cache.set(DASHBOARD_LOCK_CACHE_KEY, True)
+        response = staff_client.get(url)
+
+        assert response["ETag"] == stale["ETag"]  # nosec B101
+        assert response.json()["kpi"]["sales_today"] == 0  # nosec B101
+
+
+@pytest.mark.django_db
+class TestInventoryValue:
+    """Integration tests for the inventory value endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_inventory_value_grouped_by_category(
+        self, authenticated_client: APIClient
+    ) -> None:
+        stock_item = StockItemFactory(
+            quantity=4, cost_price=Decimal("2.50"), selling_price=Decimal("4.00")
+        )
+
+        response = authenticated_client.get(
+            reverse("reports:inventory-value"), {"group_by": "category"}
+        )
+
+        assert response.status_code == 200  # nosec B101
+        assert Decimal(response.data["total_cost_value"]) == 10  # nosec B101
+        (group,) = response.data["groups"]
+        assert group["name"] == stock_item.product.category.name  # nosec B101
+        assert Decimal(group["potential_profit"]) == 6  # nosec B101
+
+    def test_inventory_value_rejects_unknown_grouping(
+        self, authenticated_client: APIClient
+    ) -> None:
+        response = authenticated_client.get(
+            reverse("reports:inventory-value"), {"group_by": "supplier"}
+        )
+
+        assert response.status_code == 400  # nosec B101
+
+
+@pytest.mark.django_db
+class TestInventorySummary:
+    """Integration tests for the inventory summary endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def test_inventory_summary_params(self, authenticated_client: APIClient) -> None:
+        today = timezone.now().date()
+        StockItemFactory(quantity=5, expiration_date=today + timedelta(days=10))
+        StockItemFactory(quantity=50, expiration_date=today + timedelta(days=90))
+        rebuild_product_availability()
+
+        default = authenticated_client.get(reverse("reports:inventory-summary"))
+        custom = authenticated_client.get(
+            reverse("reports:inventory-summary"), {"threshold": 50, "days": 100}
+        )
+
+        assert default.data == {  # nosec B101
+            "total_products": 2,
+            "total_quantity": 55,
+            "low_stock_items": 1,
+            "low_stock_products": 1,
+            "expiring_items": 1,
+        }
+        assert custom.data["low_stock_items"] == 2  # nosec B101
+        assert custom.data["low_stock_products"] == 2  # nosec B101
+        assert custom.data["expiring_items"] == 2  # nosec B101
+
+    def test_expiry_report(self, authenticated_client: APIClient) -> None:
+        url = reverse("reports:expiry-report")
+        assert authenticated_client.get(url).status_code == 404  # nosec B101
+
+        today = timezone.now().date()
+        stock_item = StockItemFactory(
+            quantity=4,
+            cost_price=Decimal("2.50"),
+            expiration_date=today + timedelta(days=3),
+        )
+        generate_expiry_report()
+
+        response = authenticated_client.get(url)
+
+        assert response.status_code == 200  # nosec B101
+        assert response.data["date"] == today.isoformat()  # nosec B101
+        assert response.data["total_cost_value"] == "10.00"  # nosec B101
+        assert response.data["groups"] == [  # nosec B101
+            {
+                "category": stock_item.product.category.name,
+                "brand": stock_item.product.brand.name,
+                "item_count": 1,
+                "quantity": 4,
+                "cost_value": "10.00",
+            }
+        ]
+        yesterday = (today - timedelta(days=1)).isoformat()
+        assert (
+            authenticated_client.get(url, {"date": yesterday}).status_code == 404
+        )  # nosec B101
+        assert (
+            authenticated_client.get(url, {"date": "x"}).status_code == 400
+        )  # nosec B101
+
+    @pytest.mark.parametrize("params", [{"threshold": "x"}, {"days": "-1"}])
+    def test_inventory_summary_rejects_invalid_params(
+        self, authenticated_client: APIClient, params: dict[str, str]
+    ) -> None:
+        response = authenticated_client.get(
+            reverse("reports:inventory-summary"), params
+        )
+
+        assert response.status_code == 400  # nosec B101
+
+
+@pytest.mark.django_db
+class TestExports:
+    """Integration tests for the streaming sales and stock exports."""
+
+    @pytest.fixture
+    def authenticated_client(self) -> APIClient:
+        """Create an authenticated API client."""
+        user = User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def _sale(self, final_amount: str = "10.00") -> Sale:
+        return Sale.objects.create(
+            customer_name="Customer",
+            total_amount=Decimal(final_amount),
+            final_amount=Decimal(final_amount),
+        )
+
+    def _sale_item(self, sale: Sale, quantity: int = 1) -> SaleItem:
+        return SaleItem.objects.create(
+            sale=sale,
+            stock_item=StockItemFactory.create(),
+            quantity=quantity,
+            unit_price=Decimal("5.00"),
+            total_price=Decimal("5.00") * quantity,
+        )
+
+    def _content(self, response: Any) -> bytes:
+        return b"".join(response.streaming_content)
+
+    def test_sales_ndjson_nests_items(self, authenticated_client: APIClient) -> None:
+        sale = self._sale(final_amount="12.50")
+        first = self._sale_item(sale)
+        second = self._sale_item(sale)
+        empty_sale = self._sale()
+
+        response = authenticated_client.get(
+            reverse("reports:sales-export", kwargs={"file_format": "ndjson"})
+        )
+
+        assert response.status_code == 200  # nosec B101
+        assert response.streaming  # nosec B101
+        assert response["Content-Type"] == "application/x-ndjson"  # nosec B101
+        records = [json.loads(line) for line in self._content(response).splitlines()]
+        assert [record["id"] for record in records] == [  # nosec B101
+            sale.id,
+            empty_sale.id,
+        ]
+        assert records[0]["final_amount"] == "12.50"  # nosec B101
+        assert [item["id"] for item in records[0]["items"]] == [  # nosec B101
+            first.id,
+            second.id,
+        ]
+        assert records[0]["items"][0]["product_sku"] == (  # nosec B101
+            first.stock_item.product.sku
+        )
+        assert records[1]["items"] == []  # nosec B101
+
+    def test_sales_csv_has_a_row_per_item(
+        self, authenticated_client: APIClient
+    ) -> None:
+        sale_item = self._sale_item(self._sale(), quantity=3)
+
+        response = authenticated_client.get(
+            reverse("reports:sales-export", kwargs={"file_format": "csv"})
+        )
+
+        rows = list(csv.DictReader(io.StringIO(self._content(response).decode())))
+        assert response["Content-Disposition"] == (  # nosec B101
+            'attachment; filename="sales.csv"'
+        )
+        assert len(rows) == 1  # nosec B101
+        assert rows[0]["id"] == str(sale_item.sale_id)  # nosec B101
+        assert rows[0]["item_id"] == str(sale_item.id)  # nosec B101
+        assert rows[0]["item_quantity"] == "3"  # nosec B101
+
+    def test_exports_filter_by_period_and_update(
+        self, authenticated_client: APIClient
+    ) -> None:
+        old = self._sale()
+        recent = self._sale()
+        Sale.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(days=10),
+            updated_at=timezone.now() - timedelta(days=10),
+        )
+        url = reverse("reports:sales-export", kwargs={"file_format": "ndjson"})
+
+        def exported_ids(params: Dict[str, str]) -> List[int]:
+            response = authenticated_client.get(url, params)
+            content = self._content(response)
+            return [json.loads(line)["id"] for line in content.splitlines()]
+
+        today = timezone.localdate()
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        assert exported_ids({"start": str(today)}) == [recent.id]  # nosec B101
+        assert exported_ids({"end": str(today - timedelta(days=1))}) == [  # nosec B101
+            old.id
+        ]
+        assert exported_ids({"updated_since": since}) == [recent.id]  # nosec B101
+
+    def test_stock_items_csv(self, authenticated_client: APIClient) -> None:
+        stock_item = StockItemFactory.create(batch_number="B-1", quantity=7)
+
+        response = authenticated_client.get(
+            reverse("reports:stock-items-export", kwargs={"file_format": "csv"})
+        )
+
+        rows = list(csv.DictReader(io.StringIO(self._content(response).decode())))
+        assert rows == [  # nosec B101
+            {
+                **rows[0],
+                "id": str(stock_item.id),
+                "batch_number": "B-1",
+                "quantity": "7",
+                "expiration_date": stock_item.expiration_date.isoformat(),
+            }
+        ]
+
+    def test_stock_items_export_prices_rows_not_refreshed_yet(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that bulk-inserted stock is exported with today's discount."""
+        stock_item = StockItemFactory.create(
+            selling_price=Decimal("2.00"),
+            expiration_date=timezone.now().date() + timedelta(days=30),
+        )
+        StockItem.objects.filter(id=stock_item.id).update(
+            current_discount_percentage=None, current_discounted_price=None
+        )
+
+        response = authenticated_client.get(
+            reverse("reports:stock-items-export", kwargs={"file_format": "ndjson"})
+        )
+
+        [record] = [json.loads(line) for line in self._content(response).splitlines()]
+        assert record["discount_percentage"] == 35  # nosec B101
+        assert Decimal(record["discounted_price"]) == Decimal("1.30")  # nosec B101
+
+    def test_exports_reject_invalid_filters(
+        self, authenticated_client: APIClient
+    ) -> None:
+        url = reverse("reports:stock-items-export", kwargs={"file_format": "csv"})
+
+        assert (  # nosec B101
+            authenticated_client.get(url, {"start": "yesterday"}).status_code == 400
+        )
+        assert (  # nosec B101
+            authenticated_client.get(url, {"updated_since": "soon"}).status_code == 400
+        )
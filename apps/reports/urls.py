@@ -1,10 +1,13 @@
-from django.urls import path
+from django.urls import path, re_path
 
 from .views import (
     dashboard_data,
+    expiry_report,
     inventory_summary,
     inventory_value,
+    sales_export,
     sales_summary,
+    stock_items_export,
 )
 
 app_name = "reports"
@@ -14,4 +17,15 @@ urlpatterns = [
     path("inventory/summary/", inventory_summary, name="inventory-summary"),
     path("sales/summary/", sales_summary, name="sales-summary"),
     path("inventory/value/", inventory_value, name="inventory-value"),
+    path("inventory/expiring/", expiry_report, name="expiry-report"),
+    re_path(
+        r"^exports/sales\.(?P<file_format>csv|ndjson)$",
+        sales_export,
+        name="sales-export",
+    ),
+    re_path(
+        r"^exports/stock-items\.(?P<file_format>csv|ndjson)$",
+        stock_items_export,
+        name="stock-items-export",
+    ),
 ]
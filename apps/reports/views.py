@@ -1,136 +1,52 @@
-from decimal import Decimal
-from typing import Any, Dict, no_type_check
+from datetime import date, datetime
+from typing import Any, Iterator, Optional
 
 from django.contrib.admin.views.decorators import staff_member_required
-from django.core.cache import cache
-from django.db.models import Sum
-from django.db.models.functions import TruncMonth
-from django.http import HttpRequest, JsonResponse
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.http import http_date, quote_etag
 
 from dateutil.relativedelta import relativedelta
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from apps.products.models import StockItem
-from apps.products.services import get_expiring_products, get_low_stock_products
-from apps.sales.models import Sale, SaleItem
+from apps.products.services import get_inventory_summary, get_inventory_value
+from apps.sales.models import Sale
 from apps.sales.services import get_sales_report
 
+from .expiry import serialize_expiry_report
+from .exports import EXPORT_FORMATS, export_sales, export_stock_items, filter_export
+from .models import ExpiryReport
+from .services import get_dashboard_data
+
 
-@no_type_check
 @staff_member_required
-def dashboard_data(request: HttpRequest) -> JsonResponse:
+def dashboard_data(request: HttpRequest) -> HttpResponse:
     """
     Provides data for the admin dashboard, following best practices for monetary values.
 
-    This view performs all calculations using Python's `Decimal` type for accuracy.
-    Final `Decimal` values are converted to strings in the JSON payload to prevent
-    any loss of precision during JavaScript parsing.
+    The payload is shared by all viewers through the cache and rebuilt only
+    after sales change. It carries `ETag` and `Last-Modified` headers so that
+    polling browsers are answered with 304 Not Modified until then.
     """
-    today = timezone.now().date()
-    current_month_start = today.replace(day=1)
-    thirty_days_ago = today - relativedelta(days=30)
-    six_months_ago = current_month_start - relativedelta(months=5)
-
-    # --- KPI Card Data (Calculated with Decimal) ---
-    sales_today = Sale.objects.filter(created_at__date=today)
-    sales_this_month = Sale.objects.filter(created_at__gte=current_month_start)
-
-    revenue_today = sales_today.aggregate(total=Sum("final_amount"))[
-        "total"
-    ] or Decimal("0.00")
-    revenue_this_month = sales_this_month.aggregate(total=Sum("final_amount"))[
-        "total"
-    ] or Decimal("0.00")
-    sales_count_today = sales_today.count()
-    new_customers_this_month = (
-        Sale.objects.filter(created_at__gte=current_month_start)
-        .values("customer_email")
-        .distinct()
-        .count()
-    )
-
-    # --- Chart Data (Calculated with Decimal) ---
-    # Monthly sales
-    monthly_sales_data = (
-        Sale.objects.filter(created_at__gte=six_months_ago)
-        .annotate(month=TruncMonth("created_at"))
-        .values("month")
-        .annotate(total_revenue=Sum("final_amount"))
-        .order_by("month")
-    )
-    sales_labels = [d["month"].strftime("%b %Y") for d in monthly_sales_data]
-    sales_values = [d["total_revenue"] or Decimal("0.00") for d in monthly_sales_data]
+    dashboard = get_dashboard_data()
+    etag = quote_etag(dashboard["etag"])
+    last_modified = int(dashboard["last_modified"])
 
-    # Top 5 Products by Revenue
-    items_last_30_days = SaleItem.objects.filter(
-        sale__created_at__date__gte=thirty_days_ago
-    )
-    total_revenue_last_30_days = items_last_30_days.aggregate(total=Sum("total_price"))[
-        "total"
-    ] or Decimal("0.00")
-
-    top_5_revenue = (
-        items_last_30_days.select_related("stock_item__product")
-        .values("stock_item__product__name")
-        .annotate(total_revenue=Sum("total_price"))
-        .order_by("-total_revenue")[:5]
-    )
-
-    top_5_revenue_list = list(top_5_revenue)
-    top_5_revenue_sum = sum(
-        item["total_revenue"] for item in top_5_revenue_list if item["total_revenue"]
-    )
-    others_revenue = total_revenue_last_30_days - top_5_revenue_sum
-
-    revenue_labels = [item["stock_item__product__name"] for item in top_5_revenue_list]
-    revenue_values = [
-        item["total_revenue"] or Decimal("0.00") for item in top_5_revenue_list
-    ]
-
-    if others_revenue > 0:
-        revenue_labels.append("Others")
-        revenue_values.append(others_revenue)
-
-    # Top 5 products by quantity
-    top_products_quantity = (
-        items_last_30_days.select_related("stock_item__product")
-        .values("stock_item__product__name")
-        .annotate(total_quantity=Sum("quantity"))
-        .order_by("-total_quantity")[:5]
-    )
-    quantity_labels = [
-        item["stock_item__product__name"] for item in top_products_quantity
-    ]
-    quantity_values = [item["total_quantity"] or 0 for item in top_products_quantity]
-
-    # --- Prepare final data structure, converting all Decimals to strings ---
-    data = {
-        "kpi": {
-            "revenue_today": str(revenue_today),
-            "revenue_this_month": str(revenue_this_month),
-            "sales_today": sales_count_today,
-            "new_customers_this_month": new_customers_this_month,
-        },
-        "charts": {
-            "monthly_sales": {
-                "labels": sales_labels,
-                "values": [str(v) for v in sales_values],
-            },
-            "top_products_revenue": {
-                "labels": revenue_labels,
-                "values": [str(v) for v in revenue_values],
-                "total": str(total_revenue_last_30_days),
-            },
-            "top_products_quantity": {
-                "labels": quantity_labels,
-                "values": quantity_values,
-            },
-        },
-    }
-    return JsonResponse(data)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or JsonResponse(dashboard["data"])
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
 # --- Existing API views below, now refactored for precision ---
@@ -141,21 +57,54 @@ def dashboard_data(request: HttpRequest) -> JsonResponse:
 def inventory_summary(request: HttpRequest) -> Response:
     """
     Get a summary of the current inventory status.
+
+    `?threshold=` sets the quantity at or below which stock counts as low
+    (default 10) and `?days=` how far ahead expiring stock is counted
+    (default 30).
     """
-    total_products = StockItem.objects.count()
-    total_quantity = StockItem.objects.aggregate(total=Sum("quantity"))["total"] or 0
-
-    low_stock_items = get_low_stock_products().count()
-    expiring_items = get_expiring_products().count()
-
-    return Response(
-        {
-            "total_products": total_products,
-            "total_quantity": total_quantity,
-            "low_stock_items": low_stock_items,
-            "expiring_items": expiring_items,
-        }
-    )
+    try:
+        threshold = _non_negative_int_param(request, "threshold", 10)
+        days = _non_negative_int_param(request, "days", 30)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(get_inventory_summary(threshold=threshold, days=days))
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def expiry_report(request: HttpRequest) -> Response:
+    """
+    Get the latest daily report of the stock about to expire, grouped by
+    category and brand, or the report of `?date=` (YYYY-MM-DD).
+
+    Reports are written by the `daily_expiring_products_check` task, so
+    reading one does not scan the stock.
+    """
+    try:
+        report_date = _date_param(request, "date")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    reports = ExpiryReport.objects.all()
+    if report_date is not None:
+        reports = reports.filter(date=report_date)
+    report = reports.order_by("-date").first()
+    if report is None:
+        return Response(
+            {"error": "No expiry report has been generated yet"},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(serialize_expiry_report(report))
+
+
+def _non_negative_int_param(request: HttpRequest, name: str, default: int) -> int:
+    value = request.GET.get(name)
+    if value is None:
+        return default
+    if not value.isdigit():
+        raise ValueError(f"{name} must be a non-negative integer")
+    return int(value)
 
 
 @api_view(["GET"])
@@ -177,32 +126,87 @@ def sales_summary(request: HttpRequest) -> Response:
 def inventory_value(request: HttpRequest) -> Response:
     """
     Calculate the total value of inventory based on cost and selling price.
-    Results are cached for 1 hour to improve performance.
+
+    Pass `?group_by=brand` or `?group_by=category` to also get the totals per
+    brand or category. Results are cached until the stock changes.
+    """
+    group_by = request.GET.get("group_by") or None
+    try:
+        return Response(get_inventory_value(group_by))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def sales_export(request: HttpRequest, file_format: str) -> HttpResponseBase:
     """
-    cache_key = "inventory_value"
-    cached_result = cache.get(cache_key)
+    Stream all sales with their items as CSV or NDJSON.
 
-    if cached_result:
-        return Response(cached_result)
+    `?start=` and `?end=` (YYYY-MM-DD) restrict the export to sales created
+    on those days, `?updated_since=` (ISO 8601) to sales updated since then.
+    """
+    try:
+        queryset = _filter_export_request(request, Sale.objects.all())
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return _streaming_export(export_sales(file_format, queryset), "sales", file_format)
 
-    stock_items = StockItem.objects.all()
 
-    total_cost_value = Decimal("0")
-    total_selling_value = Decimal("0")
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def stock_items_export(request: HttpRequest, file_format: str) -> HttpResponseBase:
+    """
+    Stream all stock items as CSV or NDJSON, with the filters of `sales_export`.
+    """
+    try:
+        queryset = _filter_export_request(request, StockItem.objects.all())
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return _streaming_export(
+        export_stock_items(file_format, queryset), "stock-items", file_format
+    )
 
-    # Use iterator() for memory efficiency on large datasets.
-    for item in stock_items.iterator():
-        total_cost_value += item.cost_price * item.quantity
-        total_selling_value += item.selling_price * item.quantity
 
-    # Convert final Decimal values to strings for the API response.
-    result: Dict[str, Any] = {
-        "total_cost_value": str(total_cost_value),
-        "total_selling_value": str(total_selling_value),
-        "potential_profit": str(total_selling_value - total_cost_value),
-    }
+def _filter_export_request(
+    request: HttpRequest, queryset: QuerySet[Any]
+) -> QuerySet[Any]:
+    return filter_export(
+        queryset,
+        start_date=_date_param(request, "start"),
+        end_date=_date_param(request, "end"),
+        updated_since=_datetime_param(request, "updated_since"),
+    )
 
-    # Cache for 1 hour (3600 seconds).
-    cache.set(cache_key, result, 3600)
 
-    return Response(result)
+def _streaming_export(
+    content: Iterator[str], name: str, file_format: str
+) -> StreamingHttpResponse:
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[file_format])
+    response["Content-Disposition"] = f'attachment; filename="{name}.{file_format}"'
+    return response
+
+
+def _date_param(request: HttpRequest, name: str) -> Optional[date]:
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def _datetime_param(request: HttpRequest, name: str) -> Optional[datetime]:
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"{name} must be an ISO 8601 date and time")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
@@ -1,11 +1,16 @@
-import json
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
+from django.conf import settings
 from django.contrib import admin
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
 from django.db.models import Model
-from django.http import HttpRequest
+from django.http import HttpRequest, JsonResponse
+from django.urls import URLPattern, path, reverse
+from django.utils import timezone
 
-from apps.products.models import StockItem
+from apps.core.pagination import EstimatedCountPaginator
+from apps.products.models import StockItem, get_inventory_version
 from .models import Sale, SaleItem
 
 if TYPE_CHECKING:
@@ -15,6 +20,55 @@ else:
     SaleItemInlineBase = admin.TabularInline
     SaleAdminBase = admin.ModelAdmin
 
+# Most stock items whose pricing the sale form may request at once.
+MAX_STOCK_PRICING_IDS = 100
+
+
+def get_stock_pricing(stock_item_ids: List[int]) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the price, discount and available quantity of stock items for the
+    sale form, keyed by id.
+
+    Each item is cached until stock changes or the day rolls over, so only the
+    items missing from the cache are read, with one query.
+    """
+    prefix = (
+        f"sales:admin_stock_pricing:{get_inventory_version()}:"
+        f"{timezone.now().date().isoformat()}"
+    )
+    keys = {
+        f"{prefix}:{stock_item_id}": str(stock_item_id)
+        for stock_item_id in stock_item_ids
+    }
+    pricing: Dict[str, Dict[str, Any]] = {
+        keys[key]: data for key, data in cache.get_many(keys).items()
+    }
+
+    missing = [
+        key for key, stock_item_id in keys.items() if stock_item_id not in pricing
+    ]
+    if missing:
+        fetched = {
+            str(item.id): {
+                # Convert Decimal to string to preserve precision in JSON.
+                "selling_price": str(item.selling_price),
+                "discount_percentage": item.discount_percentage,
+                "quantity": item.quantity,
+            }
+            for item in StockItem.objects.filter(
+                id__in=[keys[key] for key in missing]
+            ).with_pricing()
+        }
+        cache.set_many(
+            {
+                f"{prefix}:{stock_item_id}": data
+                for stock_item_id, data in fetched.items()
+            },
+            settings.SALES_ADMIN_PRICING_CACHE_TIMEOUT,
+        )
+        pricing.update(fetched)
+    return pricing
+
 
 class SaleItemInline(SaleItemInlineBase):
     """
@@ -24,6 +78,9 @@ class SaleItemInline(SaleItemInlineBase):
 
     model = SaleItem
     extra = 1
+    # Stock items are looked up page by page as the user types, see
+    # `StockItemAdmin.get_search_results`, instead of listed in every row.
+    autocomplete_fields = ["stock_item"]
 
     def get_formset(self, request: Any, obj: Any = None, **kwargs: Any) -> Any:
         """
@@ -52,10 +109,13 @@ class SaleAdmin(SaleAdminBase):
     add_form_template = "admin/sales/sale/change_form.html"
     change_form_template = "admin/sales/sale/change_form.html"
     list_display = ("id", "customer_name", "total_amount", "final_amount", "created_at")
-    list_filter = ("created_at",)
+    # Navigated through the index on created_at rather than filtered.
+    date_hierarchy = "created_at"
     search_fields = ("customer_name", "customer_email", "customer_phone")
     ordering = ("-created_at",)
     inlines = [SaleItemInline]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def get_form(
         self,
@@ -82,23 +142,48 @@ class SaleAdmin(SaleAdminBase):
                 ] = "background-color: #333;"
         return form
 
-    def _get_stock_data_json(self) -> str:
+    def get_urls(self) -> List[URLPattern]:
         """
-        Helper method to fetch all available stock items and serialize them to a JSON string.
-        The data includes price, discount, and available quantity for the frontend.
+        Add the stock pricing lookup used by the sale form's JavaScript.
         """
-        # Fetch only items that are in stock to avoid cluttering the data.
-        stock_items = StockItem.objects.filter(quantity__gt=0)
-        stock_items_data = {
-            item.id: {
-                # Convert Decimal to string to preserve precision in JSON.
-                "selling_price": str(item.selling_price),
-                "discount_percentage": item.discount_percentage,
-                "quantity": item.quantity,
-            }
-            for item in stock_items
+        return [
+            path(
+                "stock-pricing/",
+                self.admin_site.admin_view(self.stock_pricing_view),
+                name="sales_sale_stock_pricing",
+            ),
+            *super().get_urls(),
+        ]
+
+    def stock_pricing_view(self, request: HttpRequest) -> JsonResponse:
+        """
+        Return the pricing of the stock items given as `?id=`, see
+        `get_stock_pricing`.
+        """
+        if not (
+            self.has_add_permission(request) or self.has_change_permission(request)
+        ):
+            raise PermissionDenied
+        try:
+            stock_item_ids = [int(value) for value in request.GET.getlist("id")]
+        except ValueError:
+            return JsonResponse({"error": "id must be an integer"}, status=400)
+        if len(stock_item_ids) > MAX_STOCK_PRICING_IDS:
+            return JsonResponse(
+                {"error": f"At most {MAX_STOCK_PRICING_IDS} ids can be requested"},
+                status=400,
+            )
+        return JsonResponse(get_stock_pricing(stock_item_ids))
+
+    def _sale_form_context(
+        self, extra_context: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        return {
+            **(extra_context or {}),
+            "stock_pricing_url": reverse(
+                f"{self.admin_site.name}:sales_sale_stock_pricing"
+            ),
         }
-        return json.dumps(stock_items_data)
 
     def add_view(
         self,
@@ -107,12 +192,12 @@ class SaleAdmin(SaleAdminBase):
         extra_context: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """
-        Overrides the default add view to inject stock item data into the template context.
-        This makes the data available for our custom JavaScript.
+        Overrides the default add view to pass the stock pricing lookup URL to
+        our custom JavaScript.
         """
-        extra_context = extra_context or {}
-        extra_context["stock_items_json"] = self._get_stock_data_json()
-        return super().add_view(request, form_url, extra_context=extra_context)
+        return super().add_view(
+            request, form_url, extra_context=self._sale_form_context(extra_context)
+        )
 
     def change_view(
         self,
@@ -122,11 +207,12 @@ class SaleAdmin(SaleAdminBase):
         extra_context: Optional[Dict[str, Any]] = None,
     ) -> Any:
         """
-        Overrides the default change view to inject stock item data,
+        Overrides the default change view to pass the stock pricing lookup URL,
         ensuring the functionality works for both creating and editing sales.
         """
-        extra_context = extra_context or {}
-        extra_context["stock_items_json"] = self._get_stock_data_json()
         return super().change_view(
-            request, object_id, form_url, extra_context=extra_context
+            request,
+            object_id,
+            form_url,
+            extra_context=self._sale_form_context(extra_context),
         )
@@ -1,8 +1,11 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from django.contrib.auth.models import User
 
+if TYPE_CHECKING:
+    from .models import Sale
+
 
 @dataclass
 class SaleItemDTO:
@@ -15,6 +18,18 @@ class SaleItemDTO:
     discount_percentage: Decimal
 
 
+@dataclass
+class SaleProductItemDTO:
+    """
+    Data Transfer Object for a sale line naming a product rather than a batch.
+
+    The service allocates it to the product's batches, see `create_sale`.
+    """
+
+    product_id: int
+    quantity: int
+
+
 @dataclass
 class SaleCreateDTO:
     """Data Transfer Object for creating a sale."""
@@ -24,3 +39,23 @@ class SaleCreateDTO:
     customer_phone: str
     items: List[SaleItemDTO]
     user: Optional[User] = None
+    product_items: List[SaleProductItemDTO] = field(default_factory=list)
+
+
+@dataclass
+class SaleBulkResultDTO:
+    """Data Transfer Object for the outcome of one sale in a bulk creation."""
+
+    index: int
+    sale: Optional["Sale"] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class SaleQuoteDTO:
+    """Data Transfer Object for the pricing of a sale that was not created."""
+
+    items: List[SaleItemDTO]
+    total_amount: Decimal
+    discount_amount: Decimal
+    final_amount: Decimal
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.30 on 2026-10-17 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sales", "0003_idempotencykey"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="sale",
+            name="sales_sale_created_66311a_idx",
+        ),
+        migrations.AddIndex(
+            model_name="sale",
+            index=models.Index(
+                fields=["-created_at", "id"], name="sales_sale_created_59c425_idx"
+            ),
+        ),
+    ]
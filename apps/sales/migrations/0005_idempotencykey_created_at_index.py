@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sales", "0004_sale_created_at_id_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="idempotencykey",
+            index=models.Index(
+                fields=["created_at"], name="sales_idemp_created_09849e_idx"
+            ),
+        ),
+    ]
@@ -2,7 +2,7 @@ from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from apps.products.models import StockItem
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional
 from django.contrib.auth import get_user_model
 
 if TYPE_CHECKING:
@@ -31,13 +31,29 @@ class Sale(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["-created_at"]),
+            # Also serves cursor pagination, see `SaleViewSet.cursor_ordering`.
+            models.Index(fields=["-created_at", "id"]),
             models.Index(fields=["customer_name"]),
         ]
 
     def __str__(self) -> str:
         return f"Sale #{self.id} - {self.customer_name}"
 
+    @property
+    def sale_items(self) -> List["SaleItem"]:
+        """
+        The sale's items, as set by `apps.sales.services` when it created them
+        or else read through `items`, which views prefetch.
+        """
+        attached: Optional[List[SaleItem]] = self.__dict__.get("_sale_items")
+        if attached is not None:
+            return attached
+        return list(self.items.all())
+
+    @sale_items.setter
+    def sale_items(self, value: List["SaleItem"]) -> None:
+        self.__dict__["_sale_items"] = value
+
 
 class SaleItem(models.Model):
     """SaleItem model for tracking individual items in a sale."""
@@ -56,3 +72,33 @@ class SaleItem(models.Model):
 
     def __str__(self) -> str:
         return f"{self.stock_item.product.name} x {self.quantity}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    Stored response of a sale creation, keyed by the client's Idempotency-Key.
+
+    A retried request carrying the same key is answered with the stored
+    response instead of creating the sale again.
+    """
+
+    key = models.CharField(max_length=255)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    request_fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField()
+    response_body = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_idempotency_key_per_user"
+            ),
+        ]
+        indexes = [
+            # Pruning by age, see `prune_idempotency_keys`.
+            models.Index(fields=["created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.user_id})"
@@ -1,6 +1,9 @@
+from decimal import Decimal
 from rest_framework import serializers
 from typing import Any, Dict
-from .dtos import SaleCreateDTO, SaleItemDTO
+
+from apps.core.fieldsets import SparseFieldsetSerializerMixin
+from .dtos import SaleCreateDTO, SaleItemDTO, SaleProductItemDTO, SaleQuoteDTO
 from .models import Sale, SaleItem
 
 
@@ -18,14 +21,30 @@ class SaleItemSerializer(serializers.ModelSerializer[SaleItem]):
         read_only_fields = ("sale",)
 
 
-class SaleItemCreateSerializer(serializers.ModelSerializer[SaleItem]):
-    class Meta:
-        model = SaleItem
-        fields = ("stock_item", "quantity")
+class SaleItemCreateSerializer(serializers.Serializer[Dict[str, Any]]):
+    """
+    Sale item of a sale creation request.
+
+    Items reference either a `stock_item` (batch) by id, or a `product` whose
+    batches the service picks first expiry first out. The service resolves all
+    of them with a single query instead of one lookup per item during
+    validation.
+    """
+
+    stock_item = serializers.IntegerField(min_value=1, required=False)
+    product = serializers.IntegerField(min_value=1, required=False)
+    quantity = serializers.IntegerField(min_value=0, max_value=2147483647)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if ("stock_item" in attrs) == ("product" in attrs):
+            raise serializers.ValidationError(
+                "Provide either a stock_item or a product."
+            )
+        return attrs
 
 
-class SaleSerializer(serializers.ModelSerializer[Sale]):
-    items = SaleItemSerializer(many=True, read_only=True)
+class SaleSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer[Sale]):
+    items = SaleItemSerializer(source="sale_items", many=True, read_only=True)
     created_by_name = serializers.CharField(
         source="created_by.get_full_name", read_only=True
     )
@@ -43,6 +62,25 @@ class SaleSerializer(serializers.ModelSerializer[Sale]):
         )
 
 
+class SaleQuoteItemSerializer(serializers.Serializer[SaleItemDTO]):
+    stock_item = serializers.IntegerField(source="stock_item_id")
+    quantity = serializers.IntegerField()
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    discount_percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
+    total_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class SaleQuoteSerializer(serializers.Serializer[SaleQuoteDTO]):
+    """
+    Pricing of a sale that was not created, rounded as a created sale's.
+    """
+
+    items = SaleQuoteItemSerializer(many=True)
+    total_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    discount_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    final_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
 class SaleCreateSerializer(serializers.ModelSerializer[Sale]):
     items = SaleItemCreateSerializer(many=True)
 
@@ -61,23 +99,26 @@ class SaleCreateSerializer(serializers.ModelSerializer[Sale]):
         # Transform validated data into a SaleCreateDTO
         sale_items = [
             SaleItemDTO(
-                stock_item_id=item["stock_item"].id,
+                stock_item_id=item["stock_item"],
                 quantity=item["quantity"],
-                unit_price=item[
-                    "stock_item"
-                ].selling_price,  # Will be recalculated in service
-                total_price=item["stock_item"].selling_price
-                * item["quantity"],  # Will be recalculated in service
-                discount_percentage=item[
-                    "stock_item"
-                ].discount_percentage,  # Will be recalculated in service
+                # Prices are calculated by the service.
+                unit_price=Decimal("0.00"),
+                total_price=Decimal("0.00"),
+                discount_percentage=Decimal("0.00"),
             )
             for item in items_data
+            if "stock_item" in item
+        ]
+        product_items = [
+            SaleProductItemDTO(product_id=item["product"], quantity=item["quantity"])
+            for item in items_data
+            if "product" in item
         ]
 
         return SaleCreateDTO(
             customer_name=validated_data["customer_name"],
-            customer_email=validated_data["customer_email"],
-            customer_phone=validated_data["customer_phone"],
+            customer_email=validated_data.get("customer_email", ""),
+            customer_phone=validated_data.get("customer_phone", ""),
             items=sale_items,
+            product_items=product_items,
         )
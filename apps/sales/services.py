@@ -1,47 +1,228 @@
-from datetime import date
+import hashlib
+import json
+from collections import defaultdict
+from datetime import date, timedelta
 from decimal import Decimal
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django.db import models, transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
 
-from apps.products.models import StockItem
+from apps.products.models import (
+    StockItem,
+    get_stock_prices_version,
+    notify_stock_changed,
+)
+from apps.reports.services import record_sales
 from apps.users.models import User
 
-from .dtos import SaleCreateDTO
-from .models import Sale, SaleItem
+from .dtos import SaleBulkResultDTO, SaleCreateDTO, SaleItemDTO, SaleQuoteDTO
+from .models import IdempotencyKey, Sale, SaleItem
 
 
-@transaction.atomic
-def create_sale(sale_dto: SaleCreateDTO, user: Optional[User] = None) -> Sale:
-    """
-    Create a sale with multiple items, updating stock quantities.
+STOCK_STRATEGY_LOCKING = "locking"
+STOCK_STRATEGY_CONDITIONAL = "conditional"
+STOCK_STRATEGIES = (STOCK_STRATEGY_LOCKING, STOCK_STRATEGY_CONDITIONAL)
 
-    Args:
-        sale_dto: Data transfer object containing sale information.
-        user: The user creating the sale.
 
-    Returns:
-        The created sale object.
+def get_stock_decrement_strategy() -> str:
+    """
+    Return the configured stock decrement strategy.
 
     Raises:
-        ValueError: If stock is insufficient or data is invalid.
+        ImproperlyConfigured: If the setting holds an unknown strategy.
     """
-    total_amount_gross = Decimal("0.00")
-    total_discount_amount = Decimal("0.00")
+    strategy = getattr(
+        settings, "SALES_STOCK_DECREMENT_STRATEGY", STOCK_STRATEGY_LOCKING
+    )
+    if strategy not in STOCK_STRATEGIES:
+        raise ImproperlyConfigured(
+            f"SALES_STOCK_DECREMENT_STRATEGY must be one of {STOCK_STRATEGIES}, "
+            f"got {strategy!r}"
+        )
+    return str(strategy)
 
+
+def _requested_quantities(sale_dto: SaleCreateDTO) -> Dict[int, int]:
+    """
+    Sum the requested quantity per stock item, so a basket that scans the same
+    batch on several lines is checked and decremented as a single demand.
+    """
+    requested: Dict[int, int] = defaultdict(int)
     for item_dto in sale_dto.items:
-        try:
-            stock_item = StockItem.objects.select_for_update().get(
-                id=item_dto.stock_item_id
+        requested[item_dto.stock_item_id] += item_dto.quantity
+    return dict(requested)
+
+
+def _fetch_stock_items(
+    stock_item_ids: Iterable[int],
+    lock: bool = True,
+    product_ids: Iterable[int] = (),
+) -> Dict[int, StockItem]:
+    """
+    Fetch every referenced stock item with a single query.
+
+    Besides the stock items named by id, the unexpired batches in stock of
+    `product_ids` are fetched for `_allocate_product_items`.
+
+    When locking, rows are locked in primary key order so that two concurrent
+    sales touching the same batches always acquire their locks in the same
+    sequence.
+    """
+    stock_items = StockItem.objects.with_pricing().select_related("product")
+    if lock:
+        stock_items = stock_items.select_for_update(of=("self",))
+    selection = Q(id__in=stock_item_ids)
+    product_ids = set(product_ids)
+    if product_ids:
+        selection |= Q(
+            product_id__in=product_ids,
+            quantity__gt=0,
+            expiration_date__gte=timezone.now().date(),
+        )
+    stock_items = stock_items.filter(selection).order_by("id")
+    return {stock_item.id: stock_item for stock_item in stock_items}
+
+
+def _allocate_product_items(
+    sale_dto: SaleCreateDTO, stock_items: Dict[int, StockItem]
+) -> None:
+    """
+    Allocate the sale lines naming a product to that product's batches,
+    first expiry first out, and add them to the sale items.
+
+    A line is split over several batches when the first runs out. Quantities
+    already taken by the sale's other lines, or by earlier sales of the same
+    batch (see `_reserve_stock`), are not allocated again.
+
+    Raises:
+        ValueError: If a product does not have enough unexpired stock.
+    """
+    if not sale_dto.product_items:
+        return
+
+    taken = _requested_quantities(sale_dto)
+    batches: Dict[int, List[StockItem]] = defaultdict(list)
+    today = timezone.now().date()
+    for stock_item in sorted(
+        stock_items.values(), key=lambda item: (item.expiration_date, item.id)
+    ):
+        if stock_item.expiration_date >= today:
+            batches[stock_item.product_id].append(stock_item)
+
+    allocated: List[SaleItemDTO] = []
+    for product_item in sale_dto.product_items:
+        remaining = product_item.quantity
+        for stock_item in batches[product_item.product_id]:
+            available = stock_item.quantity - taken.get(stock_item.id, 0)
+            quantity = min(remaining, available)
+            if quantity <= 0:
+                continue
+            allocated.append(
+                SaleItemDTO(
+                    stock_item_id=stock_item.id,
+                    quantity=quantity,
+                    unit_price=Decimal("0.00"),
+                    total_price=Decimal("0.00"),
+                    discount_percentage=Decimal("0.00"),
+                )
             )
-        except StockItem.DoesNotExist:
-            raise ValueError(
-                f"Stock item with id {item_dto.stock_item_id} does not exist"
+            taken[stock_item.id] = taken.get(stock_item.id, 0) + quantity
+            remaining -= quantity
+            if not remaining:
+                break
+        if remaining:
+            batch = next(iter(batches[product_item.product_id]), None)
+            name = (
+                batch.product.name
+                if batch is not None
+                else f"product with id {product_item.product_id}"
             )
+            raise ValueError(f"Insufficient stock for {name}")
+
+    sale_dto.items = [*sale_dto.items, *allocated]
+    sale_dto.product_items = []
 
-        if stock_item.quantity < item_dto.quantity:
+
+def _decrement_stock(
+    requested: Dict[int, int], stock_items: Dict[int, StockItem]
+) -> None:
+    """
+    Apply all stock decrements with one conditional UPDATE.
+
+    Each row is only updated while it still holds enough quantity, so a row
+    count lower than expected means the sale would oversell a batch. Cached
+    inventory valuations and the availability of the products sold are
+    refreshed once the decrement commits. `updated_at` is set as `save()`
+    would, so the catalog change feed sends the new quantities.
+    """
+    if not requested:
+        return
+
+    guard = Q()
+    for stock_item_id, quantity in requested.items():
+        guard |= Q(id=stock_item_id, quantity__gte=quantity)
+
+    updated = StockItem.objects.filter(guard).update(
+        quantity=Case(
+            *[
+                When(id=stock_item_id, then=F("quantity") - quantity)
+                for stock_item_id, quantity in requested.items()
+            ],
+            default=F("quantity"),
+            output_field=models.PositiveIntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated != len(requested):
+        raise ValueError("Insufficient stock to complete the sale")
+    notify_stock_changed(
+        (stock_items[stock_item_id].product_id for stock_item_id in requested),
+        prices_changed=False,
+    )
+
+
+def _reserve_stock(
+    requested: Dict[int, int], stock_items: Dict[int, StockItem]
+) -> None:
+    """
+    Check that every requested quantity is available and deduct it from the
+    in-memory stock items, so later sales in the same batch see what is left.
+
+    Raises:
+        ValueError: If a stock item does not exist or is insufficient.
+    """
+    for stock_item_id, quantity in requested.items():
+        stock_item = stock_items.get(stock_item_id)
+        if stock_item is None:
+            raise ValueError(f"Stock item with id {stock_item_id} does not exist")
+        if stock_item.quantity < quantity:
             raise ValueError(f"Insufficient stock for {stock_item.product.name}")
 
+    for stock_item_id, quantity in requested.items():
+        stock_items[stock_item_id].quantity -= quantity
+
+
+def _build_sale(
+    sale_dto: SaleCreateDTO,
+    stock_items: Dict[int, StockItem],
+    user: Optional[User] = None,
+) -> Sale:
+    """
+    Price every item of the sale and return the unsaved Sale with its totals.
+
+    The priced unit price, total and discount are written back to the item DTOs.
+    """
+    total_amount_gross = Decimal("0.00")
+    total_discount_amount = Decimal("0.00")
+
+    for item_dto in sale_dto.items:
+        stock_item = stock_items[item_dto.stock_item_id]
+
         original_price = stock_item.selling_price
         discounted_price = stock_item.discounted_price
 
@@ -58,7 +239,7 @@ def create_sale(sale_dto: SaleCreateDTO, user: Optional[User] = None) -> Sale:
 
     final_amount = total_amount_gross - total_discount_amount
 
-    sale = Sale.objects.create(
+    return Sale(
         customer_name=sale_dto.customer_name,
         customer_email=sale_dto.customer_email,
         customer_phone=sale_dto.customer_phone,
@@ -68,27 +249,289 @@ def create_sale(sale_dto: SaleCreateDTO, user: Optional[User] = None) -> Sale:
         created_by=user,
     )
 
-    sale_items_to_create = []
-    for item_dto in sale_dto.items:
-        stock_item = StockItem.objects.get(id=item_dto.stock_item_id)
-        stock_item.quantity -= item_dto.quantity
-        stock_item.save(update_fields=["quantity"])
 
-        sale_item = SaleItem(
+def _build_sale_items(
+    sale: Sale, sale_dto: SaleCreateDTO, stock_items: Dict[int, StockItem]
+) -> List[SaleItem]:
+    """
+    Build the unsaved SaleItems of a priced sale.
+    """
+    return [
+        SaleItem(
             sale=sale,
-            stock_item=stock_item,
+            stock_item=stock_items[item_dto.stock_item_id],
             quantity=item_dto.quantity,
             unit_price=item_dto.unit_price,
             discount_percentage=item_dto.discount_percentage,
             total_price=item_dto.total_price,
         )
-        sale_items_to_create.append(sale_item)
+        for item_dto in sale_dto.items
+    ]
+
+
+@transaction.atomic
+def create_sale(sale_dto: SaleCreateDTO, user: Optional[User] = None) -> Sale:
+    """
+    Create a sale with multiple items, updating stock quantities.
+
+    The number of queries is constant regardless of basket size: stock items
+    are read in one query, decremented in one UPDATE and the sale items are
+    written with a single bulk insert.
+
+    Lines may name a product instead of a batch (`sale_dto.product_items`).
+    The product's unexpired batches are read by the same query and allocated
+    first expiry first out, giving one sale item per batch used.
 
-    SaleItem.objects.bulk_create(sale_items_to_create)
+    With the default ``"locking"`` strategy the stock rows are locked while the
+    sale is priced. The ``"conditional"`` strategy, selected through the
+    ``SALES_STOCK_DECREMENT_STRATEGY`` setting, reads them without locks and
+    relies on the guarded UPDATE alone, so checkouts of a popular batch do not
+    queue behind each other.
+
+    Args:
+        sale_dto: Data transfer object containing sale information.
+        user: The user creating the sale.
 
+    Returns:
+        The created sale object.
+
+    Raises:
+        ValueError: If stock is insufficient or data is invalid.
+    """
+    lock = get_stock_decrement_strategy() == STOCK_STRATEGY_LOCKING
+    stock_items = _fetch_stock_items(
+        _requested_quantities(sale_dto).keys(),
+        lock=lock,
+        product_ids={item.product_id for item in sale_dto.product_items},
+    )
+
+    _allocate_product_items(sale_dto, stock_items)
+    requested = _requested_quantities(sale_dto)
+    _reserve_stock(requested, stock_items)
+
+    sale = _build_sale(sale_dto, stock_items, user)
+    sale.save()
+
+    _decrement_stock(requested, stock_items)
+
+    sale_items = _build_sale_items(sale, sale_dto, stock_items)
+    SaleItem.objects.bulk_create(sale_items)
+    # The items reference the stock items (and products) loaded above, so
+    # serializing the sale needs no further queries.
+    sale.sale_items = sale_items
+
+    # The sale stands once committed, so a failing rollup update is logged
+    # rather than raised; `backfill_sales_rollups` rebuilds the rollups.
+    transaction.on_commit(lambda: record_sales([sale]), robust=True)
     return sale
 
 
+@transaction.atomic
+def create_sales_bulk(
+    sale_dtos: List[SaleCreateDTO], user: Optional[User] = None
+) -> List[SaleBulkResultDTO]:
+    """
+    Create many sales at once, as replayed by terminals coming back online.
+
+    Every stock item referenced by the batch is fetched (and locked) with one
+    query. Sales are then applied in order against the in-memory stock, so a
+    sale that cannot be fulfilled is reported as failed without affecting the
+    others. Accepted sales are priced with the same rules as `create_sale` and
+    written with one bulk insert for sales, one for their items and a single
+    guarded stock UPDATE.
+
+    Args:
+        sale_dtos: The sales to create, in the order they were made.
+        user: The user creating the sales.
+
+    Returns:
+        One result per sale, in input order.
+
+    Raises:
+        ValueError: If the stock changed concurrently and the batch would
+            oversell, in which case nothing is written.
+    """
+    lock = get_stock_decrement_strategy() == STOCK_STRATEGY_LOCKING
+    stock_items = _fetch_stock_items(
+        {item.stock_item_id for sale_dto in sale_dtos for item in sale_dto.items},
+        lock=lock,
+        product_ids={
+            item.product_id for sale_dto in sale_dtos for item in sale_dto.product_items
+        },
+    )
+
+    results: List[SaleBulkResultDTO] = []
+    accepted: List[Tuple[Sale, SaleCreateDTO]] = []
+    total_requested: Dict[int, int] = defaultdict(int)
+
+    for index, sale_dto in enumerate(sale_dtos):
+        try:
+            _allocate_product_items(sale_dto, stock_items)
+            requested = _requested_quantities(sale_dto)
+            _reserve_stock(requested, stock_items)
+        except ValueError as e:
+            results.append(SaleBulkResultDTO(index=index, error=str(e)))
+            continue
+
+        sale = _build_sale(sale_dto, stock_items, user)
+        accepted.append((sale, sale_dto))
+        results.append(SaleBulkResultDTO(index=index, sale=sale))
+        for stock_item_id, quantity in requested.items():
+            total_requested[stock_item_id] += quantity
+
+    if not accepted:
+        return results
+
+    Sale.objects.bulk_create([sale for sale, _ in accepted])
+    _decrement_stock(dict(total_requested), stock_items)
+
+    sale_items_by_sale = [
+        (sale, _build_sale_items(sale, sale_dto, stock_items))
+        for sale, sale_dto in accepted
+    ]
+    SaleItem.objects.bulk_create(
+        [sale_item for _, sale_items in sale_items_by_sale for sale_item in sale_items]
+    )
+    for sale, sale_items in sale_items_by_sale:
+        sale.sale_items = sale_items
+
+    transaction.on_commit(
+        lambda: record_sales([sale for sale, _ in accepted]), robust=True
+    )
+    return results
+
+
+def quote_sale(sale_dto: SaleCreateDTO) -> SaleQuoteDTO:
+    """
+    Price a sale without creating it, for terminals showing running totals.
+
+    Lines are allocated and priced by the same rules as `create_sale`, but
+    nothing is locked or written.
+
+    Stock items are cached for the day, as their discount tier only changes
+    daily, until stock is edited. Only the stock items missing from the cache
+    and the batches of product lines are read, with one query. Quantities in
+    stock are only checked to allocate product lines; creating the sale
+    checks every line.
+
+    Raises:
+        ValueError: If a stock item does not exist or a product does not have
+            enough unexpired stock.
+    """
+    prefix = (
+        f"sales:quote:{get_stock_prices_version()}:"
+        f"{timezone.now().date().isoformat()}"
+    )
+    keys = {
+        f"{prefix}:{stock_item_id}": stock_item_id
+        for stock_item_id in _requested_quantities(sale_dto)
+    }
+    stock_items: Dict[int, StockItem] = {
+        keys[key]: stock_item for key, stock_item in cache.get_many(keys).items()
+    }
+
+    missing = set(keys.values()) - set(stock_items)
+    product_ids = {item.product_id for item in sale_dto.product_items}
+    if missing or product_ids:
+        fetched = _fetch_stock_items(missing, lock=False, product_ids=product_ids)
+        cache.set_many(
+            {
+                f"{prefix}:{stock_item_id}": stock_item
+                for stock_item_id, stock_item in fetched.items()
+            },
+            settings.SALES_QUOTE_CACHE_TIMEOUT,
+        )
+        stock_items.update(fetched)
+    unknown = missing - set(stock_items)
+    if unknown:
+        raise ValueError(f"Stock item with id {min(unknown)} does not exist")
+
+    _allocate_product_items(sale_dto, stock_items)
+    sale = _build_sale(sale_dto, stock_items)
+    return SaleQuoteDTO(
+        items=sale_dto.items,
+        total_amount=sale.total_amount,
+        discount_amount=sale.discount_amount,
+        final_amount=sale.final_amount,
+    )
+
+
+def get_request_fingerprint(data: Any) -> str:
+    """
+    Return a stable hash of a request payload, used to detect an
+    Idempotency-Key being reused for a different request.
+    """
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _idempotency_cache_key(key: str, user: User) -> str:
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f"sales:idempotency:{user.pk}:{digest}"
+
+
+def get_idempotent_response(key: str, user: User) -> Optional[IdempotencyKey]:
+    """
+    Look up the stored response for an Idempotency-Key.
+
+    The cache is checked first; the database is the fallback for keys that
+    were evicted or stored while the cache was unavailable.
+    """
+    cache_key = _idempotency_cache_key(key, user)
+    record: Optional[IdempotencyKey] = cache.get(cache_key)
+    if record is None:
+        record = IdempotencyKey.objects.filter(user=user, key=key).first()
+        if record is not None:
+            cache.set(cache_key, record, settings.SALES_IDEMPOTENCY_CACHE_TIMEOUT)
+    return record
+
+
+def store_idempotent_response(
+    key: str,
+    user: User,
+    fingerprint: str,
+    response_status: int,
+    response_body: Dict[str, Any],
+) -> IdempotencyKey:
+    """
+    Persist the response of a request made with an Idempotency-Key.
+
+    Call it inside the transaction that performed the work, so that the key is
+    only recorded if the work is committed. A concurrent request with the same
+    key fails on the unique constraint and rolls back its own work.
+    """
+    record = IdempotencyKey.objects.create(
+        key=key,
+        user=user,
+        request_fingerprint=fingerprint,
+        response_status=response_status,
+        response_body=response_body,
+    )
+    transaction.on_commit(
+        lambda: cache.set(
+            _idempotency_cache_key(key, user),
+            record,
+            settings.SALES_IDEMPOTENCY_CACHE_TIMEOUT,
+        ),
+        robust=True,
+    )
+    return record
+
+
+def prune_idempotency_keys() -> int:
+    """
+    Delete the stored Idempotency-Key responses older than
+    `SALES_IDEMPOTENCY_RETENTION_DAYS`. A request retried with one of their
+    keys afterwards is processed again.
+
+    Returns:
+        int: Number of stored responses deleted
+    """
+    oldest = timezone.now() - timedelta(days=settings.SALES_IDEMPOTENCY_RETENTION_DAYS)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=oldest).delete()
+    return deleted
+
+
 def get_sales_report(
     start_date: Optional[date] = None, end_date: Optional[date] = None
 ) -> Dict[str, Any]:
@@ -5,13 +5,35 @@ document.addEventListener('DOMContentLoaded', () => {
     // This function will execute once the entire HTML document is ready.
     console.log("Sales Admin Script: DOM is ready.");
 
-    const stockDataElement = document.getElementById('stock_items_json');
-    if (!stockDataElement) {
-        console.error('CRITICAL ERROR: The <script id="stock_items_json"> tag was not found.');
+    const pricingUrlElement = document.getElementById('stock_pricing_url');
+    if (!pricingUrlElement) {
+        console.error('CRITICAL ERROR: The <script id="stock_pricing_url"> tag was not found.');
         return;
     }
-    const stockData = JSON.parse(stockDataElement.textContent);
-    console.log("Sales Admin Script: Stock data parsed.");
+    const pricingUrl = JSON.parse(pricingUrlElement.textContent);
+
+    // Pricing of the stock items selected so far, keyed by id. Items are
+    // fetched from the server when first selected instead of all being
+    // embedded in the page.
+    const stockData = {};
+
+    function fetchStockData(stockIds) {
+        const missing = stockIds.filter(id => id && !(id in stockData));
+        if (!missing.length) {
+            return Promise.resolve();
+        }
+        const params = new URLSearchParams();
+        missing.forEach(id => params.append('id', id));
+        return fetch(`${pricingUrl}?${params}`, { credentials: 'same-origin' })
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Stock pricing lookup failed with ${response.status}`);
+                }
+                return response.json();
+            })
+            .then(data => Object.assign(stockData, data))
+            .catch(error => console.error("Sales Admin Script:", error));
+    }
 
     function updateRowCalculations(row) {
         const stockItemSelect = row.querySelector('select[id$="-stock_item"]');
@@ -89,29 +111,39 @@ document.addEventListener('DOMContentLoaded', () => {
         const quantityInput = row.querySelector('input[id$="-quantity"]');
 
         if (stockItemSelect) {
-            stockItemSelect.addEventListener('change', () => {
+            const onStockItemChange = () => {
                 if (parseInt(quantityInput.value, 10) === 0 || !quantityInput.value) {
                     quantityInput.value = 1;
                 }
-                updateRowCalculations(row);
-            });
+                fetchStockData([stockItemSelect.value]).then(() => updateRowCalculations(row));
+            };
+            // The autocomplete widget reports selections through jQuery events.
+            if (window.django && django.jQuery) {
+                django.jQuery(stockItemSelect).on('change', onStockItemChange);
+            } else {
+                stockItemSelect.addEventListener('change', onStockItemChange);
+            }
         }
         if (quantityInput) {
             quantityInput.addEventListener('input', () => {
                 updateRowCalculations(row);
             });
         }
-
-        if (stockItemSelect && stockItemSelect.value) {
-            updateRowCalculations(row);
-        }
     }
 
     const inlineContainer = document.getElementById('items-group');
     if (inlineContainer) {
         console.log("Sales Admin Script: Found inline container with ID 'items-group'. Success!");
         
-        inlineContainer.querySelectorAll('.form-row').forEach(initializeRow); // CORRECTED CLASS
+        const rows = inlineContainer.querySelectorAll('.form-row'); // CORRECTED CLASS
+        rows.forEach(initializeRow);
+
+        // Price the items of an existing sale with a single lookup.
+        const selectedIds = Array.from(rows)
+            .map(row => row.querySelector('select[id$="-stock_item"]'))
+            .filter(select => select && select.value)
+            .map(select => select.value);
+        fetchStockData(selectedIds).then(() => rows.forEach(updateRowCalculations));
 
         const observer = new MutationObserver((mutations) => {
             mutations.forEach((mutation) => {
@@ -126,4 +158,4 @@ document.addEventListener('DOMContentLoaded', () => {
     } else {
         console.warn("Sales Admin Script: CRITICAL - Could not find inline container.");
     }
-});
\ No newline at end of file
+});
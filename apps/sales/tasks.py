@@ -0,0 +1,12 @@
+from celery import shared_task
+
+from .services import prune_idempotency_keys
+
+
+# Run daily at 3:00 AM
+@shared_task  # type: ignore[misc]
+def daily_idempotency_key_prune() -> int:
+    """
+    Delete the stored Idempotency-Key responses past their retention.
+    """
+    return prune_idempotency_keys()
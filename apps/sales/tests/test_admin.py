@@ -0,0 +1,118 @@
+from decimal import Decimal
+from typing import Any, Callable
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.products.factories.factories import StockItemFactory
+from apps.sales.models import Sale
+
+
+@pytest.mark.django_db
+class TestSaleAdmin:
+    """Integration tests for the sale admin form and its stock lookups."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
+    def _count_queries(self, request: Callable[[], Any]) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        assert response.status_code == 200  # nosec B101
+        return len(context)
+
+    def test_add_form_does_not_grow_with_the_stock(self, admin_client: Client) -> None:
+        """Test that the sale form embeds no stock, whatever its size."""
+        url = reverse("admin:sales_sale_add")
+        StockItemFactory.create()
+        admin_client.get(url)
+        small = self._count_queries(lambda: admin_client.get(url))
+        StockItemFactory.create_batch(20)
+        response = admin_client.get(url)
+
+        assert self._count_queries(lambda: admin_client.get(url)) == small  # nosec B101
+        assert (
+            reverse("admin:sales_sale_stock_pricing") in response.content.decode()
+        )  # nosec B101
+        assert b"stock_items_json" not in response.content  # nosec B101
+
+    def test_autocomplete_offers_batches_in_stock(self, admin_client: Client) -> None:
+        """Test that the stock item autocomplete skips sold out batches."""
+        in_stock = StockItemFactory.create(quantity=5)
+        StockItemFactory.create(quantity=0)
+        StockItemFactory.create_batch(3, quantity=1)
+        params = {
+            "app_label": "sales",
+            "model_name": "saleitem",
+            "field_name": "stock_item",
+            "term": in_stock.batch_number,
+        }
+
+        def request() -> Any:
+            return admin_client.get(reverse("admin:autocomplete"), params)
+
+        queries = self._count_queries(request)
+        response = request()
+
+        assert response.json()["results"] == [  # nosec B101
+            {"id": str(in_stock.id), "text": str(in_stock)}
+        ]
+        params["term"] = ""
+        # Option labels read the product from the same query.
+        assert self._count_queries(request) == queries  # nosec B101
+        assert len(request().json()["results"]) == 4  # nosec B101
+
+    def test_stock_pricing_is_looked_up_per_item_and_cached(
+        self, admin_client: Client
+    ) -> None:
+        """Test that the pricing of the selected stock items is served and cached."""
+        stock_item = StockItemFactory.create(quantity=7, selling_price=Decimal("12.50"))
+        url = reverse("admin:sales_sale_stock_pricing")
+
+        response = admin_client.get(url, {"id": [stock_item.id]})
+
+        assert response.json() == {  # nosec B101
+            str(stock_item.id): {
+                "selling_price": "12.50",
+                "discount_percentage": stock_item.discount_percentage,
+                "quantity": 7,
+            }
+        }
+        uncached = self._count_queries(lambda: admin_client.get(url, {"id": [0]}))
+        cached = self._count_queries(
+            lambda: admin_client.get(url, {"id": [stock_item.id]})
+        )
+        assert cached == uncached - 1  # nosec B101
+        assert admin_client.get(url, {"id": ["x"]}).status_code == 400  # nosec B101
+
+    def test_changelist_query_count_is_constant(self, admin_client: Client) -> None:
+        """Test that listing sales costs the same whatever the rows shown."""
+        url = reverse("admin:sales_sale_changelist")
+        Sale.objects.create(
+            customer_name="John Doe",
+            total_amount=Decimal("10.00"),
+            final_amount=Decimal("10.00"),
+        )
+        admin_client.get(url)
+        single = self._count_queries(lambda: admin_client.get(url))
+        Sale.objects.bulk_create(
+            Sale(
+                customer_name="John Doe",
+                total_amount=Decimal("10.00"),
+                final_amount=Decimal("10.00"),
+            )
+            for _ in range(15)
+        )
+
+        response = admin_client.get(url)
+
+        assert (
+            self._count_queries(lambda: admin_client.get(url)) == single
+        )  # nosec B101
+        assert response.context["cl"].date_hierarchy == "created_at"  # nosec B101
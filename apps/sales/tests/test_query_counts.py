@@ -0,0 +1,154 @@
+from decimal import Decimal
+from typing import Any, Callable, List
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from apps.products.factories.factories import StockItemFactory
+from apps.products.models import StockItem
+from apps.sales.models import Sale, SaleItem
+from apps.users.models import User
+
+
+@pytest.mark.django_db
+class TestSaleViewSetQueryCounts:
+    """
+    Query-count regression tests for the SaleViewSet.
+
+    Each test performs the same request against a small and a large data set
+    and asserts that both issue the same number of queries, so any N+1 pattern
+    introduced in the view or its serializers fails the suite.
+    """
+
+    @pytest.fixture
+    def user(self) -> User:
+        """Create a test user."""
+        return User.objects.create_user(
+            username="testuser",
+            email="test@example.com",
+            password="testpass123",  # nosec B106
+        )
+
+    @pytest.fixture
+    def authenticated_client(self, user: User) -> APIClient:
+        """Create an authenticated API client."""
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+        return api_client
+
+    def _count_queries(self, request: Callable[[], Response]) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = request()
+        assert response.status_code < 400, response.data  # nosec B101
+        return len(context)
+
+    def _create_sale(self, user: User, items: int) -> Sale:
+        sale = Sale.objects.create(
+            customer_name="John Doe",
+            total_amount=Decimal("10.00"),
+            final_amount=Decimal("10.00"),
+            created_by=user,
+        )
+        SaleItem.objects.bulk_create(
+            SaleItem(
+                sale=sale,
+                stock_item=StockItemFactory(),
+                quantity=1,
+                unit_price=Decimal("10.00"),
+                total_price=Decimal("10.00"),
+            )
+            for _ in range(items)
+        )
+        return sale
+
+    def _sale_payload(self, stock_items: List[StockItem]) -> dict[str, Any]:
+        return {
+            "customer_name": "John Doe",
+            "customer_email": "john@example.com",
+            "customer_phone": "+1234567890",
+            "items": [
+                {"stock_item": stock_item.id, "quantity": 1}
+                for stock_item in stock_items
+            ],
+        }
+
+    def test_list_query_count_is_constant(
+        self, authenticated_client: APIClient, user: User
+    ) -> None:
+        url = reverse("sales:sale-list")
+
+        self._create_sale(user, items=1)
+        small = self._count_queries(lambda: authenticated_client.get(url))
+
+        for _ in range(5):
+            self._create_sale(user, items=3)
+        large = self._count_queries(lambda: authenticated_client.get(url))
+
+        assert small == large  # nosec B101
+
+    def test_retrieve_query_count_is_constant(
+        self, authenticated_client: APIClient, user: User
+    ) -> None:
+        small_sale = self._create_sale(user, items=1)
+        large_sale = self._create_sale(user, items=5)
+
+        small = self._count_queries(
+            lambda: authenticated_client.get(
+                reverse("sales:sale-detail", args=[small_sale.id])
+            )
+        )
+        large = self._count_queries(
+            lambda: authenticated_client.get(
+                reverse("sales:sale-detail", args=[large_sale.id])
+            )
+        )
+
+        assert small == large  # nosec B101
+
+    def test_create_query_count_is_constant(
+        self, authenticated_client: APIClient
+    ) -> None:
+        url = reverse("sales:sale-list")
+        stock_items = StockItemFactory.create_batch(5, quantity=100)
+
+        small = self._count_queries(
+            lambda: authenticated_client.post(
+                url, self._sale_payload(stock_items[:1]), format="json"
+            )
+        )
+        large = self._count_queries(
+            lambda: authenticated_client.post(
+                url, self._sale_payload(stock_items), format="json"
+            )
+        )
+
+        assert small == large  # nosec B101
+
+    def test_create_response_is_built_without_extra_queries(
+        self, authenticated_client: APIClient
+    ) -> None:
+        url = reverse("sales:sale-list")
+        stock_items = StockItemFactory.create_batch(3, quantity=100)
+
+        with CaptureQueriesContext(connection) as context:
+            response = authenticated_client.post(
+                url, self._sale_payload(stock_items), format="json"
+            )
+
+        assert response.status_code == status.HTTP_201_CREATED  # nosec B101
+        assert [  # nosec B101
+            item["product_name"] for item in response.data["items"]
+        ] == [stock_item.product.name for stock_item in stock_items]
+        # Nothing is read back once the sale items have been inserted.
+        statements = [query["sql"].upper() for query in context.captured_queries]
+        last_insert = max(
+            i for i, sql in enumerate(statements) if sql.startswith("INSERT")
+        )
+        assert not any(  # nosec B101
+            sql.startswith("SELECT") for sql in statements[last_insert:]
+        )
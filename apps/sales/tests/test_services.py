@@ -1,14 +1,25 @@
 from decimal import Decimal
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+from dateutil.relativedelta import relativedelta
+
 from apps.products.models import Brand, Category, Product, StockItem
-from apps.sales.dtos import SaleCreateDTO, SaleItemDTO
-from apps.sales.models import Sale, SaleItem
-from apps.sales.services import create_sale, get_sales_report
+from apps.sales.dtos import SaleCreateDTO, SaleItemDTO, SaleProductItemDTO
+from apps.sales.models import IdempotencyKey, Sale, SaleItem
+from apps.sales.services import (
+    create_sale,
+    get_sales_report,
+    prune_idempotency_keys,
+    quote_sale,
+)
 
 User = get_user_model()
 
@@ -156,6 +167,324 @@ class SaleServiceTest(TestCase):
         self.assertEqual(sale_item.discount_percentage, Decimal("35.00"))
         self.assertEqual(sale_item.total_price, Decimal("26.00"))
 
+    def test_create_sale_duplicate_lines_cannot_oversell(self) -> None:
+        """
+        Test that lines referencing the same batch are checked as one demand.
+        """
+        customer_data = {
+            "name": "Test Customer",
+            "email": "customer@example.com",
+            "phone": "1234567890",
+        }
+        items_data = [
+            {"stock_item_id": self.stock_item.id, "quantity": 60},
+            {"stock_item_id": self.stock_item.id, "quantity": 60},
+        ]
+        sale_dto = self._create_sale_dto(customer_data, items_data)
+
+        with self.assertRaises(ValueError) as context:
+            create_sale(sale_dto, self.user)
+        self.assertIn("Insufficient stock", str(context.exception))
+
+        self.stock_item.refresh_from_db()
+        self.assertEqual(self.stock_item.quantity, 100)
+
+    def test_create_sale_query_count_is_constant(self) -> None:
+        """
+        Test that the number of queries does not grow with the basket size.
+        """
+        customer_data = {
+            "name": "Test Customer",
+            "email": "customer@example.com",
+            "phone": "1234567890",
+        }
+        stock_items = [
+            StockItem.objects.create(
+                product=self.product,
+                batch_number=f"BATCH1{i:02d}",
+                quantity=10,
+                cost_price=Decimal("10.00"),
+                selling_price=Decimal("15.00"),
+                expiration_date=timezone.now().date(),
+            )
+            for i in range(10)
+        ]
+
+        small_dto = self._create_sale_dto(
+            customer_data, [{"stock_item_id": stock_items[0].id, "quantity": 1}]
+        )
+        large_dto = self._create_sale_dto(
+            customer_data,
+            [{"stock_item_id": item.id, "quantity": 1} for item in stock_items],
+        )
+
+        with CaptureQueriesContext(connection) as small_basket:
+            create_sale(small_dto, self.user)
+        with CaptureQueriesContext(connection) as large_basket:
+            create_sale(large_dto, self.user)
+
+        self.assertEqual(len(small_basket), len(large_basket))
+        self.assertEqual(
+            list(
+                StockItem.objects.filter(id__in=[item.id for item in stock_items])
+                .order_by("id")
+                .values_list("quantity", flat=True)
+            ),
+            [8] + [9] * 9,
+        )
+
+    @override_settings(SALES_STOCK_DECREMENT_STRATEGY="conditional")
+    def test_create_sale_conditional_strategy(self) -> None:
+        """
+        Test that the lock-free strategy decrements stock and refuses to oversell.
+        """
+        customer_data = {
+            "name": "Test Customer",
+            "email": "customer@example.com",
+            "phone": "1234567890",
+        }
+        sale_dto = self._create_sale_dto(
+            customer_data, [{"stock_item_id": self.stock_item.id, "quantity": 60}]
+        )
+
+        create_sale(sale_dto, self.user)
+        with self.assertRaises(ValueError) as context:
+            create_sale(sale_dto, self.user)
+        self.assertIn("Insufficient stock", str(context.exception))
+
+        self.stock_item.refresh_from_db()
+        self.assertEqual(self.stock_item.quantity, 40)
+        self.assertEqual(Sale.objects.count(), 1)
+
+    @override_settings(SALES_STOCK_DECREMENT_STRATEGY="optimistic")
+    def test_create_sale_unknown_strategy(self) -> None:
+        """
+        Test that an unknown stock decrement strategy is reported as misconfigured.
+        """
+        customer_data = {
+            "name": "Test Customer",
+            "email": "customer@example.com",
+            "phone": "1234567890",
+        }
+        sale_dto = self._create_sale_dto(
+            customer_data, [{"stock_item_id": self.stock_item.id, "quantity": 1}]
+        )
+
+        with self.assertRaises(ImproperlyConfigured):
+            create_sale(sale_dto, self.user)
+
+    def _create_batches(self, *batches: tuple[int, int]) -> List[StockItem]:
+        """Create batches of the product as (days until expiration, quantity)."""
+        today = timezone.now().date()
+        return [
+            StockItem.objects.create(
+                product=self.product,
+                batch_number=f"FEFO{index}",
+                quantity=quantity,
+                cost_price=Decimal("10.00"),
+                selling_price=Decimal("15.00"),
+                expiration_date=today + relativedelta(days=days),
+            )
+            for index, (days, quantity) in enumerate(batches)
+        ]
+
+    def _product_sale_dto(
+        self, quantity: int, items: Optional[List[SaleItemDTO]] = None
+    ) -> SaleCreateDTO:
+        return SaleCreateDTO(
+            customer_name="Test Customer",
+            customer_email="customer@example.com",
+            customer_phone="1234567890",
+            items=items or [],
+            product_items=[
+                SaleProductItemDTO(product_id=self.product.id, quantity=quantity)
+            ],
+        )
+
+    def test_create_sale_allocates_product_first_expiry_first_out(self) -> None:
+        """
+        Test that a product line takes the batches expiring first, skipping
+        expired stock, and is split when a batch runs out.
+        """
+        self.stock_item.delete()
+        later, sooner, expired, latest = self._create_batches(
+            (10, 3), (5, 2), (-1, 50), (30, 10)
+        )
+
+        sale = create_sale(self._product_sale_dto(6), self.user)
+
+        self.assertEqual(
+            [(item.stock_item_id, item.quantity) for item in sale.items.all()],
+            [(sooner.id, 2), (later.id, 3), (latest.id, 1)],
+        )
+        self.assertEqual(
+            list(
+                StockItem.objects.filter(product=self.product)
+                .order_by("id")
+                .values_list("quantity", flat=True)
+            ),
+            [0, 0, 50, 9],
+        )
+
+    def test_create_sale_product_line_after_batch_line(self) -> None:
+        """
+        Test that a product line does not allocate what other lines took.
+        """
+        self.stock_item.delete()
+        first, second = self._create_batches((5, 3), (10, 3))
+        batch_line = self._create_sale_dto(
+            {"name": "", "email": "", "phone": ""},
+            [{"stock_item_id": first.id, "quantity": 2}],
+        ).items
+
+        sale = create_sale(self._product_sale_dto(2, items=batch_line), self.user)
+
+        self.assertEqual(
+            [(item.stock_item_id, item.quantity) for item in sale.items.all()],
+            [(first.id, 2), (first.id, 1), (second.id, 1)],
+        )
+        first.refresh_from_db()
+        self.assertEqual(first.quantity, 0)
+
+    def test_create_sale_product_line_insufficient_stock(self) -> None:
+        """
+        Test that a product line larger than the unexpired stock is refused.
+        """
+        self.stock_item.delete()
+        self._create_batches((5, 3), (-5, 30))
+
+        with self.assertRaisesMessage(
+            ValueError, "Insufficient stock for Test Product"
+        ):
+            create_sale(self._product_sale_dto(4), self.user)
+        self.assertEqual(Sale.objects.count(), 0)
+
+    def test_create_sale_product_line_query_count(self) -> None:
+        """
+        Test that product lines cost no more queries than batch lines.
+        """
+        self.stock_item.delete()
+        batches = self._create_batches(*[(days, 1) for days in range(1, 11)])
+        batch_dto = self._create_sale_dto(
+            {"name": "", "email": "", "phone": ""},
+            [{"stock_item_id": batches[0].id, "quantity": 1}],
+        )
+
+        with CaptureQueriesContext(connection) as batch_sale:
+            create_sale(batch_dto, self.user)
+        with CaptureQueriesContext(connection) as product_sale:
+            sale = create_sale(self._product_sale_dto(5), self.user)
+
+        self.assertEqual(len(batch_sale), len(product_sale))
+        self.assertEqual(sale.items.count(), 5)
+
+    def test_quote_sale_prices_as_create_sale_without_writing(self) -> None:
+        """
+        Test that a quote has the totals of the sale it would create, and
+        neither locks nor writes anything.
+        """
+        cache.clear()
+        self.stock_item.delete()
+        self._create_batches((0, 3), (30, 10))
+        quote_dto = self._product_sale_dto(5)
+
+        with CaptureQueriesContext(connection) as queries:
+            quote = quote_sale(quote_dto)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("FOR UPDATE", queries[0]["sql"])
+        self.assertEqual(Sale.objects.count(), 0)
+        self.assertEqual(
+            list(
+                StockItem.objects.filter(product=self.product)
+                .order_by("id")
+                .values_list("quantity", flat=True)
+            ),
+            [3, 10],
+        )
+
+        sale = create_sale(self._product_sale_dto(5), self.user)
+        self.assertEqual(
+            (quote.total_amount, quote.discount_amount, quote.final_amount),
+            (sale.total_amount, sale.discount_amount, sale.final_amount),
+        )
+        self.assertEqual(
+            [
+                (item.stock_item_id, item.quantity, item.total_price)
+                for item in quote.items
+            ],
+            [
+                (item.stock_item_id, item.quantity, item.total_price)
+                for item in sale.items.order_by("id")
+            ],
+        )
+
+    def test_quote_sale_caches_stock_items_until_stock_is_edited(self) -> None:
+        """
+        Test that repeated quotes are priced from the cache, and that editing
+        the stock item prices the next quote from the database again.
+        """
+        cache.clear()
+        items = [{"stock_item_id": self.stock_item.id, "quantity": 2}]
+        customer_data = {"name": "", "email": "", "phone": ""}
+
+        quote_sale(self._create_sale_dto(customer_data, items))
+        sale_dto = self._create_sale_dto(customer_data, items)
+        with CaptureQueriesContext(connection) as queries:
+            quote = quote_sale(sale_dto)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(quote.final_amount, Decimal("19.50"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.stock_item.selling_price = Decimal("20.00")
+            self.stock_item.save()
+
+        quote = quote_sale(self._create_sale_dto(customer_data, items))
+        self.assertEqual(quote.final_amount, Decimal("26.00"))
+
+    def test_quote_sale_unknown_stock_item(self) -> None:
+        """
+        Test that quoting a stock item that does not exist is refused.
+        """
+        cache.clear()
+        sale_dto = self._product_sale_dto(1)
+        sale_dto.items = [
+            SaleItemDTO(
+                stock_item_id=0,
+                quantity=1,
+                unit_price=Decimal("0.00"),
+                total_price=Decimal("0.00"),
+                discount_percentage=Decimal("0.00"),
+            )
+        ]
+
+        with self.assertRaisesMessage(
+            ValueError, "Stock item with id 0 does not exist"
+        ):
+            quote_sale(sale_dto)
+
+    @override_settings(SALES_IDEMPOTENCY_RETENTION_DAYS=7)
+    def test_prune_idempotency_keys(self) -> None:
+        """
+        Test that stored responses past their retention are deleted.
+        """
+        old, recent = [
+            IdempotencyKey.objects.create(
+                key=key,
+                user=self.user,
+                request_fingerprint="",
+                response_status=201,
+                response_body={},
+            )
+            for key in ("old", "recent")
+        ]
+        IdempotencyKey.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - relativedelta(days=8)
+        )
+
+        self.assertEqual(prune_idempotency_keys(), 1)
+        self.assertEqual(list(IdempotencyKey.objects.all()), [recent])
+
     def test_get_sales_report(self) -> None:
         """
         Test the sales report generation service.
@@ -1,8 +1,14 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from apps.core.pagination import PageNumberOrCursorPagination
 from apps.products.factories.factories import (
     BrandFactory,
     CategoryFactory,
@@ -11,13 +17,19 @@ from apps.products.factories.factories import (
 )
 
 from apps.users.models import User
-from apps.products.models import Product, StockItem
+from apps.products.models import Product, StockItem, stock_changed
+from apps.sales.models import Sale, SaleItem
 
 
 @pytest.mark.django_db
 class TestSaleViewSet:
     """Integration tests for the SaleViewSet."""
 
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> None:
+        """Start every test with an empty cache."""
+        cache.clear()
+
     @pytest.fixture
     def api_client(self) -> APIClient:
         """Create an API client for testing."""
@@ -77,6 +89,39 @@ class TestSaleViewSet:
         stock_item.refresh_from_db()
         assert stock_item.quantity == 98  # 100 - 2  # nosec B101
 
+    def test_create_sale_survives_failing_commit_hooks(
+        self,
+        authenticated_client: APIClient,
+        product_data: tuple[Product, StockItem],
+        django_capture_on_commit_callbacks: Any,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test a committed sale is created even if its follow-up work fails."""
+        product, stock_item = product_data
+
+        def fail(*args: Any, **kwargs: Any) -> None:
+            raise RuntimeError("rollups unavailable")
+
+        monkeypatch.setattr("apps.sales.services.record_sales", fail)
+        stock_changed.connect(fail, dispatch_uid="test.fail")
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                response = authenticated_client.post(
+                    reverse("sales:sale-list"),
+                    {
+                        "customer_name": "John Doe",
+                        "items": [{"stock_item": stock_item.id, "quantity": 2}],
+                    },
+                    format="json",
+                )
+        finally:
+            stock_changed.disconnect(dispatch_uid="test.fail")
+
+        assert response.status_code == status.HTTP_201_CREATED  # nosec B101
+        assert Sale.objects.count() == 1  # nosec B101
+        # The other receivers still ran.
+        assert product.availability.total_quantity == 98  # nosec B101
+
     def test_create_sale_insufficient_stock(
         self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
     ) -> None:
@@ -120,6 +165,91 @@ class TestSaleViewSet:
         # Check that the response is a bad request
         assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
 
+    def test_create_sale_by_product(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        """Test that a line naming a product is allocated to its batches."""
+        product, stock_item = product_data
+        stock_item.quantity = 2
+        stock_item.save()
+        later = StockItemFactory.create(
+            product=product,
+            expiration_date=stock_item.expiration_date + timedelta(days=30),
+        )
+
+        response = authenticated_client.post(
+            reverse("sales:sale-list"),
+            {
+                "customer_name": "John Doe",
+                "items": [{"product": product.id, "quantity": 3}],
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED  # nosec B101
+        assert [  # nosec B101
+            (item["stock_item"], item["quantity"]) for item in response.data["items"]
+        ] == [(stock_item.id, 2), (later.id, 1)]
+
+    def test_create_sale_line_needs_product_or_batch(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        product, stock_item = product_data
+
+        for item in (
+            {"quantity": 1},
+            {"product": product.id, "stock_item": stock_item.id, "quantity": 1},
+        ):
+            response = authenticated_client.post(
+                reverse("sales:sale-list"),
+                {"customer_name": "John Doe", "items": [item]},
+                format="json",
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
+
+    def test_quote_sale(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        """Test that a quote prices the sale without creating it."""
+        product, stock_item = product_data
+
+        response = authenticated_client.post(
+            reverse("sales:sale-quote"),
+            {
+                "customer_name": "John Doe",
+                "items": [
+                    {"stock_item": stock_item.id, "quantity": 2},
+                    {"product": product.id, "quantity": 1},
+                ],
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert [  # nosec B101
+            (item["stock_item"], item["quantity"]) for item in response.data["items"]
+        ] == [(stock_item.id, 2), (stock_item.id, 1)]
+        unit_price = stock_item.discounted_price.quantize(Decimal("0.01"))
+        assert response.data["final_amount"] == str(unit_price * 3)  # nosec B101
+        assert Sale.objects.count() == 0  # nosec B101
+        stock_item.refresh_from_db()
+        assert stock_item.quantity == 100  # nosec B101
+
+    def test_quote_sale_unknown_stock_item(
+        self, authenticated_client: APIClient
+    ) -> None:
+        response = authenticated_client.post(
+            reverse("sales:sale-quote"),
+            {
+                "customer_name": "John Doe",
+                "items": [{"stock_item": 999999, "quantity": 1}],
+            },
+            format="json",
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
+        assert "error" in response.data  # nosec B101
+
     def test_create_sale_unauthenticated(
         self, api_client: APIClient, product_data: tuple[Product, StockItem]
     ) -> None:
@@ -138,3 +268,147 @@ class TestSaleViewSet:
 
         # Check that the response is unauthorized
         assert response.status_code == status.HTTP_401_UNAUTHORIZED  # nosec B101
+
+    def test_bulk_create_sales(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        """Test that a bulk submission reports the outcome of every sale."""
+        product, stock_item = product_data
+
+        url = reverse("sales:sale-bulk")
+        sale = {
+            "customer_name": "John Doe",
+            "customer_email": "john@example.com",
+            "customer_phone": "+1234567890",
+            "items": [{"stock_item": stock_item.id, "quantity": 40}],
+        }
+        data = [sale, sale, sale, {**sale, "customer_name": ""}]
+
+        response = authenticated_client.post(url, data, format="json")
+
+        assert response.status_code == status.HTTP_200_OK  # nosec B101
+        assert response.data["created"] == 2  # nosec B101
+        assert response.data["failed"] == 2  # nosec B101
+        assert [  # nosec B101
+            result["status"] for result in response.data["results"]
+        ] == ["created", "created", "failed", "failed"]
+        assert "Insufficient stock" in (  # nosec B101
+            response.data["results"][2]["errors"]["error"]
+        )
+        assert "customer_name" in response.data["results"][3]["errors"]  # nosec B101
+
+        # Only the accepted sales consumed stock
+        stock_item.refresh_from_db()
+        assert stock_item.quantity == 20  # 100 - 2 * 40  # nosec B101
+        assert Sale.objects.count() == 2  # nosec B101
+        assert SaleItem.objects.count() == 2  # nosec B101
+
+    def test_bulk_create_sales_requires_list(
+        self, authenticated_client: APIClient
+    ) -> None:
+        """Test that a bulk submission must be a list of sales."""
+        url = reverse("sales:sale-bulk")
+
+        response = authenticated_client.post(url, {}, format="json")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST  # nosec B101
+
+    def test_create_sale_idempotency_key_replay(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        """Test that a retried request with the same key replays the response."""
+        product, stock_item = product_data
+
+        url = reverse("sales:sale-list")
+        data = {
+            "customer_name": "John Doe",
+            "customer_email": "john@example.com",
+            "customer_phone": "+1234567890",
+            "items": [{"stock_item": stock_item.id, "quantity": 2}],
+        }
+
+        first = authenticated_client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+        )
+        retry = authenticated_client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+        )
+
+        assert first.status_code == status.HTTP_201_CREATED  # nosec B101
+        assert retry.status_code == status.HTTP_201_CREATED  # nosec B101
+        assert retry.data == first.data  # nosec B101
+        assert retry["Idempotent-Replayed"] == "true"  # nosec B101
+
+        # The retry did not create a second sale nor touch the stock again
+        assert Sale.objects.count() == 1  # nosec B101
+        stock_item.refresh_from_db()
+        assert stock_item.quantity == 98  # nosec B101
+
+    def test_create_sale_idempotency_key_reused_for_other_request(
+        self, authenticated_client: APIClient, product_data: tuple[Product, StockItem]
+    ) -> None:
+        """Test that a key cannot be reused for a different payload."""
+        product, stock_item = product_data
+
+        url = reverse("sales:sale-list")
+        data = {
+            "customer_name": "John Doe",
+            "customer_email": "john@example.com",
+            "customer_phone": "+1234567890",
+            "items": [{"stock_item": stock_item.id, "quantity": 2}],
+        }
+
+        authenticated_client.post(
+            url, data, format="json", HTTP_IDEMPOTENCY_KEY="retry-1"
+        )
+        response = authenticated_client.post(
+            url,
+            {**data, "customer_name": "Jane Doe"},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY="retry-1",
+        )
+
+        assert (  # nosec B101
+            response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        assert Sale.objects.count() == 1  # nosec B101
+
+    def test_list_sales_cursor_pagination(
+        self,
+        authenticated_client: APIClient,
+        user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that cursor pages walk sales newest first, ties broken by id."""
+        monkeypatch.setattr(PageNumberOrCursorPagination, "page_size", 2)
+        sales = [
+            Sale.objects.create(
+                customer_name=f"Customer {i}",
+                total_amount="10.00",
+                final_amount="10.00",
+                created_by=user,
+            )
+            for i in range(5)
+        ]
+        # Two sales recorded at the same instant.
+        Sale.objects.filter(pk=sales[3].pk).update(created_at=sales[1].created_at)
+
+        seen = []
+        url = reverse("sales:sale-list") + "?pagination=cursor"
+        while url:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK  # nosec B101
+            seen += [sale["id"] for sale in response.data["results"]]
+            url = response.data["next"]
+
+        assert seen == [  # nosec B101
+            sales[4].id,
+            sales[2].id,
+            sales[1].id,
+            sales[3].id,
+            sales[0].id,
+        ]
+
+        # Page number pagination stays the default.
+        response = authenticated_client.get(reverse("sales:sale-list"))
+        assert response.data["count"] == 5  # nosec B101
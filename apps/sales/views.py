@@ -1,16 +1,26 @@
+from django.db import IntegrityError, transaction
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
-from typing import Any, Optional, Type, Union, cast
+from typing import Any, Dict, List, Optional, Type, Union, cast
 
 from .models import Sale
-from .serializers import SaleCreateSerializer, SaleSerializer
-from .services import create_sale
+from .serializers import SaleCreateSerializer, SaleQuoteSerializer, SaleSerializer
+from .services import (
+    create_sale,
+    create_sales_bulk,
+    get_idempotent_response,
+    get_request_fingerprint,
+    quote_sale,
+    store_idempotent_response,
+)
+from apps.core.fieldsets import SparseFieldsetViewSetMixin
 from apps.users.models import User
 
 
-class SaleViewSet(viewsets.ModelViewSet[Sale]):
+class SaleViewSet(SparseFieldsetViewSetMixin, viewsets.ModelViewSet[Sale]):
     queryset = (
         Sale.objects.select_related("created_by")
         .prefetch_related("items__stock_item__product")
@@ -27,6 +37,8 @@ class SaleViewSet(viewsets.ModelViewSet[Sale]):
     search_fields = ["customer_name", "customer_email", "customer_phone"]
     ordering_fields = ["created_at", "final_amount"]
     ordering = ["-created_at"]
+    cursor_ordering = ["-created_at", "id"]
+    bulk_max_sales = 1000
 
     def get_serializer_class(self) -> Type[Union[SaleCreateSerializer, SaleSerializer]]:
         if self.action == "create":
@@ -38,13 +50,6 @@ class SaleViewSet(viewsets.ModelViewSet[Sale]):
         pass
 
     def create(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        # Convert validated data to DTO
-        sale_create_serializer = cast(SaleCreateSerializer, serializer)
-        sale_dto = sale_create_serializer.to_dto(serializer.validated_data)
-
         # Handle the user type correctly
         user: Optional[User] = None
         if isinstance(request.user, User):
@@ -52,17 +57,164 @@ class SaleViewSet(viewsets.ModelViewSet[Sale]):
             # We need to set the user on the DTO, but we can't do it directly
             # because of the type mismatch. We'll handle it in the service.
 
+        # A retried request is answered from the stored response before any
+        # validation or stock access takes place.
+        idempotency_key = request.headers.get("Idempotency-Key")
+        fingerprint = ""
+        if idempotency_key is not None and user is not None:
+            if not 0 < len(idempotency_key) <= 255:
+                return Response(
+                    {"error": "Idempotency-Key must be 1 to 255 characters long"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            fingerprint = get_request_fingerprint(request.data)
+            replay = self._replay_idempotent_response(
+                idempotency_key, user, fingerprint
+            )
+            if replay is not None:
+                return replay
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Convert validated data to DTO
+        sale_create_serializer = cast(SaleCreateSerializer, serializer)
+        sale_dto = sale_create_serializer.to_dto(serializer.validated_data)
+
         try:
-            # Create sale using service function with DTO
-            sale = create_sale(sale_dto, user)
+            with transaction.atomic():
+                # Create sale using service function with DTO
+                sale = create_sale(sale_dto, user)
 
-            # Serialize and return the created sale
-            sale_serializer = SaleSerializer(sale)
-            return Response(sale_serializer.data, status=status.HTTP_201_CREATED)
+                # Serialize and return the created sale
+                data = SaleSerializer(sale).data
+                if idempotency_key is not None and user is not None:
+                    store_idempotent_response(
+                        idempotency_key,
+                        user,
+                        fingerprint,
+                        status.HTTP_201_CREATED,
+                        data,
+                    )
+            return Response(data, status=status.HTTP_201_CREATED)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            # A concurrent retry with the same key committed first.
+            if idempotency_key is not None and user is not None:
+                replay = self._replay_idempotent_response(
+                    idempotency_key, user, fingerprint
+                )
+                if replay is not None:
+                    return replay
+            return Response(
+                {"error": "An error occurred while creating the sale"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
         except Exception:
             return Response(
                 {"error": "An error occurred while creating the sale"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    def _replay_idempotent_response(
+        self, key: str, user: User, fingerprint: str
+    ) -> Optional[Response]:
+        """
+        Return the stored response for an Idempotency-Key, if there is one.
+        """
+        record = get_idempotent_response(key, user)
+        if record is None:
+            return None
+        if record.request_fingerprint != fingerprint:
+            return Response(
+                {"error": "Idempotency-Key was already used for a different request"},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(
+            record.response_body,
+            status=record.response_status,
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    @action(detail=False, methods=["post"], url_path="quote")
+    def quote(self, request: Request) -> Response:
+        """
+        Price a sale as `create` would, without creating it or touching the
+        stock, so terminals can show running totals while scanning.
+        """
+        serializer = SaleCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sale_dto = serializer.to_dto(serializer.validated_data)
+
+        try:
+            quote = quote_sale(sale_dto)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(SaleQuoteSerializer(quote).data)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request: Request) -> Response:
+        """
+        Create a batch of sales queued by an offline terminal.
+
+        Each sale is validated and applied independently; the response lists
+        the outcome of every sale in submission order.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {"error": "Expected a list of sales"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(request.data) > self.bulk_max_sales:
+            return Response(
+                {"error": f"A batch may contain at most {self.bulk_max_sales} sales"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(request.data)
+        valid_indexes: List[int] = []
+        sale_dtos = []
+        for index, sale_data in enumerate(request.data):
+            serializer = SaleCreateSerializer(data=sale_data)
+            if serializer.is_valid():
+                valid_indexes.append(index)
+                sale_dtos.append(serializer.to_dto(serializer.validated_data))
+            else:
+                results[index] = {
+                    "index": index,
+                    "status": "failed",
+                    "errors": serializer.errors,
+                }
+
+        user = request.user if isinstance(request.user, User) else None
+        try:
+            outcomes = create_sales_bulk(sale_dtos, user)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        for outcome in outcomes:
+            index = valid_indexes[outcome.index]
+            if outcome.sale is not None:
+                results[index] = {
+                    "index": index,
+                    "status": "created",
+                    "id": outcome.sale.id,
+                    "final_amount": str(outcome.sale.final_amount),
+                }
+            else:
+                results[index] = {
+                    "index": index,
+                    "status": "failed",
+                    "errors": {"error": outcome.error},
+                }
+
+        created = sum(1 for outcome in outcomes if outcome.sale is not None)
+        return Response(
+            {
+                "created": created,
+                "failed": len(results) - created,
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
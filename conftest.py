@@ -9,6 +9,21 @@ def user() -> Any:
     return UserFactory()
 
 
+@pytest.fixture
+def admin_user(db: Any) -> Any:
+    """
+    Superuser for pytest-django's `admin_client`, whose own fixture cannot
+    create users that log in by email.
+    """
+    from apps.users.models import User
+
+    return User.objects.create_superuser(
+        username="admin",
+        email="admin@example.com",
+        password="testpass123",  # nosec B106
+    )
+
+
 @pytest.fixture
 def brand() -> Any:
     from apps.products.factories.factories import BrandFactory
@@ -23,4 +23,20 @@ app.conf.beat_schedule = {
         "task": "apps.products.tasks.daily_expiring_products_check",
         "schedule": crontab(hour="9", minute="0"),  # Daily at 9:00 AM
     },
+    "daily-stock-pricing-refresh": {
+        "task": "apps.products.tasks.daily_stock_pricing_refresh",
+        "schedule": crontab(hour="0", minute="5"),  # Daily at 00:05 AM
+    },
+    "daily-availability-refresh": {
+        "task": "apps.inventory.tasks.daily_availability_refresh",
+        "schedule": crontab(hour="0", minute="5"),  # Daily at 00:05 AM
+    },
+    "daily-sync-tombstone-prune": {
+        "task": "apps.products.tasks.daily_sync_tombstone_prune",
+        "schedule": crontab(hour="3", minute="0"),  # Daily at 3:00 AM
+    },
+    "daily-idempotency-key-prune": {
+        "task": "apps.sales.tasks.daily_idempotency_key_prune",
+        "schedule": crontab(hour="3", minute="0"),  # Daily at 3:00 AM
+    },
 }
@@ -157,7 +157,7 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "apps.core.pagination.PageNumberOrCursorPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
@@ -167,6 +167,10 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Paginated results estimated by the query planner to hold at least this many
+# rows report the estimate instead of running an exact COUNT(*).
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = 100_000
+
 # drf-spectacular settings
 SPECTACULAR_SETTINGS = {
     "TITLE": "Pharmacy API",
@@ -175,6 +179,48 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
+# Products Configuration
+# Number of catalog lines upserted per statement and transaction on import.
+PRODUCTS_IMPORT_CHUNK_SIZE = 1000
+# How long the full catalog snapshot served to terminals stays cached (seconds).
+PRODUCTS_SYNC_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+# Sync cursors trail the sync by this many seconds, so rows saved by
+# transactions still running then are sent by the next sync.
+PRODUCTS_SYNC_CURSOR_LAG_SECONDS = 60
+# Days deleted catalog rows are kept for the change feed. Terminals that have
+# not synced for longer get the full snapshot.
+PRODUCTS_SYNC_TOMBSTONE_DAYS = 30
+
+# Sales Configuration
+# "locking" locks stock rows while a sale is priced; "conditional" skips the
+# row locks and relies on a guarded UPDATE, which suits heavily contended SKUs.
+SALES_STOCK_DECREMENT_STRATEGY = os.environ.get(
+    "SALES_STOCK_DECREMENT_STRATEGY", "locking"
+)
+# How long replayable sale responses stay in the cache (seconds).
+SALES_IDEMPOTENCY_CACHE_TIMEOUT = 60 * 60 * 24
+# Days stored Idempotency-Key responses are kept in the database before the
+# nightly prune deletes them. Keep it longer than the cache timeout above, and
+# than the longest time terminals retry a request.
+SALES_IDEMPOTENCY_RETENTION_DAYS = 7
+# How long stock items priced by sale quotes stay in the cache (seconds). They
+# are also dropped when the day, and with it the discount tier, changes.
+SALES_QUOTE_CACHE_TIMEOUT = 60 * 60 * 24
+# How long stock item pricing looked up by the admin sale form stays in the
+# cache (seconds). It is also dropped when stock changes or the day rolls over.
+SALES_ADMIN_PRICING_CACHE_TIMEOUT = 60 * 60
+
+# Reports Configuration
+# Upper bound, in seconds, on how long one viewer may hold the dashboard
+# rebuild lock before another is allowed to recompute the payload.
+REPORTS_DASHBOARD_LOCK_TIMEOUT = 30
+# Number of rows fetched from the database at a time by the streaming exports.
+REPORTS_EXPORT_CHUNK_SIZE = 2000
+# Days ahead covered by the daily expiry report, and the number of expiring
+# stock items it reads at a time.
+REPORTS_EXPIRY_WINDOW_DAYS = 30
+REPORTS_EXPIRY_CHUNK_SIZE = 2000
+
 # Celery Configuration
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.environ.get(